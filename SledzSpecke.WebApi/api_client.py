@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Shared HTTP client for the SledzSpecke API test scripts.
+
+All scripts go through one pooled requests.Session instead of calling
+requests.post/get directly, so TCP connections are kept alive and reused
+between calls. Connect errors (API still starting, VPS hiccups) are retried
+with exponential backoff.
+
+Usage:
+    import api_client
+
+    token = ...  # sign in
+    api_client.set_auth_token(token)
+    response = api_client.get(f"{BASE_URL}/procedures")
+
+Configuration (environment variables, or api_client.configure()):
+    SLEDZSPECKE_HTTP_POOL_SIZE  - connections kept per host (default 32)
+    SLEDZSPECKE_HTTP_RETRIES    - connect retries (default 3)
+    SLEDZSPECKE_HTTP_BACKOFF    - backoff factor in seconds (default 0.2)
+    SLEDZSPECKE_HTTP_TIMEOUT    - default request timeout in seconds (default 30)
+
+Every request is timed with time.perf_counter(); listeners registered with
+add_listener() receive (method, url, response, elapsed_seconds) after each
+call (response is None when the request raised).
+
+set_transport() swaps the pooled adapter for another one, e.g. to record or
+replay traffic (harness/cassette.py).
+"""
+
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from urllib3.util.retry import Retry
+
+DEFAULT_POOL_SIZE = int(os.environ.get("SLEDZSPECKE_HTTP_POOL_SIZE", "32"))
+DEFAULT_RETRIES = int(os.environ.get("SLEDZSPECKE_HTTP_RETRIES", "3"))
+DEFAULT_BACKOFF = float(os.environ.get("SLEDZSPECKE_HTTP_BACKOFF", "0.2"))
+DEFAULT_TIMEOUT = float(os.environ.get("SLEDZSPECKE_HTTP_TIMEOUT", "30"))
+
+_settings = {
+    "pool_size": DEFAULT_POOL_SIZE,
+    "retries": DEFAULT_RETRIES,
+    "backoff_factor": DEFAULT_BACKOFF,
+    "timeout": DEFAULT_TIMEOUT,
+}
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+_listeners: List[Callable[[str, str, Optional[requests.Response], float], None]] = []
+_transport: Optional[Callable[[HTTPAdapter], BaseAdapter]] = None
+# Readiness probes: no connect retries (a refused connection just means
+# "not yet") and no listeners
+_probe_session: Optional[requests.Session] = None
+
+def create_session(pool_size: int = DEFAULT_POOL_SIZE,
+                   retries: int = DEFAULT_RETRIES,
+                   backoff_factor: float = DEFAULT_BACKOFF) -> requests.Session:
+    """Create a keep-alive session with a connection pool and connect retries"""
+    # Only connection failures are retried: the request never reached the
+    # API, so it is safe even for POST. Read errors and error statuses are
+    # returned to the caller untouched - the tests assert on them.
+    retry = Retry(
+        total=retries,
+        connect=retries,
+        read=0,
+        redirect=0,
+        status=0,
+        backoff_factor=backoff_factor,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size,
+                          max_retries=retry, pool_block=False)
+
+    session = requests.Session()
+    if _transport is not None:
+        adapter = _transport(adapter)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update({
+        "Connection": "keep-alive",
+        "Content-Type": "application/json",
+    })
+    return session
+
+def configure(pool_size: Optional[int] = None,
+              retries: Optional[int] = None,
+              backoff_factor: Optional[float] = None,
+              timeout: Optional[float] = None):
+    """Change client settings; the shared session is recreated on next use"""
+    global _session
+    with _session_lock:
+        for key, value in (("pool_size", pool_size), ("retries", retries),
+                           ("backoff_factor", backoff_factor), ("timeout", timeout)):
+            if value is not None:
+                _settings[key] = value
+        old_session, _session = _session, None
+    if old_session is not None:
+        token = old_session.headers.get("Authorization")
+        old_session.close()
+        if token:
+            get_session().headers["Authorization"] = token
+
+def set_transport(transport: Optional[Callable[[HTTPAdapter], BaseAdapter]]):
+    """Mount `transport(pooled_adapter)` instead of the pooled adapter (None restores it);
+    the shared session is recreated, keeping its auth token"""
+    global _transport, _probe_session
+    _transport = transport
+    _probe_session = None
+    configure()
+
+def get_session() -> requests.Session:
+    """Return the shared session, creating it on first use"""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = create_session(_settings["pool_size"], _settings["retries"],
+                                          _settings["backoff_factor"])
+    return _session
+
+def set_auth_token(token: Optional[str]):
+    """Send `token` as the default bearer token on every request"""
+    headers = get_session().headers
+    if token:
+        headers["Authorization"] = f"Bearer {token}"
+    else:
+        headers.pop("Authorization", None)
+
+def auth_headers(token: str) -> Dict[str, str]:
+    """Per-request auth override for callers juggling several users"""
+    return {"Authorization": f"Bearer {token}"}
+
+def add_listener(listener: Callable[[str, str, Optional[requests.Response], float], None]):
+    """Call `listener(method, url, response, elapsed)` after every request"""
+    if listener not in _listeners:
+        _listeners.append(listener)
+
+def remove_listener(listener):
+    if listener in _listeners:
+        _listeners.remove(listener)
+
+def _notify(method: str, url: str, response: Optional[requests.Response], elapsed: float):
+    for listener in list(_listeners):
+        listener(method, url, response, elapsed)
+
+def request(method: str, url: str, **kwargs) -> requests.Response:
+    """Send a request through the shared session"""
+    kwargs.setdefault("timeout", _settings["timeout"])
+    start = time.perf_counter()
+    try:
+        response = get_session().request(method, url, **kwargs)
+    except Exception:
+        _notify(method, url, None, time.perf_counter() - start)
+        raise
+    _notify(method, url, response, time.perf_counter() - start)
+    return response
+
+def get(url: str, **kwargs) -> requests.Response:
+    return request("GET", url, **kwargs)
+
+def post(url: str, **kwargs) -> requests.Response:
+    return request("POST", url, **kwargs)
+
+def put(url: str, **kwargs) -> requests.Response:
+    return request("PUT", url, **kwargs)
+
+def delete(url: str, **kwargs) -> requests.Response:
+    return request("DELETE", url, **kwargs)
+
+def head(url: str, **kwargs) -> requests.Response:
+    return request("HEAD", url, **kwargs)
+
+def probe_health(base_url: str, timeout: float = 2) -> Optional[int]:
+    """Status code of HEAD {base_url}/health, or None when nothing answered.
+
+    Any status means the API is up: /health answers 503 while the database
+    is unreachable.
+    """
+    global _probe_session
+    if _probe_session is None:
+        _probe_session = create_session(pool_size=1, retries=0)
+    try:
+        return _probe_session.head(f"{base_url}/health", timeout=timeout).status_code
+    except Exception:
+        return None
+
+def close():
+    """Close pooled connections"""
+    global _session
+    with _session_lock:
+        session, _session = _session, None
+    if session is not None:
+        session.close()
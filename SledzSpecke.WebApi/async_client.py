@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Async counterpart of api_client for scripts that fire many requests at once.
+
+Uses httpx.AsyncClient when httpx is installed. Without it, requests go
+through api_client's pooled session on a thread pool sized like the
+connection pool, so asyncio.gather() still overlaps them:
+
+    async with AsyncClient(token=token) as client:
+        responses = await asyncio.gather(*(client.post(url, json=data) for data in payloads))
+
+Responses from both backends expose status_code, text and json().
+"""
+
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+import api_client
+
+try:
+    import httpx
+except ImportError:  # fall back to api_client on worker threads
+    httpx = None
+
+class AsyncClient:
+    """Bearer-authenticated async HTTP client with a bounded connection pool"""
+
+    def __init__(self, token: Optional[str] = None, max_connections: int = api_client.DEFAULT_POOL_SIZE,
+                 timeout: float = api_client.DEFAULT_TIMEOUT):
+        self.token = token
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self._client = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    @property
+    def backend(self) -> str:
+        return "httpx" if httpx is not None else "threads"
+
+    async def __aenter__(self) -> "AsyncClient":
+        if httpx is not None:
+            limits = httpx.Limits(max_connections=self.max_connections,
+                                  max_keepalive_connections=self.max_connections)
+            self._client = httpx.AsyncClient(timeout=self.timeout, limits=limits)
+        else:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_connections)
+        return self
+
+    async def __aexit__(self, *exc_info):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    def set_token(self, token: Optional[str]):
+        self.token = token
+
+    async def request(self, method: str, url: str, **kwargs):
+        if self.token:
+            kwargs["headers"] = {**api_client.auth_headers(self.token), **kwargs.get("headers", {})}
+        if self._client is not None:
+            return await self._client.request(method, url, **kwargs)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor,
+                                          functools.partial(api_client.request, method, url, **kwargs))
+
+    async def get(self, url: str, **kwargs):
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs):
+        return await self.request("POST", url, **kwargs)
+
+    async def put(self, url: str, **kwargs):
+        return await self.request("PUT", url, **kwargs)
+
+    async def delete(self, url: str, **kwargs):
+        return await self.request("DELETE", url, **kwargs)
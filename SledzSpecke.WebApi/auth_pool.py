@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Token cache and test-user pool for authenticated API test runs.
+
+TokenCache keeps JWTs with their expiry in a JSON file
+(~/.cache/sledzspecke/tokens.json, override with SLEDZSPECKE_TOKEN_CACHE;
+set it to an empty string to disable the disk cache). A cached token is
+reused until it gets within `refresh_margin` seconds of expiry, then the
+user signs in again - so repeated runs skip sign-up and the password
+hashing behind /auth/sign-in, and long runs never send an expired token.
+With verify=True a cached token the API answers 401 to (database reset,
+rotated signing key) is dropped and the user signs in again.
+
+UserPool provisions a fixed set of users (loaduser_000, loaduser_001, ...)
+in parallel and hands them out to concurrent workers, so parallel and load
+runs don't all share one account:
+
+    pool = UserPool(API_BASE_URL, size=20)
+    pool.provision()
+    with pool.user() as user:
+        api_client.get(url, headers=api_client.auth_headers(user.token))
+"""
+
+import base64
+import json
+import os
+import queue
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Union
+
+import api_client
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "sledzspecke", "tokens.json")
+TOKEN_CACHE_PATH = os.environ.get("SLEDZSPECKE_TOKEN_CACHE", DEFAULT_CACHE_PATH)
+DEFAULT_REFRESH_MARGIN = 120.0
+# Used when a token carries no readable "exp" claim
+DEFAULT_TOKEN_LIFETIME = 15 * 60.0
+
+def read_access_token(body: Dict[str, Any]) -> Optional[str]:
+    """The API has returned both 'AccessToken' and 'accessToken' over time"""
+    return body.get("AccessToken") or body.get("accessToken")
+
+def token_expiry(token: str) -> Optional[float]:
+    """Unix time from the JWT 'exp' claim (signature is not verified)"""
+    try:
+        payload = token.split(".")[1]
+        payload += "=" * (-len(payload) % 4)
+        return float(json.loads(base64.urlsafe_b64decode(payload))["exp"])
+    except (IndexError, KeyError, ValueError, TypeError):
+        return None
+
+def sign_in(base_url: str, username: str, password: str) -> Optional[str]:
+    """POST /auth/sign-in; returns the JWT or None"""
+    response = api_client.post(f"{base_url}/auth/sign-in",
+                               json={"username": username, "password": password})
+    if response.status_code != 200:
+        return None
+    return read_access_token(response.json())
+
+def token_rejected(base_url: str, token: str) -> bool:
+    """True when GET /users/me answers 401 to the token"""
+    response = api_client.get(f"{base_url}/users/me", headers=api_client.auth_headers(token))
+    return response.status_code == 401
+
+def sign_up(base_url: str, username: str, password: str,
+            smk_version: Union[int, str] = 1, specialization_id: int = 1) -> bool:
+    """POST /auth/sign-up; an already existing user counts as success"""
+    response = api_client.post(f"{base_url}/auth/sign-up", json={
+        "username": username,
+        "password": password,
+        "fullName": f"Test User {username}",
+        "email": f"{username}@example.com",
+        "smkVersion": smk_version,
+        "specializationId": specialization_id,
+    })
+    return response.status_code in (200, 201) or "already in use" in response.text.lower()
+
+class TokenCache:
+    """JWTs keyed by (API URL, username), persisted to disk"""
+
+    def __init__(self, path: Optional[str] = TOKEN_CACHE_PATH,
+                 refresh_margin: float = DEFAULT_REFRESH_MARGIN):
+        self.path = path or None
+        self.refresh_margin = refresh_margin
+        self._entries: Dict[str, Dict[str, Any]] = self._load()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(base_url: str, username: str) -> str:
+        return f"{base_url.rstrip('/')}|{username}"
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        if not self.path or not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save(self):
+        if not self.path:
+            return
+        # Merge with what other processes wrote since we loaded
+        entries = self._load()
+        entries.update(self._entries)
+        now = time.time()
+        entries = {key: entry for key, entry in entries.items() if entry["expires_at"] > now}
+        self._entries = entries
+
+        directory = os.path.dirname(self.path)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tokens-")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(entries, f)
+            os.chmod(tmp_path, 0o600)  # bearer tokens
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def get(self, base_url: str, username: str) -> Optional[str]:
+        """A cached token that is not about to expire, or None"""
+        with self._lock:
+            entry = self._entries.get(self._key(base_url, username))
+        if entry and entry["expires_at"] - time.time() > self.refresh_margin:
+            return entry["token"]
+        return None
+
+    def put(self, base_url: str, username: str, token: str):
+        expires_at = token_expiry(token) or time.time() + DEFAULT_TOKEN_LIFETIME
+        with self._lock:
+            self._entries[self._key(base_url, username)] = {"token": token, "expires_at": expires_at}
+            self._save()
+
+    def invalidate(self, base_url: str, username: str):
+        with self._lock:
+            self._entries.pop(self._key(base_url, username), None)
+            self._save()
+
+    def token(self, base_url: str, username: str, password: str,
+              create_user: Optional[Callable[[], bool]] = None, verify: bool = False) -> Optional[str]:
+        """Cached token, or sign in (creating the user first if sign-in fails).
+
+        With `verify` a cached token is checked against the API first.
+        """
+        token = self.get(base_url, username)
+        if token and not (verify and token_rejected(base_url, token)):
+            return token
+        if token:
+            self.invalidate(base_url, username)
+        token = sign_in(base_url, username, password)
+        if token is None and create_user is not None and create_user():
+            token = sign_in(base_url, username, password)
+        if token:
+            self.put(base_url, username, token)
+        return token
+
+class PooledUser:
+    """A provisioned user; `data` holds per-user fixtures (e.g. internship id)"""
+
+    def __init__(self, username: str, password: str, token: str):
+        self.username = username
+        self.password = password
+        self.token = token
+        self.data: Dict[str, Any] = {}
+
+class UserPool:
+    """Fixed set of test users that concurrent workers check out"""
+
+    def __init__(self, base_url: str, size: int, prefix: str = "loaduser",
+                 password: str = "Test123!", cache: Optional[TokenCache] = None,
+                 smk_version: Union[int, str] = 1, specialization_id: int = 1, workers: int = 16):
+        self.base_url = base_url
+        self.size = size
+        self.prefix = prefix
+        self.password = password
+        self.cache = cache or TokenCache()
+        self.smk_version = smk_version
+        self.specialization_id = specialization_id
+        self.workers = workers
+        self.users: List[PooledUser] = []
+        self._available: "queue.Queue[PooledUser]" = queue.Queue()
+
+    def _provision_one(self, index: int) -> Optional[PooledUser]:
+        username = f"{self.prefix}_{index:03d}"
+        token = self.cache.token(
+            self.base_url, username, self.password,
+            create_user=lambda: sign_up(self.base_url, username, self.password,
+                                        self.smk_version, self.specialization_id))
+        return PooledUser(username, self.password, token) if token else None
+
+    def provision(self, setup: Optional[Callable[[PooledUser], None]] = None) -> int:
+        """Create/sign in all users in parallel; returns how many are usable.
+
+        `setup(user)` runs for each user right after sign-in, e.g. to create
+        the internship the user's requests will reference.
+        """
+        def provision_one(index: int) -> Optional[PooledUser]:
+            user = self._provision_one(index)
+            if user and setup:
+                setup(user)
+            return user
+
+        with ThreadPoolExecutor(max_workers=max(1, min(self.workers, self.size))) as executor:
+            users = [user for user in executor.map(provision_one, range(self.size)) if user]
+        self.users = users
+        for user in users:
+            self._available.put(user)
+        return len(users)
+
+    def _refresh(self, user: PooledUser):
+        if self.cache.get(self.base_url, user.username) != user.token:
+            token = self.cache.token(self.base_url, user.username, user.password)
+            if token:
+                user.token = token
+
+    def checkout(self, timeout: Optional[float] = None) -> PooledUser:
+        user = self._available.get(timeout=timeout)
+        self._refresh(user)
+        return user
+
+    def checkin(self, user: PooledUser):
+        self._available.put(user)
+
+    @contextmanager
+    def user(self, timeout: Optional[float] = None) -> Iterator[PooledUser]:
+        user = self.checkout(timeout)
+        try:
+            yield user
+        finally:
+            self.checkin(user)
@@ -0,0 +1,367 @@
+#!/usr/bin/env python3
+"""
+Throughput benchmark for the export endpoints.
+
+The XLSX exports are the heaviest requests the API serves, and their cost
+grows with the amount of data a resident has logged. For every data size
+(--sizes, procedures per user) this script provisions a small pool of
+users holding exactly that many procedures, then downloads each export at
+every concurrency level (--concurrency) and reports:
+
+- time to first byte (when the status line and headers arrive) and total
+  download time;
+- bytes/sec per download and aggregate throughput per level - bodies are
+  read as a stream with iter_content(), never buffered in memory;
+- the API process's peak RSS during each level, when --server-pid is given;
+- how the single-download time scales with the number of procedures;
+- the XLSX export's latency budget (harness/budgets.py), checked over the
+  downloads at the lowest concurrency level, where they don't queue behind
+  each other. With stream=True the recorded latency is the time until the
+  headers arrive, i.e. until the API has built the workbook.
+
+    python3 benchmark_export.py --sizes 0 100 500 2000 --concurrency 1 4 16 64
+
+Benchmark users are named exportbench_p<size>_NNN and are topped up to the
+requested procedure count, so re-runs reuse the data seeded earlier.
+"""
+
+import argparse
+import json
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+import api_client
+import auth_pool
+from harness import budgets, procfs
+from harness.output import Colors
+from perf_regression import linear_trend, quantile
+from seed_data import SeedPlan, print_error, print_info, run_bounded
+
+API_BASE_URL = "http://localhost:5000/api"
+DEFAULT_SIZES = (0, 100, 500, 2000)
+DEFAULT_CONCURRENCY = (1, 4, 16, 64)
+CHUNK_SIZE = 64 * 1024
+# Seeded users are Old SMK users of specialization 1 (Cardiology Old SMK,
+# modules 101 and 102) holding the data of SeedPlan user 1, an Old SMK user
+SPECIALIZATION_ID = 1
+PLAN_USER = 1
+
+ENDPOINTS = {
+    "export-xlsx": "/export/specialization/{id}/xlsx",
+    "export-preview": "/export/specialization/{id}/preview",
+    "smk-xlsx": "/smk/export/{id}/xlsx",
+}
+
+class Download:
+    """One streamed export download"""
+
+    def __init__(self, status: int, ttfb: float, total: float, size: int, error: str = ""):
+        self.status = status
+        self.ttfb = ttfb
+        self.total = total
+        self.size = size
+        self.error = error
+
+    @property
+    def ok(self) -> bool:
+        return self.status == 200 and not self.error
+
+def download(url: str, token: str) -> Download:
+    """GET url and read the body in chunks; TTFB is taken when the headers arrive"""
+    start = time.perf_counter()
+    ttfb = None
+    size = 0
+    try:
+        # With stream=True the call returns once the status line and headers are read
+        response = api_client.get(url, headers=api_client.auth_headers(token), stream=True)
+        ttfb = time.perf_counter() - start
+        with response:
+            for chunk in response.iter_content(CHUNK_SIZE):
+                size += len(chunk)
+    except Exception as e:
+        elapsed = time.perf_counter() - start
+        return Download(0, elapsed if ttfb is None else ttfb, elapsed, size, f"{type(e).__name__}: {e}")
+    return Download(response.status_code, ttfb, time.perf_counter() - start, size)
+
+class PeakRss:
+    """Samples a process's RSS in the background and keeps the maximum"""
+
+    def __init__(self, pid: Optional[int], interval: float = 0.05):
+        self.pid = pid
+        self.interval = interval
+        self.start_kb: Optional[int] = None
+        self.peak_kb: Optional[int] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _sample(self):
+        sample = procfs.read_sample(self.pid)
+        rss = sample.rss_kb if sample else None
+        if rss is not None and (self.peak_kb is None or rss > self.peak_kb):
+            self.peak_kb = rss
+        return rss
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def __enter__(self) -> "PeakRss":
+        if self.pid:
+            self.start_kb = self._sample()
+            self._thread = threading.Thread(target=self._run, name="rss-sampler", daemon=True)
+            self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        if self._thread:
+            self._stop.set()
+            self._thread.join()
+            self._sample()
+
+class LevelResult:
+    """All downloads of one endpoint at one data size and concurrency"""
+
+    def __init__(self, endpoint: str, procedures: int, concurrency: int, downloads: List[Download],
+                 wall: float, rss: PeakRss):
+        self.endpoint = endpoint
+        self.procedures = procedures
+        self.concurrency = concurrency
+        self.downloads = downloads
+        self.wall = wall
+        self.rss_start_kb = rss.start_kb
+        self.rss_peak_kb = rss.peak_kb
+
+    @property
+    def ok(self) -> List[Download]:
+        return [d for d in self.downloads if d.ok]
+
+    @property
+    def errors(self) -> int:
+        return len(self.downloads) - len(self.ok)
+
+    def percentile(self, attr: str, pct: float) -> Optional[float]:
+        values = [getattr(d, attr) for d in self.ok]
+        return quantile(values, pct) if values else None
+
+    @property
+    def bytes_per_download(self) -> Optional[float]:
+        ok = self.ok
+        return sum(d.size for d in ok) / len(ok) if ok else None
+
+    @property
+    def per_download_bps(self) -> Optional[float]:
+        """Median bytes/sec a single client sees"""
+        rates = [d.size / d.total for d in self.ok if d.total > 0]
+        return quantile(rates, 50) if rates else None
+
+    @property
+    def aggregate_bps(self) -> float:
+        return sum(d.size for d in self.ok) / self.wall if self.wall > 0 else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "endpoint": self.endpoint,
+            "procedures": self.procedures,
+            "concurrency": self.concurrency,
+            "downloads": len(self.downloads),
+            "errors": self.errors,
+            "wall_s": self.wall,
+            "ttfb_p50_s": self.percentile("ttfb", 50),
+            "total_p50_s": self.percentile("total", 50),
+            "total_p95_s": self.percentile("total", 95),
+            "bytes_per_download": self.bytes_per_download,
+            "per_download_bps": self.per_download_bps,
+            "aggregate_bps": self.aggregate_bps,
+            "server_rss_start_kb": self.rss_start_kb,
+            "server_rss_peak_kb": self.rss_peak_kb,
+        }
+
+def count_procedures(base_url: str, token: str) -> int:
+    response = api_client.get(f"{base_url}/procedures", headers=api_client.auth_headers(token))
+    if response.status_code != 200:
+        return 0
+    body = response.json()
+    if isinstance(body, dict):
+        body = body.get("items", body.get("Items", []))
+    return len(body)
+
+def provision_size(args, plan: SeedPlan, procedures: int) -> auth_pool.UserPool:
+    """Users holding `procedures` procedures each; missing ones are created"""
+    def setup(user: auth_pool.PooledUser):
+        existing = count_procedures(args.url, user.token)
+        if existing >= procedures:
+            return
+        headers = api_client.auth_headers(user.token)
+        # Every user gets the same data (PLAN_USER), so all users of a size are comparable
+        internship_ids = []
+        for n in range(plan.internships):
+            response = api_client.post(f"{args.url}/internships", json=plan.internship(PLAN_USER, n), headers=headers)
+            if response.status_code not in (200, 201):
+                raise RuntimeError(f"{user.username}: POST /internships returned {response.status_code}")
+            internship_ids.append(response.json())
+
+        failures = []
+
+        def create(n: int):
+            payload = plan.procedure(PLAN_USER, n, internship_ids[n % len(internship_ids)])
+            response = api_client.post(f"{args.url}/procedures", json=payload, headers=headers)
+            if response.status_code not in (200, 201):
+                failures.append(response.status_code)
+
+        run_bounded((lambda n=n: create(n) for n in range(existing, procedures)), args.in_flight)
+        if failures:
+            print_error(f"{user.username}: {len(failures)} procedures not created (HTTP {failures[0]})")
+
+    pool = auth_pool.UserPool(args.url, args.users, prefix=f"exportbench_p{procedures}",
+                              smk_version="Old", specialization_id=SPECIALIZATION_ID, workers=args.users)
+    start = time.perf_counter()
+    ready = pool.provision(setup)
+    print_info(f"{ready}/{args.users} users with {procedures} procedures ready "
+               f"in {time.perf_counter() - start:.1f}s")
+    return pool
+
+def run_level(args, pool: auth_pool.UserPool, endpoint: str, procedures: int, concurrency: int) -> LevelResult:
+    """`concurrency` workers each download the export --repeat times"""
+    url = f"{args.url}{ENDPOINTS[endpoint].format(id=SPECIALIZATION_ID)}"
+    users = pool.users
+
+    def worker(index: int) -> List[Download]:
+        # Round-robin over the pool: concurrent exports of different users' data
+        token = users[index % len(users)].token
+        return [download(url, token) for _ in range(args.repeat)]
+
+    with PeakRss(args.server_pid) as rss:
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="export") as executor:
+            downloads = [d for batch in executor.map(worker, range(concurrency)) for d in batch]
+        wall = time.perf_counter() - start
+    return LevelResult(endpoint, procedures, concurrency, downloads, wall, rss)
+
+def _ms(seconds: Optional[float]) -> str:
+    return f"{seconds * 1000:8.1f}" if seconds is not None else f"{'-':>8}"
+
+def _size(value: Optional[float]) -> str:
+    if value is None:
+        return f"{'-':>9}"
+    for unit in ("B", "kB", "MB"):
+        if value < 1024 or unit == "MB":
+            return f"{value:7.1f}{unit:>2}"
+        value /= 1024
+
+def format_results(results: List[LevelResult]) -> List[str]:
+    lines = [f"{'endpoint':<15} {'procs':>6} {'conc':>4} {'ok':>5} {'ttfb p50':>8} {'p50 ms':>8} "
+             f"{'p95 ms':>8} {'size':>9} {'per dl/s':>9} {'total/s':>9} {'rss peak':>9}"]
+    for r in results:
+        rss = None if r.rss_peak_kb is None else r.rss_peak_kb * 1024.0
+        lines.append(f"{r.endpoint:<15} {r.procedures:>6} {r.concurrency:>4} "
+                     f"{len(r.ok):>2}/{len(r.downloads):<2} {_ms(r.percentile('ttfb', 50))} "
+                     f"{_ms(r.percentile('total', 50))} {_ms(r.percentile('total', 95))} "
+                     f"{_size(r.bytes_per_download)} {_size(r.per_download_bps)} "
+                     f"{_size(r.aggregate_bps)} {_size(rss)}")
+    return lines
+
+def format_scaling(results: List[LevelResult]) -> List[str]:
+    """Per endpoint: fixed cost plus cost per 100 procedures, from single-client runs"""
+    lines = []
+    if not results:
+        return lines
+    lowest = min(r.concurrency for r in results)
+    for endpoint in ENDPOINTS:
+        single = [r for r in results if r.endpoint == endpoint and r.concurrency == lowest and r.ok]
+        time_fit = linear_trend([(r.procedures, r.percentile("total", 50) * 1000) for r in single])
+        size_fit = linear_trend([(r.procedures, r.bytes_per_download) for r in single])
+        if time_fit is None:
+            continue
+        line = f"{endpoint:<15} {time_fit.intercept:7.1f} ms + {time_fit.slope * 100:7.2f} ms per 100 procedures"
+        if size_fit is not None:
+            line += f", {size_fit.slope:7.1f} bytes per procedure"
+        lines.append(line)
+    return lines
+
+def benchmark(args) -> bool:
+    api_client.configure(pool_size=max(max(args.concurrency), args.in_flight, api_client.DEFAULT_POOL_SIZE))
+    plan = SeedPlan(args.seed, internships=2, procedures=max(args.sizes), shifts=0)
+    results: List[LevelResult] = []
+    budget_tracker = budgets.BudgetTracker()
+    for procedures in args.sizes:
+        pool = provision_size(args, plan, procedures)
+        if not pool.users:
+            print_error(f"No users available for size {procedures}, skipping")
+            continue
+        for endpoint in args.endpoints:
+            # One untimed download: JIT and first-query caches should not count
+            download(f"{args.url}{ENDPOINTS[endpoint].format(id=SPECIALIZATION_ID)}", pool.users[0].token)
+            for concurrency in args.concurrency:
+                if concurrency == min(args.concurrency):
+                    api_client.add_listener(budget_tracker.observe)
+                try:
+                    result = run_level(args, pool, endpoint, procedures, concurrency)
+                finally:
+                    api_client.remove_listener(budget_tracker.observe)
+                results.append(result)
+                print(format_results([result])[-1], flush=True)
+
+    print(f"\n{Colors.HEADER}{Colors.BOLD}Export benchmark{Colors.ENDC}")
+    for line in format_results(results):
+        print(line)
+    scaling = format_scaling(results)
+    if scaling:
+        print(f"\n{Colors.BOLD}Single-download cost vs. procedure count{Colors.ENDC}")
+        for line in scaling:
+            print(line)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump([r.to_dict() for r in results], f, indent=2)
+        print_info(f"Results written to {args.output}")
+
+    budgets_ok = check_budgets(budget_tracker, args.budgets)
+    errors = sum(r.errors for r in results)
+    if errors:
+        print_error(f"{errors} downloads failed")
+    return bool(results) and not errors and budgets_ok
+
+def check_budgets(tracker: budgets.BudgetTracker, mode: str) -> bool:
+    """Print the export budgets that got samples; False when one is exceeded"""
+    results = tracker.check(mode)
+    if results:
+        print(f"\n{Colors.BOLD}Latency budgets{Colors.ENDC}")
+    for result in results:
+        color = {"passed": Colors.OKGREEN, "failed": Colors.FAIL}.get(result.status, Colors.WARNING)
+        print(f"{color}{result.status:<12}{Colors.ENDC} {result}")
+    return budgets.budgets_passed(results)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the SledzSpecke export endpoints")
+    parser.add_argument("--url", default=API_BASE_URL, help="API base URL")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES),
+                        help="Procedures per user, one benchmark round per size")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=list(DEFAULT_CONCURRENCY),
+                        help="Simultaneous downloads per level")
+    parser.add_argument("--endpoints", nargs="+", choices=list(ENDPOINTS), default=list(ENDPOINTS))
+    parser.add_argument("--repeat", type=int, default=3, help="Downloads per worker at each level")
+    parser.add_argument("--users", type=int, default=4, help="Users per data size")
+    parser.add_argument("--in-flight", type=int, default=16, help="Concurrent requests while seeding")
+    parser.add_argument("--seed", type=int, default=1, help="Random seed for generated data")
+    parser.add_argument("--server-pid", type=int, help="Local API process to sample RSS from")
+    parser.add_argument("--budgets", choices=budgets.MODES, default="enforce",
+                        help="Latency budgets: fail on exceeded budgets, only warn, or skip them")
+    parser.add_argument("--output", help="Write the results as JSON")
+    args = parser.parse_args()
+    if min(args.concurrency) < 1 or args.repeat < 1 or args.users < 1:
+        parser.error("--concurrency, --repeat and --users must be at least 1")
+    args.sizes = sorted(set(args.sizes))
+
+    print(f"{Colors.HEADER}{Colors.BOLD}SledzSpecke Export Benchmark{Colors.ENDC}")
+    print(f"sizes {args.sizes} x concurrency {args.concurrency} against {args.url}")
+    try:
+        sys.exit(0 if benchmark(args) else 1)
+    except KeyboardInterrupt:
+        print(f"\n{Colors.WARNING}Interrupted{Colors.ENDC}")
+        sys.exit(130)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+Background `dotnet build` for the verification scripts.
+
+The build is the slowest step of test_completed_features.py and
+test_module_validation.py, so they start it first and run their static
+source checks while it compiles:
+
+    build = BuildRunner()
+    build.start()
+    ...static checks...
+    result = build.wait()
+
+Output is read line by line as the build produces it (and optionally
+written to a log file), so memory stays flat and errors, warnings and
+per-project completion times are collected on the fly. The build runs
+with `-clp:PerformanceSummary`; its "Project Performance Summary" gives
+the time MSBuild spent in each project.
+
+A warm incremental build is told apart from a cold one by comparing the
+intermediate assemblies under each project's obj/ before and after the
+build: a project whose assembly was not rewritten was up to date.
+"""
+
+import glob
+import os
+import re
+import subprocess
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Optional, Sequence
+
+DEFAULT_BUILD_ARGS = ["-clp:PerformanceSummary"]
+
+# .sln entries: Project("{type-guid}") = "Name", "relative\path.csproj", "{guid}"
+_SLN_PROJECT = re.compile(r'^Project\("\{[^}]+\}"\)\s*=\s*"[^"]*",\s*"([^"]+\.(?:cs|fs|vb)proj)"', re.M)
+# file(line,col): warning CS8618: message [/path/Project.csproj]
+_DIAGNOSTIC = re.compile(r"^(?P<location>.*?): (?P<level>warning|error) (?P<code>\w+): (?P<message>.*?)"
+                         r"(?: \[(?P<project>[^\]]+)\])?$")
+# "  SledzSpecke.Core -> /path/bin/Debug/net9.0/SledzSpecke.Core.dll"
+_PROJECT_OUTPUT = re.compile(r"^\s+(?P<name>[\w.]+) -> (?P<output>\S.*)$")
+# Top-level rows of the performance summary; nested target rows are indented further
+_SUMMARY_ROW = re.compile(r"^\s{0,10}(?P<ms>\d+) ms\s+(?P<project>\S+\.(?:cs|fs|vb)proj)\s+(?P<calls>\d+) calls")
+_TIME_ELAPSED = re.compile(r"^Time Elapsed (\d+):(\d+):(\d+(?:\.\d+)?)")
+
+class Diagnostic:
+    """One compiler or MSBuild warning/error"""
+
+    def __init__(self, level: str, code: str, message: str, location: str, project: Optional[str]):
+        self.level = level
+        self.code = code
+        self.message = message
+        self.location = location
+        self.project = project
+
+    def __str__(self) -> str:
+        project = f" [{_project_name(self.project)}]" if self.project else ""
+        return f"{self.location}: {self.code}: {self.message}{project}"
+
+class BuildResult:
+    """Everything collected from one build"""
+
+    def __init__(self):
+        self.returncode: Optional[int] = None
+        self.elapsed = 0.0              # wall time seen by us
+        self.waited = 0.0               # part of it spent blocked in wait()
+        self.msbuild_elapsed: Optional[float] = None  # "Time Elapsed" line
+        self.warnings: List[Diagnostic] = []
+        self.errors: List[Diagnostic] = []
+        self.project_ms: Dict[str, int] = {}          # project name -> summary time
+        self.project_finished: Dict[str, float] = {}  # project name -> seconds after start
+        self.projects: List[str] = []
+        self.recompiled: List[str] = []
+        self.cold = True
+        self.tail: List[str] = []
+
+    @property
+    def succeeded(self) -> bool:
+        return self.returncode == 0
+
+    @property
+    def kind(self) -> str:
+        """'cold', 'warm' or 'up-to-date'"""
+        if self.cold:
+            return "cold"
+        return "warm" if self.recompiled else "up-to-date"
+
+def _project_name(path: str) -> str:
+    return os.path.splitext(os.path.basename(path.replace("\\", "/")))[0]
+
+def find_projects(cwd: str = ".") -> List[str]:
+    """Project files `dotnet build` will build from `cwd` (the solution's, if there is one)"""
+    solutions = glob.glob(os.path.join(cwd, "*.sln"))
+    if len(solutions) == 1:
+        with open(solutions[0], encoding="utf-8-sig") as f:
+            entries = _SLN_PROJECT.findall(f.read())
+        base = os.path.dirname(solutions[0])
+        return [os.path.normpath(os.path.join(base, entry.replace("\\", "/"))) for entry in entries]
+    return sorted(glob.glob(os.path.join(cwd, "**", "*.csproj"), recursive=True))
+
+def _intermediate_assemblies(project: str) -> Dict[str, float]:
+    """mtime of every obj/<config>/<tfm>/<Name>.dll of a project"""
+    name = _project_name(project)
+    pattern = os.path.join(os.path.dirname(project), "obj", "*", "*", f"{name}.dll")
+    stamps = {}
+    for path in glob.glob(pattern):
+        try:
+            stamps[path] = os.stat(path).st_mtime_ns
+        except OSError:
+            pass
+    return stamps
+
+class BuildRunner:
+    """Runs `dotnet build` in the background and parses its output as it streams"""
+
+    def __init__(self, cwd: str = ".", args: Sequence[str] = DEFAULT_BUILD_ARGS,
+                 log_path: Optional[str] = None, tail_lines: int = 40):
+        self.cwd = cwd
+        self.command = ["dotnet", "build", *args]
+        self.log_path = log_path
+        self.tail_lines = tail_lines
+        self.result = BuildResult()
+        self._process: Optional[subprocess.Popen] = None
+        self._reader: Optional[threading.Thread] = None
+        self._started = 0.0
+        self._before: Dict[str, Dict[str, float]] = {}
+        self._seen = set()
+
+    def start(self) -> "BuildRunner":
+        projects = find_projects(self.cwd)
+        self.result.projects = [_project_name(project) for project in projects]
+        self._before = {project: _intermediate_assemblies(project) for project in projects}
+        self._started = time.perf_counter()
+        try:
+            self._process = subprocess.Popen(self.command, cwd=self.cwd, stdout=subprocess.PIPE,
+                                             stderr=subprocess.STDOUT, text=True, bufsize=1,
+                                             errors="replace")
+        except OSError as e:
+            self.result.returncode = -1
+            self.result.tail = [f"Cannot run {' '.join(self.command)}: {e}"]
+            return self
+        self._reader = threading.Thread(target=self._read, daemon=True)
+        self._reader.start()
+        return self
+
+    def _read(self):
+        log = open(self.log_path, "w", encoding="utf-8") if self.log_path else None
+        tail: "deque[str]" = deque(maxlen=self.tail_lines)
+        in_project_summary = False
+        try:
+            for line in self._process.stdout:
+                if log:
+                    log.write(line)
+                line = line.rstrip("\n")
+                tail.append(line)
+
+                if line.endswith("Performance Summary:"):
+                    in_project_summary = line == "Project Performance Summary:"
+                    continue
+                if in_project_summary:
+                    row = _SUMMARY_ROW.match(line)
+                    if row:
+                        name = _project_name(row.group("project"))
+                        # Restore and build both show up; add them together
+                        self.result.project_ms[name] = self.result.project_ms.get(name, 0) + int(row.group("ms"))
+                    continue
+                self._parse_line(line)
+        finally:
+            if log:
+                log.close()
+            self.result.tail = list(tail)
+
+    def _parse_line(self, line: str):
+        diagnostic = _DIAGNOSTIC.match(line)
+        if diagnostic:
+            # MSBuild repeats every diagnostic in its final summary
+            if line not in self._seen:
+                self._seen.add(line)
+                item = Diagnostic(diagnostic.group("level"), diagnostic.group("code"),
+                                  diagnostic.group("message"), diagnostic.group("location"),
+                                  diagnostic.group("project"))
+                (self.result.warnings if item.level == "warning" else self.result.errors).append(item)
+            return
+        output = _PROJECT_OUTPUT.match(line)
+        if output and output.group("name") not in self.result.project_finished:
+            self.result.project_finished[output.group("name")] = time.perf_counter() - self._started
+            return
+        elapsed = _TIME_ELAPSED.match(line)
+        if elapsed:
+            hours, minutes, seconds = elapsed.groups()
+            self.result.msbuild_elapsed = int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+
+    def wait(self) -> BuildResult:
+        """Block until the build is done; returns the parsed result"""
+        # Several suites may share one build; only the first wait() collects it
+        if self._process is None or self.result.returncode is not None:
+            return self.result
+        wait_started = time.perf_counter()
+        self.result.returncode = self._process.wait()
+        self._reader.join()
+        self.result.elapsed = time.perf_counter() - self._started
+        self.result.waited = time.perf_counter() - wait_started
+
+        self.result.cold = not any(self._before.values())
+        self.result.recompiled = [_project_name(project) for project, before in self._before.items()
+                                  if _intermediate_assemblies(project) != before]
+        return self.result
+
+def format_build_report(result: BuildResult) -> List[str]:
+    """Human-readable lines: build kind, slowest projects, warnings by code"""
+    lines = [f"{result.kind.capitalize()} build in {result.elapsed:.1f}s"
+             + (f" (MSBuild: {result.msbuild_elapsed:.1f}s)" if result.msbuild_elapsed is not None else "")
+             + f", {result.elapsed - result.waited:.1f}s of it overlapped with the static checks"]
+    if not result.cold and result.projects:
+        lines.append(f"{len(result.recompiled)} of {len(result.projects)} projects recompiled"
+                     + (f": {', '.join(result.recompiled)}" if result.recompiled else ""))
+    for name, ms in sorted(result.project_ms.items(), key=lambda item: -item[1]):
+        finished = result.project_finished.get(name)
+        done = f", done at {finished:.1f}s" if finished is not None else ""
+        lines.append(f"  {name}: {ms / 1000:.2f}s{done}")
+    if result.warnings:
+        by_code: Dict[str, int] = {}
+        for warning in result.warnings:
+            by_code[warning.code] = by_code.get(warning.code, 0) + 1
+        codes = ", ".join(f"{code} x{count}" for code, count in sorted(by_code.items(), key=lambda item: -item[1]))
+        lines.append(f"{len(result.warnings)} warning(s): {codes}")
+    return lines
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Declarative API case files and a concurrent runner for them.
+
+A case file (JSON, or YAML when PyYAML is installed) describes requests
+against one endpoint:
+
+    {
+      "method": "POST",
+      "endpoint": "/procedures",
+      "expect_status": [201],
+      "base": {"internshipId": "$internship_id", "date": "$now", "year": 1},
+      "cases": [
+        {"name": "Minimal Procedure", "data": {"code": "MIN001"}}
+      ],
+      "matrix": [
+        {"name": "SMK field mix",
+         "variants": {"smk": {"old": {"operatorCode": "A"}, "new": {"countA": 1}}},
+         "values": {"date": ["$now", "$now-30d"], "year": [1, 6]},
+         "sample": 500}
+      ]
+    }
+
+Each case's `data` is merged over `base`. A matrix expands into the
+cartesian product of its axes: a `variants` axis merges one named field
+group, a `values` axis sets one field. `sample` picks a seeded random subset
+of the combinations. Any case or matrix may override `expect_status`.
+
+String values are substituted when the cases are expanded: `$name` takes a
+value from the caller's context (e.g. `$internship_id`), and `$now`,
+`$now+90d` or `$now-30d` become an ISO timestamp relative to now.
+
+run_cases() posts the cases from a thread pool. Large sets are split into
+shards that run in separate processes, each with its own thread pool and
+connection pool.
+"""
+
+import itertools
+import json
+import multiprocessing
+import os
+import random
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+import api_client
+
+try:
+    import yaml
+except ImportError:  # YAML case files are optional
+    yaml = None
+
+DEFAULT_SHARD_SIZE = 500
+_NOW_PATTERN = re.compile(r"^\$now(?:([+-]\d+)d)?$")
+
+class Case:
+    """One request with its expected status codes"""
+
+    def __init__(self, name: str, method: str, endpoint: str, data: Dict[str, Any],
+                 expect_status: List[int]):
+        self.name = name
+        self.method = method
+        self.endpoint = endpoint
+        self.data = data
+        self.expect_status = expect_status
+
+class CaseResult:
+    """Outcome of one case; plain attributes so it pickles across processes"""
+
+    def __init__(self, name: str, passed: bool, status: Optional[int], elapsed: float,
+                 body: Any = None, message: str = ""):
+        self.name = name
+        self.passed = passed
+        self.status = status
+        self.elapsed = elapsed
+        self.body = body
+        self.message = message
+
+def load_case_file(path: str) -> Dict[str, Any]:
+    with open(path, encoding="utf-8") as f:
+        if path.endswith((".yml", ".yaml")):
+            if yaml is None:
+                raise RuntimeError(f"{path}: install PyYAML to use YAML case files")
+            return yaml.safe_load(f)
+        return json.load(f)
+
+def substitute(value: Any, context: Dict[str, Any], now: datetime) -> Any:
+    """Replace $placeholders in strings, recursing into lists and dicts"""
+    if isinstance(value, dict):
+        return {key: substitute(item, context, now) for key, item in value.items()}
+    if isinstance(value, list):
+        return [substitute(item, context, now) for item in value]
+    if isinstance(value, str) and value.startswith("$"):
+        match = _NOW_PATTERN.match(value)
+        if match:
+            return (now + timedelta(days=int(match.group(1) or 0))).isoformat()
+        if value[1:] in context:
+            return context[value[1:]]
+        raise KeyError(f"Unknown placeholder {value}")
+    return value
+
+def _axis_label(value: Any) -> str:
+    return value if isinstance(value, str) else json.dumps(value)
+
+def expand_matrix(matrix: Dict[str, Any], seed: int = 0) -> List[Tuple[str, Dict[str, Any]]]:
+    """(name, data) for every combination of the matrix axes"""
+    axes = []
+    for axis, groups in matrix.get("variants", {}).items():
+        axes.append([(f"{axis}={label}", fields) for label, fields in groups.items()])
+    for field, values in matrix.get("values", {}).items():
+        axes.append([(f"{field}={_axis_label(value)}", {field: value}) for value in values])
+
+    combinations = list(itertools.product(*axes))
+    sample = matrix.get("sample")
+    if sample and sample < len(combinations):
+        combinations = random.Random(seed).sample(combinations, sample)
+
+    expanded = []
+    for combination in combinations:
+        data = dict(matrix.get("data", {}))
+        for _, fields in combination:
+            data.update(fields)
+        labels = ", ".join(label for label, _ in combination)
+        expanded.append((f"{matrix['name']} [{labels}]", data))
+    return expanded
+
+def build_cases(spec: Dict[str, Any], context: Dict[str, Any], seed: int = 0) -> List[Case]:
+    """Explicit cases followed by the expanded matrices"""
+    now = datetime.now(timezone.utc)
+    method = spec.get("method", "POST")
+    endpoint = spec["endpoint"]
+    base = spec.get("base", {})
+    default_expect = spec.get("expect_status", [200, 201])
+
+    entries = [(case["name"], case.get("data", {}), case.get("expect_status", default_expect))
+               for case in spec.get("cases", [])]
+    for matrix in spec.get("matrix", []):
+        expect = matrix.get("expect_status", default_expect)
+        entries.extend((name, data, expect) for name, data in expand_matrix(matrix, seed))
+
+    return [Case(name, method, endpoint, substitute({**base, **data}, context, now), expect)
+            for name, data, expect in entries]
+
+def run_case(base_url: str, case: Case) -> CaseResult:
+    start = time.perf_counter()
+    try:
+        response = api_client.request(case.method, f"{base_url}{case.endpoint}", json=case.data)
+    except Exception as e:
+        return CaseResult(case.name, False, None, time.perf_counter() - start, message=str(e))
+    elapsed = time.perf_counter() - start
+
+    passed = response.status_code in case.expect_status
+    try:
+        body = response.json() if response.content else None
+    except ValueError:
+        body = response.text
+    message = "" if passed else f"Expected {case.expect_status}, got {response.status_code}: {response.text[:300]}"
+    return CaseResult(case.name, passed, response.status_code, elapsed, body, message)
+
+def _run_threaded(base_url: str, cases: List[Case], threads: int) -> List[CaseResult]:
+    with ThreadPoolExecutor(max_workers=max(1, threads)) as executor:
+        return list(executor.map(lambda case: run_case(base_url, case), cases))
+
+def _init_shard_worker(token: Optional[str], threads: int):
+    api_client.configure(pool_size=threads)
+    api_client.set_auth_token(token)
+
+def _run_shard(base_url: str, cases: List[Case], threads: int) -> List[CaseResult]:
+    return _run_threaded(base_url, cases, threads)
+
+def run_cases(base_url: str, cases: List[Case], threads: int = 16, processes: int = 0,
+              shard_size: int = DEFAULT_SHARD_SIZE, token: Optional[str] = None) -> List[CaseResult]:
+    """Run cases concurrently; results come back in case order.
+
+    With processes=0 the process count is picked from the number of cases
+    (one per `shard_size` cases, at most one per CPU); processes=1 keeps
+    everything in this process. Shard workers authenticate with `token`.
+    """
+    if processes <= 0:
+        processes = min(os.cpu_count() or 1, -(-len(cases) // shard_size))
+    if processes <= 1:
+        return _run_threaded(base_url, cases, threads)
+
+    # Interleave so every shard gets a similar mix of cases
+    shards = [cases[i::processes] for i in range(processes)]
+    # Spawned workers start with a clean api_client instead of a forked
+    # copy of this process's sockets
+    with ProcessPoolExecutor(max_workers=processes, mp_context=multiprocessing.get_context("spawn"),
+                             initializer=_init_shard_worker, initargs=(token, threads)) as executor:
+        shard_results = list(executor.map(_run_shard, [base_url] * processes, shards, [threads] * processes))
+
+    results: List[Optional[CaseResult]] = [None] * len(cases)
+    for offset, shard in enumerate(shard_results):
+        results[offset::processes] = shard
+    return results
@@ -0,0 +1,22 @@
+"""
+Unified runner for the API test scripts.
+
+Every test_*.py registers a suite with @harness.suite; `python -m harness`
+(run from SledzSpecke.WebApi/) discovers and runs them all against one set
+of lazily created, memoized fixtures - sign-in, user, specialization,
+module, internship and the dotnet build are paid for once per run, not
+once per script.
+
+    python -m harness                  # every suite
+    python -m harness statistics smk   # suites whose name contains a word
+    python -m harness --list
+    python -m harness --soak 8h        # CRUD flows at constant load, drift check
+    python -m harness --sample-resources --start-api   # explain slow requests
+    python -m harness --pg-profile     # SQL per suite, N+1 and seq-scan hints
+    python -m harness --record api.json.gz   # then --replay api.json.gz offline
+"""
+
+from harness.fixtures import DEFAULT_BASE_URL, FixtureError, Fixtures
+from harness.registry import Suite, discover, registered, suite
+
+__all__ = ["DEFAULT_BASE_URL", "FixtureError", "Fixtures", "Suite", "discover", "registered", "suite"]
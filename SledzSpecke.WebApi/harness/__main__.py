@@ -0,0 +1,219 @@
+"""python -m harness [--url URL] [--list] [--offline] [--soak DURATION] [--sample-resources] [--pg-profile]
+                  [--record PATH | --replay PATH] [SUITE ...]"""
+
+import argparse
+import contextlib
+import sys
+
+from harness.fixtures import DEFAULT_BASE_URL, FixtureError, Fixtures
+import api_client
+import auth_pool
+from harness.output import print_error, print_header, print_info
+from harness.pg_profile import DEFAULT_DSN, PgProfileError, PgProfiler, format_profiles
+from harness.registry import discover
+from harness.resource_sampler import DEFAULT_INTERVAL, ResourceSampler, format_spike_report
+from harness.runner import print_report, run
+from harness import cassette, procfs, soak
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog="python -m harness", description="Run all SledzSpecke test suites")
+    parser.add_argument("suites", nargs="*", help="Only run suites whose name contains one of these words")
+    parser.add_argument("--url", default=DEFAULT_BASE_URL, help="API base URL")
+    parser.add_argument("--list", action="store_true", help="List the discovered suites and exit")
+    parser.add_argument("--offline", action="store_true", help="Only run suites that don't need the API")
+    parser.add_argument("--soak", metavar="DURATION",
+                        help="Instead of the suites, run the CRUD flows for DURATION (e.g. 30m, 8h) "
+                             "and check the API for memory and latency drift")
+    parser.add_argument("--soak-rate", type=float, default=soak.DEFAULT_RATE, help="CRUD flows per second")
+    parser.add_argument("--soak-interval", type=float, default=soak.DEFAULT_INTERVAL,
+                        help="Seconds between server samples")
+    parser.add_argument("--soak-log", help="Append one JSON line per sample window to this file")
+    parser.add_argument("--sample-resources", type=float, nargs="?", const=DEFAULT_INTERVAL, metavar="SECONDS",
+                        help="Sample the API process from /proc while suites run and explain slow "
+                             f"requests (default interval {DEFAULT_INTERVAL:g}s)")
+    parser.add_argument("--pg-profile", nargs="?", const=DEFAULT_DSN, metavar="DSN",
+                        help="Report per suite the SQL statements and table scans from pg_stat_statements "
+                             "and pg_stat_user_tables, flagging N+1 queries (default: the appsettings "
+                             "database; give another as --pg-profile=DSN)")
+    traffic = parser.add_mutually_exclusive_group()
+    traffic.add_argument("--record", metavar="PATH", help="Record every API response into a cassette file")
+    traffic.add_argument("--replay", metavar="PATH",
+                         help="Serve API responses from a cassette file instead of the API")
+    parser.add_argument("--replay-latency", type=float, default=0.0, metavar="FACTOR",
+                        help="With --replay, wait this multiple of each recorded latency (default 0)")
+    parser.add_argument("--server-pid", type=int, help="API process to sample (default: found via the API port)")
+    parser.add_argument("--start-api", action="store_true", help="Start the API with `dotnet run` first")
+    args = parser.parse_args()
+    if args.soak:
+        try:
+            args.soak = soak.parse_duration(args.soak)
+        except ValueError as e:
+            parser.error(str(e))
+        with api_process(args) as launcher_pid, traffic_cassette(args):
+            return run_soak(args, launcher_pid)
+
+    suites, errors = discover()
+    for module, error in errors.items():
+        print_error(f"Cannot import {module}: {error}")
+    if args.suites:
+        suites = [entry for entry in suites if any(word in entry.name for word in args.suites)]
+    if args.offline:
+        suites = [entry for entry in suites if not entry.needs_api]
+
+    if args.list:
+        for entry in suites:
+            api = "" if entry.needs_api else " (offline)"
+            print(f"{entry.name:<28} {entry.module}.py{api}  {entry.description}")
+        return 0
+    if not suites:
+        print_info("No suites selected")
+        return 1
+
+    with api_process(args) as launcher_pid, traffic_cassette(args):
+        fixtures = make_fixtures(args)
+        sampler = start_sampler(args, launcher_pid)
+        profiler = start_pg_profiler(args)
+        try:
+            results = run(suites, fixtures, api_up=False if args.offline else None,
+                          around_suite=pg_profile_suite(profiler) if profiler else None)
+        finally:
+            cleanup_fixtures(fixtures)
+            if sampler:
+                sampler.stop()
+                api_client.remove_listener(sampler.observe)
+            if profiler:
+                api_client.remove_listener(profiler.observe)
+        print_report(results, fixtures)
+        if sampler:
+            print_resource_report(sampler, results)
+        if profiler:
+            print_header("Database activity per suite")
+            for line in format_profiles(profiler.profiles):
+                print(line)
+    failed = errors or any(result.status == "failed" for result in results)
+    return 1 if failed else 0
+
+def cleanup_fixtures(fixtures: Fixtures):
+    """Delete the internships the run created, reporting any that stay behind"""
+    if not fixtures.created_internships:
+        return
+    try:
+        remaining = fixtures.cleanup()
+    except Exception as e:
+        print_error(f"Internship cleanup failed: {e}")
+        return
+    if remaining:
+        print_error(f"Could not delete test internships {', '.join(map(str, remaining))}")
+
+def make_fixtures(args) -> Fixtures:
+    # With a cassette, sign in during the run so it is recorded, and keep placeholder tokens off disk
+    cache = auth_pool.TokenCache(path=None) if args.record or args.replay else None
+    return Fixtures(args.url, cache=cache)
+
+@contextlib.contextmanager
+def traffic_cassette(args):
+    """Record into or replay from a cassette when --record or --replay is given"""
+    if args.record:
+        with cassette.recording(args.record) as recorded:
+            yield
+        print_info(f"Recorded {len(recorded)} responses to {recorded.distinct_requests} distinct "
+                   f"requests into {args.record}")
+    elif args.replay:
+        try:
+            recorded = cassette.Cassette.load(args.replay)
+        except (OSError, ValueError, KeyError) as e:
+            raise SystemExit(f"Cannot read cassette {args.replay}: {e}")
+        print_info(f"Replaying {len(recorded)} responses from {args.replay}")
+        with cassette.replaying(recorded, latency=args.replay_latency):
+            yield
+    else:
+        yield
+
+@contextlib.contextmanager
+def api_process(args):
+    """Start the API for the run when --start-api is given; yields the launcher pid"""
+    if not args.start_api or args.replay:
+        yield None
+        return
+    import test_api
+    test_api.API_BASE_URL = args.url
+    process = test_api.start_api()
+    try:
+        yield process.pid
+    finally:
+        process.terminate()
+        process.wait()
+
+def start_sampler(args, launcher_pid):
+    if args.sample_resources is None:
+        return None
+    pid = procfs.resolve_server_pid(args.url, args.server_pid, launcher_pid)
+    if pid is None:
+        print_error("--sample-resources: API process not found (use --server-pid or --start-api)")
+        return None
+    print_info(f"Sampling API process {pid} every {args.sample_resources:g}s")
+    sampler = ResourceSampler(pid, interval=args.sample_resources, health_url=f"{args.url.rstrip('/')}/health")
+    api_client.add_listener(sampler.observe)
+    return sampler.start()
+
+def start_pg_profiler(args):
+    if args.pg_profile is None:
+        return None
+    profiler = PgProfiler(args.pg_profile)
+    try:
+        profiler.check()
+    except PgProfileError as e:
+        print_error(f"--pg-profile disabled: {e}")
+        return None
+    api_client.add_listener(profiler.observe)
+    return profiler
+
+def pg_profile_suite(profiler: PgProfiler):
+    """around_suite hook: profile API suites only, and never fail a suite over a snapshot"""
+    @contextlib.contextmanager
+    def around(entry):
+        if not entry.needs_api:
+            yield
+            return
+        try:
+            started = profiler.begin(entry.name)
+        except PgProfileError as e:
+            print_error(f"pg profile of {entry.name} skipped: {e}")
+            started = None
+        try:
+            yield
+        finally:
+            if started:
+                try:
+                    profiler.end(started)
+                except PgProfileError as e:
+                    print_error(f"pg profile of {entry.name} skipped: {e}")
+    return around
+
+def print_resource_report(sampler: ResourceSampler, results):
+    print_header("Slow requests vs. server resources")
+    suites = [(result.suite.name, result.started, result.started + result.elapsed)
+              for result in results if result.started is not None]
+    spikes = sampler.spikes(suites=suites)
+    if not spikes:
+        print_info(f"No slow requests among {len(sampler.requests)} "
+                   f"({len(sampler.samples)} server samples)")
+        return
+    for line in format_spike_report(spikes):
+        print(line)
+
+def run_soak(args, launcher_pid) -> int:
+    pid = procfs.resolve_server_pid(args.url, args.server_pid, launcher_pid)
+    fixtures = make_fixtures(args)
+    try:
+        passed = soak.run_soak(fixtures, args.soak, rate=args.soak_rate,
+                               interval=args.soak_interval, pid=pid, log_path=args.soak_log)
+    except FixtureError as e:
+        print_error(f"Soak setup failed: {e}")
+        passed = False
+    finally:
+        cleanup_fixtures(fixtures)
+    return 0 if passed else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
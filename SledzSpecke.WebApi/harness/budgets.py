@@ -0,0 +1,163 @@
+"""
+Response-time budgets per endpoint.
+
+A Budget says "p95 of GET /medicalshifts/statistics stays under 150 ms".
+BudgetTracker is an api_client listener: it records the latency of every
+successful request to a budgeted endpoint, ignoring the first `warmup`
+requests per endpoint (JIT, connection setup and cold caches). After the
+functional tests, top_up() repeats idempotent requests until each
+budget has enough samples, and check() compares the percentile with the
+limit:
+
+    tracker = BudgetTracker()
+    api_client.add_listener(tracker.observe)
+    ...functional tests...
+    tracker.top_up(f"{base_url}/medicalshifts/statistics")
+    results = tracker.check()
+
+A budget that is exceeded fails the run, or only warns when it is
+declared with on_exceed="warn" or the run uses mode "warn".
+"""
+
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import api_client
+from latency import normalize_endpoint
+from perf_regression import Reservoir, quantile
+
+MODES = ("enforce", "warn", "off")
+DEFAULT_WARMUP = 3
+DEFAULT_MIN_SAMPLES = 20
+
+class Budget:
+    """Latency limit for one endpoint (endpoint as normalize_endpoint() writes it)"""
+
+    def __init__(self, method: str, endpoint: str, limit_ms: float, percentile: float = 95.0,
+                 on_exceed: str = "fail", min_samples: int = DEFAULT_MIN_SAMPLES):
+        if on_exceed not in ("fail", "warn"):
+            raise ValueError(f"on_exceed must be 'fail' or 'warn', not {on_exceed!r}")
+        self.method = method.upper()
+        self.endpoint = endpoint
+        self.limit_ms = limit_ms
+        self.percentile = percentile
+        self.on_exceed = on_exceed
+        self.min_samples = min_samples
+
+    @property
+    def key(self) -> Tuple[str, str]:
+        return self.method, self.endpoint
+
+    def __str__(self) -> str:
+        return f"{self.method} {self.endpoint} p{self.percentile:g} < {self.limit_ms:g} ms"
+
+# Every budget here is fed by a script: the statistics one by
+# test_statistics_endpoints.py, the lists by test_api.py and the export by
+# benchmark_export.py
+DEFAULT_BUDGETS = [
+    Budget("GET", "/medicalshifts/statistics", 150),
+    Budget("GET", "/internships", 200),
+    Budget("GET", "/procedures", 200),
+    Budget("GET", "/medicalshifts", 200),
+    Budget("GET", "/export/specialization/{id}/xlsx", 2000, min_samples=10),
+]
+
+class BudgetResult:
+    """'passed', 'warned', 'failed' or 'insufficient' (too few samples)"""
+
+    def __init__(self, budget: Budget, status: str, value_ms: Optional[float], samples: int):
+        self.budget = budget
+        self.status = status
+        self.value_ms = value_ms
+        self.samples = samples
+
+    @property
+    def summary(self) -> str:
+        if self.value_ms is None:
+            return f"only {self.samples}/{self.budget.min_samples} samples"
+        return f"p{self.budget.percentile:g} = {self.value_ms:.1f} ms over {self.samples} samples"
+
+    def __str__(self) -> str:
+        return f"{self.budget}: {self.summary}"
+
+class BudgetTracker:
+    """api_client listener that records latencies of budgeted endpoints"""
+
+    def __init__(self, budgets: Optional[List[Budget]] = None, warmup: int = DEFAULT_WARMUP,
+                 reservoir_size: int = 10000):
+        self.budgets = list(DEFAULT_BUDGETS if budgets is None else budgets)
+        self.warmup = warmup
+        self.reservoir_size = reservoir_size
+        self._by_key = {budget.key: budget for budget in self.budgets}
+        self._seen: Dict[Tuple[str, str], int] = {}
+        self._samples: Dict[Tuple[str, str], Reservoir] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, method: str, url: str, response, elapsed: float):
+        # Errors say nothing about the endpoint's normal speed
+        if response is None or response.status_code >= 400:
+            return
+        key = (method.upper(), normalize_endpoint(url))
+        if key not in self._by_key:
+            return
+        with self._lock:
+            self._seen[key] = self._seen.get(key, 0) + 1
+            if self._seen[key] <= self.warmup:
+                return
+            reservoir = self._samples.get(key)
+            if reservoir is None:
+                reservoir = self._samples[key] = Reservoir(self.reservoir_size)
+            reservoir.add(elapsed * 1000)
+
+    def samples(self, method: str, endpoint: str) -> List[float]:
+        with self._lock:
+            reservoir = self._samples.get((method.upper(), endpoint))
+            return list(reservoir.values) if reservoir else []
+
+    def top_up(self, url: str, method: str = "GET", max_requests: Optional[int] = None, **kwargs) -> int:
+        """Repeat an idempotent request until its budget has enough samples.
+
+        The requests go through api_client, so this tracker must be one of
+        its listeners. Returns how many requests were sent.
+        """
+        if method.upper() not in ("GET", "HEAD"):
+            raise ValueError("top_up only repeats idempotent requests")
+        key = (method.upper(), normalize_endpoint(url))
+        budget = self._by_key.get(key)
+        if budget is None:
+            return 0
+        limit = max_requests if max_requests is not None else self.warmup + budget.min_samples
+        sent = 0
+        while sent < limit and len(self.samples(*key)) < budget.min_samples:
+            response = api_client.request(method, url, **kwargs)
+            sent += 1
+            if response.status_code >= 400:
+                break  # errors are not recorded, repeating would not help
+        return sent
+
+    def check(self, mode: str = "enforce") -> List[BudgetResult]:
+        """Results for every budget that got at least one sample"""
+        if mode not in MODES:
+            raise ValueError(f"mode must be one of {MODES}, not {mode!r}")
+        results = []
+        if mode == "off":
+            return results
+        for budget in self.budgets:
+            values = self.samples(budget.method, budget.endpoint)
+            if not values:
+                continue
+            if len(values) < budget.min_samples:
+                results.append(BudgetResult(budget, "insufficient", None, len(values)))
+                continue
+            value = quantile(values, budget.percentile)
+            if value <= budget.limit_ms:
+                status = "passed"
+            elif budget.on_exceed == "warn" or mode == "warn":
+                status = "warned"
+            else:
+                status = "failed"
+            results.append(BudgetResult(budget, status, value, len(values)))
+        return results
+
+def budgets_passed(results: List[BudgetResult]) -> bool:
+    return not any(result.status == "failed" for result in results)
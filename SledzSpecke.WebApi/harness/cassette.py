@@ -0,0 +1,276 @@
+"""
+Record and replay API traffic.
+
+Recording wraps api_client's pooled adapter and keeps every response;
+replaying serves them from memory instead of the network, so the suites'
+Python side (payload builders, oracles, reports) runs in milliseconds
+without `dotnet run` or PostgreSQL:
+
+    python -m harness --record cassettes/api.json.gz   # against a live API
+    python -m harness --replay cassettes/api.json.gz   # offline, e.g. in CI
+
+    with cassette.recording(path):      # or from a script
+        ...api_client calls...
+
+Requests match on method, path and query (host ignored, dates replaced by a
+placeholder). Repeated requests get their responses in recorded order, a
+request body that matches a recorded one is preferred, and once a request's
+responses are used up the last one is served again. An unrecorded request
+raises CassetteMiss, a requests.ConnectionError.
+
+Before anything is written, JWTs and refresh tokens in response bodies are
+replaced by a placeholder token that has already expired (so token caches
+never keep it), and Date, Server and Set-Cookie headers are dropped.
+Identical bodies are stored once; the file is JSON, gzipped when the name
+ends in .gz. Each response keeps its recorded latency, which replay sleeps
+for when `latency` is non-zero, so the load tooling sees realistic timings
+offline.
+"""
+
+import base64
+import datetime
+import gzip
+import hashlib
+import http
+import io
+import json
+import re
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Union
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+import requests
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+import api_client
+
+VERSION = 1
+DATE_PATTERN = re.compile(r"\d{4}-\d{2}-\d{2}(?:[T ]\d{2}:\d{2}(?::\d{2}(?:\.\d+)?)?(?:Z|[+-]\d{2}:?\d{2})?)?")
+JWT_PATTERN = re.compile(r"eyJ[\w-]+\.[\w-]+\.[\w-]*")
+REFRESH_TOKEN_PATTERN = re.compile(r'("refresh_?token"\s*:\s*")[^"]*(")', re.IGNORECASE)
+DROPPED_HEADERS = {"date", "server", "set-cookie", "connection", "keep-alive",
+                   "content-length", "content-encoding", "transfer-encoding"}
+
+def _b64(data: dict) -> str:
+    return base64.urlsafe_b64encode(json.dumps(data).encode()).decode().rstrip("=")
+
+# exp=1 (1970): auth_pool.TokenCache treats it as expired and never reuses it
+PLACEHOLDER_TOKEN = f"{_b64({'alg': 'none', 'typ': 'JWT'})}.{_b64({'sub': 'cassette', 'exp': 1})}.cassette"
+
+class CassetteMiss(requests.ConnectionError):
+    """No recorded response for a request"""
+
+def request_key(method: str, url: str) -> str:
+    """'GET /api/procedures?internshipId=1' - host dropped, query sorted, dates normalized"""
+    parts = urlsplit(url)
+    key = f"{method.upper()} {parts.path}"
+    if parts.query:
+        key += "?" + urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return DATE_PATTERN.sub("<date>", key)
+
+def body_fingerprint(body: Union[bytes, str, None]) -> Optional[str]:
+    """Short hash of a request body with dates and tokens normalized; None without a body"""
+    if not body:
+        return None
+    if isinstance(body, bytes):
+        body = body.decode("utf-8", errors="replace")
+    normalized = JWT_PATTERN.sub("<token>", DATE_PATTERN.sub("<date>", body))
+    return hashlib.sha1(normalized.encode()).hexdigest()[:12]
+
+def redact(text: str) -> str:
+    text = JWT_PATTERN.sub(PLACEHOLDER_TOKEN, text)
+    return REFRESH_TOKEN_PATTERN.sub(rf"\g<1>{PLACEHOLDER_TOKEN}\g<2>", text)
+
+class Interaction:
+    """One recorded response; `body` indexes the cassette's body table"""
+
+    def __init__(self, key: str, fingerprint: Optional[str], status: int, headers: Dict[str, str],
+                 body: int, elapsed_ms: float):
+        self.key = key
+        self.fingerprint = fingerprint
+        self.status = status
+        self.headers = headers
+        self.body = body
+        self.elapsed_ms = elapsed_ms
+
+class Cassette:
+    """Recorded responses, indexed by request_key()"""
+
+    def __init__(self):
+        self.interactions: List[Interaction] = []
+        self.bodies: List[bytes] = []
+        self._body_ids: Dict[bytes, int] = {}
+        self._index: Dict[str, List[int]] = {}
+        self._used: set = set()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.interactions)
+
+    @property
+    def distinct_requests(self) -> int:
+        return len(self._index)
+
+    def _body_id(self, body: bytes) -> int:
+        if body not in self._body_ids:
+            self._body_ids[body] = len(self.bodies)
+            self.bodies.append(body)
+        return self._body_ids[body]
+
+    def _append(self, interaction: Interaction):
+        self._index.setdefault(interaction.key, []).append(len(self.interactions))
+        self.interactions.append(interaction)
+
+    def record(self, request: requests.PreparedRequest, response: requests.Response, elapsed: float):
+        body = response.content or b""
+        try:
+            body = redact(body.decode("utf-8")).encode("utf-8")
+        except UnicodeDecodeError:
+            pass  # binary (xlsx exports)
+        headers = {name: value for name, value in response.headers.items()
+                   if name.lower() not in DROPPED_HEADERS}
+        with self._lock:
+            self._append(Interaction(request_key(request.method, request.url), body_fingerprint(request.body),
+                                     response.status_code, headers, self._body_id(body),
+                                     round(elapsed * 1000, 3)))
+
+    def match(self, method: str, url: str, body: Union[bytes, str, None] = None) -> Optional[Interaction]:
+        """Next unused response for the request, preferring one recorded with the same body"""
+        fingerprint = body_fingerprint(body)
+        with self._lock:
+            candidates = self._index.get(request_key(method, url))
+            if not candidates:
+                return None
+            unused = [i for i in candidates if i not in self._used]
+            if not unused:
+                return self.interactions[candidates[-1]]
+            chosen = next((i for i in unused if self.interactions[i].fingerprint == fingerprint), unused[0])
+            self._used.add(chosen)
+            return self.interactions[chosen]
+
+    def rewind(self):
+        """Serve every response again from the start"""
+        with self._lock:
+            self._used.clear()
+
+    def save(self, path: str):
+        bodies: List[Any] = []
+        for body in self.bodies:
+            try:
+                bodies.append(body.decode("utf-8"))
+            except UnicodeDecodeError:
+                bodies.append({"base64": base64.b64encode(body).decode("ascii")})
+        with self._lock:
+            data = {
+                "version": VERSION,
+                "index": self._index,
+                "interactions": [{"fingerprint": i.fingerprint, "status": i.status, "headers": i.headers,
+                                  "body": i.body, "ms": i.elapsed_ms} for i in self.interactions],
+                "bodies": bodies,
+            }
+        text = json.dumps(data, separators=(",", ":"))
+        if path.endswith(".gz"):
+            with gzip.open(path, "wt", encoding="utf-8") as f:
+                f.write(text)
+        else:
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(text)
+
+    @classmethod
+    def load(cls, path: str) -> "Cassette":
+        opener = gzip.open if path.endswith(".gz") else open
+        with opener(path, "rt", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != VERSION:
+            raise ValueError(f"{path}: unsupported cassette version {data.get('version')}")
+        cassette = cls()
+        for body in data["bodies"]:
+            cassette._body_id(base64.b64decode(body["base64"]) if isinstance(body, dict)
+                              else body.encode("utf-8"))
+        keys = {position: key for key, positions in data["index"].items() for position in positions}
+        for position, entry in enumerate(data["interactions"]):
+            cassette._append(Interaction(keys[position], entry["fingerprint"], entry["status"],
+                                         entry["headers"], entry["body"], entry["ms"]))
+        return cassette
+
+class RecordingAdapter(BaseAdapter):
+    """Sends through `inner` and records each response into `cassette`"""
+
+    def __init__(self, cassette: Cassette, inner: BaseAdapter):
+        super().__init__()
+        self.cassette = cassette
+        self.inner = inner
+
+    def send(self, request, **kwargs):
+        start = time.perf_counter()
+        response = self.inner.send(request, **kwargs)
+        response.content  # reads streamed bodies too, so their latency includes the transfer
+        self.cassette.record(request, response, time.perf_counter() - start)
+        return response
+
+    def close(self):
+        self.inner.close()
+
+class ReplayAdapter(BaseAdapter):
+    """Answers from `cassette`; sleeps `latency` times the recorded latency"""
+
+    def __init__(self, cassette: Cassette, latency: float = 0.0):
+        super().__init__()
+        self.cassette = cassette
+        self.latency = latency
+
+    def send(self, request, **kwargs):
+        interaction = self.cassette.match(request.method, request.url, request.body)
+        if interaction is None:
+            raise CassetteMiss(f"no recorded response for {request_key(request.method, request.url)}",
+                               request=request)
+        if self.latency:
+            time.sleep(interaction.elapsed_ms / 1000 * self.latency)
+        body = self.cassette.bodies[interaction.body]
+        response = requests.Response()
+        response.status_code = interaction.status
+        response.reason = _reason(interaction.status)
+        response.headers = CaseInsensitiveDict(interaction.headers)
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.raw = io.BytesIO(body)
+        response._content = body
+        response._content_consumed = True
+        response.url = request.url
+        response.request = request
+        response.elapsed = datetime.timedelta(milliseconds=interaction.elapsed_ms)
+        return response
+
+    def close(self):
+        pass
+
+def _reason(status: int) -> str:
+    try:
+        return http.HTTPStatus(status).phrase
+    except ValueError:
+        return ""
+
+@contextmanager
+def recording(path: str) -> Iterator[Cassette]:
+    """Record api_client traffic; the cassette is written to `path` on exit"""
+    cassette = Cassette()
+    api_client.set_transport(lambda adapter: RecordingAdapter(cassette, adapter))
+    try:
+        yield cassette
+    finally:
+        api_client.set_transport(None)
+        cassette.save(path)
+
+@contextmanager
+def replaying(cassette: Union[str, Cassette], latency: float = 0.0) -> Iterator[Cassette]:
+    """Serve api_client traffic from a cassette, or the cassette file at that path"""
+    if isinstance(cassette, str):
+        cassette = Cassette.load(cassette)
+    api_client.set_transport(lambda adapter: ReplayAdapter(cassette, latency))
+    try:
+        yield cassette
+    finally:
+        api_client.set_transport(None)
@@ -0,0 +1,185 @@
+"""
+Session-scoped fixtures shared by every suite in one harness run.
+
+Each fixture is created on first access and memoized, so a run signs in
+once and creates one internship no matter how many suites use them; a
+suite that never touches a fixture never pays for it. A fixture that
+fails raises FixtureError, and keeps raising the same error on later
+accesses instead of retrying.
+
+    fx = Fixtures()
+    fx.token           # signs in testuser (creating it if needed)
+    fx.internship_id   # creates one internship in the user's current module
+    fx.cleanup()       # deletes the internships the run created
+"""
+
+import functools
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import api_client
+import auth_pool
+from build_runner import BuildRunner
+from payloads import first_requirement_id
+from source_index import SourceIndex
+
+DEFAULT_BASE_URL = os.environ.get("SLEDZSPECKE_API_URL", "http://localhost:5000/api")
+TEST_USERNAME = "testuser"
+TEST_PASSWORD = "Test123!"
+# Used when the API cannot tell us the user's specialization
+DEFAULT_SPECIALIZATION_ID = 1
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+class FixtureError(Exception):
+    """A fixture could not be set up; suites using it are skipped"""
+
+def _field(data: Dict[str, Any], name: str, default: Any = None) -> Any:
+    """camelCase or PascalCase key, whichever the API sent"""
+    return data.get(name, data.get(name[:1].upper() + name[1:], default))
+
+def fixture(func: Callable[["Fixtures"], Any]) -> property:
+    """Lazily evaluated, memoized, thread-safe fixture property"""
+    name = func.__name__
+
+    @functools.wraps(func)
+    def getter(self: "Fixtures") -> Any:
+        with self._locks.setdefault(name, threading.Lock()):
+            if name not in self._values:
+                start = time.perf_counter()
+                try:
+                    self._values[name] = (True, func(self))
+                except FixtureError as e:
+                    self._values[name] = (False, e)
+                except Exception as e:
+                    self._values[name] = (False, FixtureError(f"{name}: {e}"))
+                self.setup_times.append((name, time.perf_counter() - start))
+        ok, value = self._values[name]
+        if not ok:
+            raise value
+        return value
+
+    return property(getter)
+
+class Fixtures:
+    """Fixtures for one harness run against one API"""
+
+    def __init__(self, base_url: str = DEFAULT_BASE_URL, username: str = TEST_USERNAME,
+                 password: str = TEST_PASSWORD, cache: Optional[auth_pool.TokenCache] = None):
+        self.base_url = base_url.rstrip("/")
+        self.username = username
+        self.password = password
+        self.cache = cache or auth_pool.TokenCache()
+        self.setup_times: List[Tuple[str, float]] = []
+        self.created_internships: List[int] = []
+        self._values: Dict[str, Tuple[bool, Any]] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+
+    @fixture
+    def token(self) -> str:
+        """JWT of the test user; also set as api_client's default auth header"""
+        token = self.cache.token(
+            self.base_url, self.username, self.password,
+            create_user=lambda: auth_pool.sign_up(self.base_url, self.username, self.password,
+                                                  specialization_id=DEFAULT_SPECIALIZATION_ID),
+            verify=True)
+        if not token:
+            raise FixtureError(f"token: cannot sign in as {self.username} at {self.base_url}")
+        api_client.set_auth_token(token)
+        return token
+
+    @fixture
+    def user(self) -> Dict[str, Any]:
+        """GET /users/me"""
+        self.token
+        response = api_client.get(f"{self.base_url}/users/me")
+        if response.status_code != 200:
+            raise FixtureError(f"user: GET /users/me returned {response.status_code}")
+        return response.json()
+
+    @fixture
+    def specialization(self) -> Dict[str, Any]:
+        """The user's specialization, with its modules"""
+        specialization_id = _field(self.user, "specializationId") or DEFAULT_SPECIALIZATION_ID
+        response = api_client.get(f"{self.base_url}/specializations/{specialization_id}")
+        if response.status_code != 200:
+            raise FixtureError(f"specialization: GET /specializations/{specialization_id} "
+                               f"returned {response.status_code}")
+        return response.json()
+
+    @property
+    def specialization_id(self) -> int:
+        return _field(self.specialization, "id")
+
+    @fixture
+    def module_id(self) -> int:
+        """Current module, else the first one, else the seeded id (specialization * 100 + 1)"""
+        specialization = self.specialization
+        current = _field(specialization, "currentModuleId")
+        if current:
+            return current
+        modules = _field(specialization, "modules") or []
+        if modules:
+            return _field(modules[0], "id")
+        return self.specialization_id * 100 + 1
+
+    @fixture
+    def procedure_requirement_id(self) -> int:
+        """First procedure requirement of the current module, for POST /procedures/realizations"""
+        self.token
+        response = api_client.get(f"{self.base_url}/procedures/modules/{self.module_id}")
+        if response.status_code != 200:
+            raise FixtureError(f"procedure_requirement_id: GET /procedures/modules/{self.module_id} "
+                               f"returned {response.status_code}")
+        requirement_id = first_requirement_id(response.json())
+        if requirement_id is None:
+            raise FixtureError(f"procedure_requirement_id: module {self.module_id} has no procedures")
+        return requirement_id
+
+    @fixture
+    def internship_id(self) -> int:
+        """One internship shared by all suites; suites that complete or delete
+        it must use create_internship() instead"""
+        return self.create_internship()
+
+    def create_internship(self, **overrides) -> int:
+        """POST /internships in the current module; not memoized"""
+        self.token
+        now = datetime.utcnow()
+        payload = {
+            "specializationId": self.specialization_id,
+            "moduleId": self.module_id,
+            "institutionName": "Test Hospital",
+            "departmentName": "Cardiology",
+            "supervisorName": "Dr. Test",
+            "startDate": (now - timedelta(days=30)).strftime('%Y-%m-%dT%H:%M:%SZ'),
+            "endDate": (now + timedelta(days=30)).strftime('%Y-%m-%dT%H:%M:%SZ'),
+            **overrides,
+        }
+        response = api_client.post(f"{self.base_url}/internships", json=payload)
+        if response.status_code not in (200, 201):
+            raise FixtureError(f"internship: POST /internships returned {response.status_code}: "
+                               f"{response.text[:200]}")
+        internship_id = response.json()
+        self.created_internships.append(internship_id)
+        return internship_id
+
+    def cleanup(self) -> List[int]:
+        """DELETE every internship created through these fixtures; returns the ids that remain"""
+        remaining = [internship_id for internship_id in self.created_internships
+                     if api_client.delete(f"{self.base_url}/internships/{internship_id}").status_code
+                     not in (200, 204)]
+        self.created_internships = remaining
+        return remaining
+
+    @fixture
+    def build(self) -> BuildRunner:
+        """`dotnet build` started in the background; wait() for the result"""
+        return BuildRunner(cwd=SCRIPTS_DIR).start()
+
+    @fixture
+    def source_index(self) -> SourceIndex:
+        """C# symbol index of src/, parsed lazily and shared by the source-check suites"""
+        return SourceIndex(os.path.join(SCRIPTS_DIR, "src"))
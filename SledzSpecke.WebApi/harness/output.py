@@ -0,0 +1,34 @@
+"""Colored console output shared by the harness and the test scripts"""
+
+GREEN = '\033[92m'
+RED = '\033[91m'
+YELLOW = '\033[93m'
+BLUE = '\033[94m'
+BOLD = '\033[1m'
+RESET = '\033[0m'
+
+# Palette of test_api.py and the scripts built on it
+class Colors:
+    HEADER = '\033[95m'
+    OKBLUE = '\033[94m'
+    OKCYAN = '\033[96m'
+    OKGREEN = '\033[92m'
+    WARNING = '\033[93m'
+    FAIL = '\033[91m'
+    ENDC = '\033[0m'
+    BOLD = '\033[1m'
+    UNDERLINE = '\033[4m'
+
+def print_header(text: str):
+    print(f"\n{BLUE}{'='*60}{RESET}")
+    print(f"{BLUE}{text}{RESET}")
+    print(f"{BLUE}{'='*60}{RESET}")
+
+def print_success(message: str):
+    print(f"{GREEN}✓ {message}{RESET}")
+
+def print_error(message: str):
+    print(f"{RED}✗ {message}{RESET}")
+
+def print_info(message: str):
+    print(f"{YELLOW}ℹ {message}{RESET}")
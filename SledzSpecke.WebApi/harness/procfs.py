@@ -0,0 +1,187 @@
+"""
+Process metrics of the API server, read from /proc (Linux only).
+
+`dotnet run` is only a launcher: the API itself runs in a child process,
+so find_server_pid() walks down from the launcher's pid to the descendant
+with the largest resident set. listening_pid() finds the process that
+listens on a TCP port, for an API that was started elsewhere.
+
+    pid = find_server_pid(process.pid)
+    sample = read_sample(pid)
+    sample.rss_kb, sample.threads, sample.fds, sample.cpu_seconds
+
+Counters (cpu_seconds, context switches, syscalls, I/O bytes) are
+cumulative since the process started; rates come from two samples.
+"""
+
+import os
+import time
+from typing import Dict, List, Optional
+from urllib.parse import urlparse
+
+CLOCK_TICKS = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+TCP_LISTEN = "0A"
+
+class ProcessSample:
+    """One reading of a process; `at` is time.perf_counter(), like request timings"""
+
+    def __init__(self, at: float, rss_kb: int, peak_rss_kb: int, threads: int, fds: Optional[int],
+                 cpu_seconds: float, voluntary_switches: int = 0, involuntary_switches: int = 0,
+                 syscalls: Optional[int] = None, io_bytes: Optional[int] = None,
+                 running_threads: Optional[int] = None, blocked_threads: Optional[int] = None):
+        self.at = at
+        self.rss_kb = rss_kb
+        self.peak_rss_kb = peak_rss_kb
+        self.threads = threads
+        self.fds = fds  # None when /proc/<pid>/fd is not readable (another user's process)
+        self.cpu_seconds = cpu_seconds
+        # Voluntary switches: a thread blocked (lock, I/O); involuntary: it was preempted.
+        # Only the main thread's unless sampled with_thread_states=True
+        self.voluntary_switches = voluntary_switches
+        self.involuntary_switches = involuntary_switches
+        # read/write syscalls and bytes, sockets included (/proc/<pid>/io, own processes only)
+        self.syscalls = syscalls
+        self.io_bytes = io_bytes
+        # Threads in state R and D (uninterruptible, usually disk I/O), with_thread_states=True
+        self.running_threads = running_threads
+        self.blocked_threads = blocked_threads
+
+def available() -> bool:
+    return os.path.isdir("/proc/self")
+
+def _status(pid) -> Dict[str, str]:
+    with open(f"/proc/{pid}/status", encoding="ascii", errors="replace") as f:
+        return dict(line.rstrip("\n").split(":\t", 1) for line in f if ":\t" in line)
+
+def _stat_fields(pid: int) -> List[str]:
+    with open(f"/proc/{pid}/stat", encoding="ascii", errors="replace") as f:
+        data = f.read()
+    # The command name may contain spaces and parentheses; fields resume after the last ')'
+    return data[data.rindex(")") + 2:].split()
+
+def _kb(value: str) -> int:
+    return int(value.split()[0]) if value else 0
+
+def _io(pid: int) -> Dict[str, int]:
+    try:
+        with open(f"/proc/{pid}/io", encoding="ascii") as f:
+            return {key: int(value) for key, value in (line.split(":", 1) for line in f)}
+    except (OSError, ValueError):
+        return {}
+
+def thread_states(pid: int) -> Dict[str, int]:
+    """Threads per scheduler state (R running, S sleeping, D uninterruptible, ...), plus the
+    context switches of all live threads under "voluntary" and "involuntary"
+    (/proc/<pid>/status only counts the main thread's)"""
+    states: Dict[str, int] = {"voluntary": 0, "involuntary": 0}
+    try:
+        tasks = os.listdir(f"/proc/{pid}/task")
+    except OSError:
+        return states
+    for task in tasks:
+        try:
+            status = _status(f"{pid}/task/{task}")
+        except OSError:
+            continue  # the thread exited meanwhile
+        state = status.get("State", "?")[:1]
+        states[state] = states.get(state, 0) + 1
+        states["voluntary"] += int(status.get("voluntary_ctxt_switches", "0"))
+        states["involuntary"] += int(status.get("nonvoluntary_ctxt_switches", "0"))
+    return states
+
+def read_sample(pid: int, with_thread_states: bool = False) -> Optional[ProcessSample]:
+    """Current RSS, threads, open fds and CPU time of `pid`; None once it has exited"""
+    at = time.perf_counter()
+    try:
+        status = _status(pid)
+        stat = _stat_fields(pid)
+    except (OSError, ValueError):
+        return None
+    try:
+        fds: Optional[int] = len(os.listdir(f"/proc/{pid}/fd"))
+    except OSError:
+        fds = None
+    # utime and stime are fields 14 and 15 of /proc/<pid>/stat (11 and 12 after the name)
+    cpu_seconds = (int(stat[11]) + int(stat[12])) / CLOCK_TICKS
+    io = _io(pid)
+    states = thread_states(pid) if with_thread_states else {}
+    return ProcessSample(
+        at, _kb(status.get("VmRSS", "")), _kb(status.get("VmHWM", "")), int(status.get("Threads", "0")),
+        fds, cpu_seconds,
+        voluntary_switches=states.get("voluntary", int(status.get("voluntary_ctxt_switches", "0"))),
+        involuntary_switches=states.get("involuntary", int(status.get("nonvoluntary_ctxt_switches", "0"))),
+        syscalls=io["syscr"] + io["syscw"] if "syscr" in io else None,
+        io_bytes=io["rchar"] + io["wchar"] if "rchar" in io else None,
+        running_threads=states.get("R", 0) if with_thread_states else None,
+        blocked_threads=states.get("D", 0) if with_thread_states else None)
+
+def children(pid: int) -> List[int]:
+    """Direct children of `pid`"""
+    result = []
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            if int(_stat_fields(int(entry))[1]) == pid:
+                result.append(int(entry))
+        except (OSError, ValueError, IndexError):
+            continue
+    return result
+
+def descendants(pid: int) -> List[int]:
+    found, pending = [], [pid]
+    while pending:
+        for child in children(pending.pop()):
+            found.append(child)
+            pending.append(child)
+    return found
+
+def find_server_pid(pid: int) -> int:
+    """The process doing the work behind a launcher: its largest descendant, else itself"""
+    best, best_rss = pid, -1
+    for candidate in [pid] + descendants(pid):
+        sample = read_sample(candidate)
+        if sample is not None and sample.rss_kb > best_rss:
+            best, best_rss = candidate, sample.rss_kb
+    return best
+
+def resolve_server_pid(base_url: str, pid: Optional[int] = None, launcher_pid: Optional[int] = None) -> Optional[int]:
+    """Explicit pid, else the worker behind `dotnet run`, else whoever listens on the API port"""
+    if pid:
+        return pid
+    if not available():
+        return None
+    if launcher_pid:
+        return find_server_pid(launcher_pid)
+    port = urlparse(base_url).port
+    return listening_pid(port) if port else None
+
+def _listening_inodes(port: int) -> List[str]:
+    inodes = []
+    for table in ("/proc/net/tcp", "/proc/net/tcp6"):
+        try:
+            with open(table, encoding="ascii") as f:
+                next(f)
+                for line in f:
+                    fields = line.split()
+                    if fields[3] == TCP_LISTEN and int(fields[1].rsplit(":", 1)[1], 16) == port:
+                        inodes.append(fields[9])
+        except (OSError, StopIteration):
+            continue
+    return inodes
+
+def listening_pid(port: int) -> Optional[int]:
+    """Pid of the process listening on a local TCP port (only our own processes are visible)"""
+    targets = {f"socket:[{inode}]" for inode in _listening_inodes(port)}
+    if not targets:
+        return None
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            for fd in os.listdir(f"/proc/{entry}/fd"):
+                if os.readlink(f"/proc/{entry}/fd/{fd}") in targets:
+                    return int(entry)
+        except OSError:
+            continue
+    return None
@@ -0,0 +1,69 @@
+"""
+Suite registration and discovery.
+
+A test script registers an entry point with the `suite` decorator; the
+function receives the run's Fixtures and returns False (or raises) on
+failure:
+
+    @harness.suite("statistics")
+    def run_suite(fx):
+        fx.token
+        ...
+
+discover() imports every test_*.py next to the harness package, which
+registers their suites. Scripts must therefore not do any work at import
+time - their standalone code lives in main().
+"""
+
+import glob
+import importlib
+import os
+import traceback
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from harness.fixtures import SCRIPTS_DIR
+
+class Suite:
+    """A registered suite entry point"""
+
+    def __init__(self, name: str, func: Callable, description: str = "", needs_api: bool = True,
+                 uses: Sequence[str] = ()):
+        self.name = name
+        self.func = func
+        self.description = description
+        self.needs_api = needs_api
+        self.uses = tuple(uses)  # fixtures worth starting before the suite runs (e.g. "build")
+        self.module = func.__module__
+
+_registry: Dict[str, Suite] = {}
+
+def suite(name: Optional[str] = None, description: Optional[str] = None, needs_api: bool = True,
+          uses: Sequence[str] = ()):
+    """Register the decorated function as a harness suite"""
+    def register(func: Callable) -> Callable:
+        suite_name = name or func.__module__
+        doc = (func.__doc__ or "").strip().splitlines()
+        existing = _registry.get(suite_name)
+        if existing is not None and existing.module != func.__module__:
+            raise ValueError(f"Suite '{suite_name}' is registered by both {existing.module} and {func.__module__}")
+        _registry[suite_name] = Suite(suite_name, func, description or (doc[0] if doc else ""),
+                                      needs_api, uses)
+        return func
+    return register
+
+def registered() -> List[Suite]:
+    return list(_registry.values())
+
+def discover(directory: str = SCRIPTS_DIR, pattern: str = "test_*.py") -> Tuple[List[Suite], Dict[str, str]]:
+    """Import matching scripts; returns (suites in file order, {module: import error})"""
+    modules = [os.path.splitext(os.path.basename(path))[0]
+               for path in sorted(glob.glob(os.path.join(directory, pattern)))]
+    errors = {}
+    for module in modules:
+        try:
+            importlib.import_module(module)
+        except Exception as e:
+            errors[module] = "".join(traceback.format_exception_only(type(e), e)).strip()
+    order = {module: i for i, module in enumerate(modules)}
+    suites = sorted(registered(), key=lambda entry: order.get(entry.module, len(order)))
+    return suites, errors
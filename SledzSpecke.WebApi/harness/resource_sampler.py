@@ -0,0 +1,286 @@
+"""
+Background sampler of the API process, lined up with request timings.
+
+While suites run, ResourceSampler reads the server's CPU time, RSS,
+threads, open fds, context switches, read/write syscalls and per-thread
+scheduler states from /proc every `interval` seconds into a fixed-size
+ring buffer (one float array per field, so an hour at 100 ms is ~3 MB).
+Samples are stamped with time.perf_counter(), the clock api_client's
+request timings use, and the sampler is itself an api_client listener, so
+every slow request can be matched with what the server was doing while it
+was in flight. GET /health is polled on its own thread for the GC pause
+time, which /proc cannot see.
+
+    sampler = ResourceSampler(pid, interval=0.1, health_url=f"{base_url}/health")
+    api_client.add_listener(sampler.observe)
+    with sampler:
+        ...suites...
+    for line in format_spike_report(sampler.spikes()):
+        print(line)
+
+Each spike gets a verdict - a heuristic, not a profile:
+- cpu:      the process used >= 80% of all cores while the request ran;
+- gc:       GC pauses covered a quarter of the request or more;
+- disk-io:  threads sat in uninterruptible (D) state;
+- lock:     little CPU, but threads blocked and woke up far more often than
+            usual (voluntary context switches) without extra I/O;
+- external: the server was mostly idle - the time went to the database,
+            the network or the client.
+"""
+
+import bisect
+import math
+import os
+import threading
+import time
+from array import array
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+
+import requests
+
+from harness import procfs
+from harness.fixtures import _field
+from latency import normalize_endpoint
+from perf_regression import quantile
+
+DEFAULT_INTERVAL = 0.1
+DEFAULT_CAPACITY = 36000  # an hour at the default interval
+DEFAULT_GC_INTERVAL = 1.0
+FIELDS = ("at", "cpu_seconds", "rss_kb", "threads", "fds", "voluntary_switches", "involuntary_switches",
+          "syscalls", "io_bytes", "running_threads", "blocked_threads")
+GC_FIELDS = ("at", "pause_ms", "gen0", "gen2")
+CPU_SATURATED = 0.8
+GC_SHARE = 0.25
+RATE_FACTOR = 2.0  # "far more often than usual": this many times the run's median rate
+
+class RingBuffer:
+    """Fixed-capacity columns of floats; the oldest rows are overwritten"""
+
+    def __init__(self, fields: Tuple[str, ...], capacity: int):
+        self.fields = fields
+        self.capacity = capacity
+        self._columns = {name: array("d", [math.nan]) * capacity for name in fields}
+        self._next = 0
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def append(self, values: Dict[str, Optional[float]]):
+        with self._lock:
+            for name in self.fields:
+                value = values.get(name)
+                self._columns[name][self._next] = math.nan if value is None else value
+            self._next = (self._next + 1) % self.capacity
+            self._count = min(self._count + 1, self.capacity)
+
+    def rows(self) -> List[Dict[str, float]]:
+        """Oldest first"""
+        with self._lock:
+            start = (self._next - self._count) % self.capacity
+            indexes = [(start + i) % self.capacity for i in range(self._count)]
+            return [{name: self._columns[name][i] for name in self.fields} for i in indexes]
+
+def _between(rows: List[Dict[str, float]], times: List[float], start: float, end: float) -> List[Dict[str, float]]:
+    """Rows from the last one at or before `start` to the first one at or after `end`"""
+    first = max(bisect.bisect_right(times, start) - 1, 0)
+    last = bisect.bisect_left(times, end)
+    return rows[first:last + 1]
+
+class Spike:
+    """A slow request and the server's behaviour while it ran"""
+
+    def __init__(self, method: str, endpoint: str, start: float, elapsed: float, suite: str = ""):
+        self.method = method
+        self.endpoint = endpoint
+        self.start = start
+        self.elapsed = elapsed
+        self.suite = suite
+        self.cpu: Optional[float] = None  # fraction of all cores
+        self.running: Optional[float] = None
+        self.blocked: Optional[float] = None
+        self.switch_rate: Optional[float] = None  # voluntary switches per second
+        self.syscall_rate: Optional[float] = None
+        self.gc_pause_ms: Optional[float] = None
+        self.verdict = "unknown"
+
+def _rate(first: Dict[str, float], last: Dict[str, float], name: str) -> Optional[float]:
+    elapsed = last["at"] - first["at"]
+    if elapsed <= 0 or math.isnan(first[name]) or math.isnan(last[name]):
+        return None
+    # Summed per-thread counters drop when a thread exits
+    return max(last[name] - first[name], 0.0) / elapsed
+
+def _mean(rows: List[Dict[str, float]], name: str) -> Optional[float]:
+    values = [row[name] for row in rows if not math.isnan(row[name])]
+    return sum(values) / len(values) if values else None
+
+class ResourceSampler:
+    """Samples a process from /proc on a background thread"""
+
+    def __init__(self, pid: int, interval: float = DEFAULT_INTERVAL, capacity: int = DEFAULT_CAPACITY,
+                 health_url: Optional[str] = None, gc_interval: float = DEFAULT_GC_INTERVAL,
+                 request_capacity: int = 100000):
+        self.pid = pid
+        self.interval = interval
+        self.health_url = health_url
+        self.gc_interval = gc_interval
+        self.cpus = os.cpu_count() or 1
+        self.samples = RingBuffer(FIELDS, capacity)
+        self.gc = RingBuffer(GC_FIELDS, max(16, int(capacity * interval / gc_interval)))
+        # (start, elapsed, method, endpoint) of every successful request, same clock as the samples
+        self.requests: Deque[Tuple[float, float, str, str]] = deque(maxlen=request_capacity)
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    def observe(self, method: str, url: str, response, elapsed: float):
+        if response is None or url.rstrip("/").endswith("/health"):
+            return
+        end = time.perf_counter()
+        self.requests.append((end - elapsed, elapsed, method.upper(), normalize_endpoint(url)))
+
+    def _sample_loop(self):
+        next_at = time.perf_counter()
+        while not self._stop.is_set():
+            sample = procfs.read_sample(self.pid, with_thread_states=True)
+            if sample is None:
+                return  # the process exited
+            self.samples.append({name: getattr(sample, name) for name in FIELDS})
+            next_at += self.interval
+            self._stop.wait(max(0.0, next_at - time.perf_counter()))
+
+    def _gc_loop(self):
+        # A session of its own: the polls bypass api_client, so its listeners
+        # (latency recorders, profilers, cassettes) never see them
+        with requests.Session() as session:
+            while not self._stop.is_set():
+                at = time.perf_counter()
+                try:
+                    body = session.get(self.health_url, timeout=5).json()
+                    gc = (_field(body, "gc") or {}) if isinstance(body, dict) else {}
+                except Exception:
+                    gc = {}
+                if gc.get("totalPauseMs") is not None:
+                    self.gc.append({"at": at, "pause_ms": gc["totalPauseMs"],
+                                    "gen0": gc.get("gen0Collections"), "gen2": gc.get("gen2Collections")})
+                self._stop.wait(self.gc_interval)
+
+    def start(self) -> "ResourceSampler":
+        loops = [self._sample_loop] + ([self._gc_loop] if self.health_url else [])
+        for loop in loops:
+            thread = threading.Thread(target=loop, name=f"resource-{loop.__name__.strip('_')}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def stop(self):
+        self._stop.set()
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+    def __enter__(self) -> "ResourceSampler":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    @staticmethod
+    def _baseline(rows: List[Dict[str, float]], name: str) -> Optional[float]:
+        """Median per-second rate of a counter between consecutive samples over the run"""
+        rates = [rate for first, last in zip(rows, rows[1:])
+                 if (rate := _rate(first, last, name)) is not None]
+        return quantile(rates, 50) if rates else None
+
+    def analyze(self, spikes: List[Spike]) -> List[Spike]:
+        """Fill in the server metrics for each spike's time range and pick a verdict"""
+        rows, gc_rows = self.samples.rows(), self.gc.rows()
+        times, gc_times = [row["at"] for row in rows], [row["at"] for row in gc_rows]
+        baselines = {name: self._baseline(rows, name) for name in ("voluntary_switches", "syscalls")}
+        for spike in spikes:
+            end = spike.start + spike.elapsed
+            self._classify(spike, _between(rows, times, spike.start, end),
+                           _between(gc_rows, gc_times, spike.start, end), baselines)
+        return spikes
+
+    def _classify(self, spike: Spike, rows: List[Dict[str, float]], gc_rows: List[Dict[str, float]],
+                  baselines: Dict[str, Optional[float]]):
+        if len(rows) < 2:
+            return
+        first, last = rows[0], rows[-1]
+        cpu_rate = _rate(first, last, "cpu_seconds")
+        spike.cpu = cpu_rate / self.cpus if cpu_rate is not None else None
+        spike.running = _mean(rows, "running_threads")
+        spike.blocked = _mean(rows, "blocked_threads")
+        spike.switch_rate = _rate(first, last, "voluntary_switches")
+        spike.syscall_rate = _rate(first, last, "syscalls")
+        if len(gc_rows) >= 2:
+            spike.gc_pause_ms = gc_rows[-1]["pause_ms"] - gc_rows[0]["pause_ms"]
+
+        # GC deltas cover a whole polling interval; credit the request with its share
+        gc_span = gc_rows[-1]["at"] - gc_rows[0]["at"] if len(gc_rows) >= 2 else 0
+        gc_share = (spike.gc_pause_ms / 1000 / gc_span) if spike.gc_pause_ms and gc_span > 0 else 0.0
+
+        def busy(value: Optional[float], name: str) -> bool:
+            baseline = baselines.get(name)
+            return value is not None and baseline is not None and value > RATE_FACTOR * max(baseline, 1.0)
+
+        if spike.cpu is not None and spike.cpu >= CPU_SATURATED:
+            spike.verdict = "cpu"
+        elif gc_share >= GC_SHARE:
+            spike.verdict = "gc"
+        elif spike.blocked:
+            spike.verdict = "disk-io"
+        elif ((spike.cpu or 0.0) < CPU_SATURATED / 2 and busy(spike.switch_rate, "voluntary_switches")
+              and not busy(spike.syscall_rate, "syscalls")):
+            spike.verdict = "lock"
+        else:
+            spike.verdict = "external"
+
+    def spikes(self, min_ms: float = 100.0, factor: float = 3.0,
+               suites: Optional[List[Tuple[str, float, float]]] = None) -> List[Spike]:
+        """Requests slower than `factor` x their endpoint's median (and `min_ms`), analyzed.
+
+        `suites` is a list of (name, start, end) used to label each spike.
+        """
+        requests = list(self.requests)
+        by_endpoint: Dict[Tuple[str, str], List[float]] = {}
+        for _, elapsed, method, endpoint in requests:
+            by_endpoint.setdefault((method, endpoint), []).append(elapsed)
+        medians = {key: quantile(values, 50) for key, values in by_endpoint.items()}
+
+        found = []
+        for start, elapsed, method, endpoint in requests:
+            if elapsed * 1000 < min_ms or elapsed < factor * medians[(method, endpoint)]:
+                continue
+            suite = next((name for name, begin, end in suites or () if begin <= start <= end), "")
+            found.append(Spike(method, endpoint, start, elapsed, suite))
+        return self.analyze(found)
+
+def format_spike_report(spikes: List[Spike], limit: int = 20) -> List[str]:
+    """Slowest spikes first, then how many spikes each verdict explains per endpoint"""
+    def num(value: Optional[float], width: int, scale: float = 1.0, digits: int = 0) -> str:
+        return f"{value * scale:{width}.{digits}f}" if value is not None else f"{'-':>{width}}"
+
+    header = (f"{'method':<7} {'endpoint':<34} {'ms':>7} {'cpu %':>6} {'run':>4} {'D':>3} "
+              f"{'vcsw/s':>7} {'sysc/s':>7} {'gc ms':>6}  verdict")
+    lines = [header, "-" * len(header)]
+    for spike in sorted(spikes, key=lambda s: s.elapsed, reverse=True)[:limit]:
+        lines.append(f"{spike.method:<7} {spike.endpoint[:34]:<34} {spike.elapsed * 1000:7.1f} "
+                     f"{num(spike.cpu, 6, 100, 1)} {num(spike.running, 4, digits=1)} {num(spike.blocked, 3)} "
+                     f"{num(spike.switch_rate, 7)} {num(spike.syscall_rate, 7)} {num(spike.gc_pause_ms, 6, digits=1)}"
+                     f"  {spike.verdict}{f' ({spike.suite})' if spike.suite else ''}")
+
+    counts: Dict[Tuple[str, str], Dict[str, int]] = {}
+    for spike in spikes:
+        verdicts = counts.setdefault((spike.method, spike.endpoint), {})
+        verdicts[spike.verdict] = verdicts.get(spike.verdict, 0) + 1
+    if counts:
+        lines.append("")
+        for (method, endpoint), verdicts in sorted(counts.items()):
+            summary = ", ".join(f"{verdict} {count}" for verdict, count in
+                                sorted(verdicts.items(), key=lambda item: -item[1]))
+            lines.append(f"{method:<7} {endpoint[:34]:<34} {summary}")
+    return lines
@@ -0,0 +1,79 @@
+"""Runs registered suites one after another against shared fixtures"""
+
+import contextlib
+import time
+from typing import Callable, ContextManager, List, Optional
+
+import api_client
+from harness.fixtures import FixtureError, Fixtures
+from harness.output import BOLD, RESET, print_error, print_header, print_info, print_success
+from harness.registry import Suite
+
+class SuiteResult:
+    """Outcome of one suite: 'passed', 'failed' or 'skipped'"""
+
+    def __init__(self, suite: Suite, status: str, elapsed: float, message: str = "",
+                 started: Optional[float] = None):
+        self.suite = suite
+        self.status = status
+        self.elapsed = elapsed
+        self.message = message
+        self.started = started  # time.perf_counter() when the suite started
+
+def api_available(fixtures: Fixtures, timeout: float = 2) -> bool:
+    """Any answer from /health means the API is up; it says 503 while the database is down"""
+    return api_client.probe_health(fixtures.base_url, timeout) is not None
+
+def run_suite(suite: Suite, fixtures: Fixtures) -> SuiteResult:
+    print_header(f"Suite: {suite.name}" + (f" - {suite.description}" if suite.description else ""))
+    start = time.perf_counter()
+    try:
+        outcome = suite.func(fixtures)
+    except FixtureError as e:
+        return SuiteResult(suite, "skipped", time.perf_counter() - start, f"fixture unavailable: {e}", start)
+    except SystemExit as e:
+        # Standalone code paths still call sys.exit()
+        status = "passed" if e.code in (None, 0) else "failed"
+        return SuiteResult(suite, status, time.perf_counter() - start,
+                           f"exit code {e.code}" if e.code else "", start)
+    except Exception as e:
+        return SuiteResult(suite, "failed", time.perf_counter() - start, f"{type(e).__name__}: {e}", start)
+    status = "failed" if outcome is False else "passed"
+    return SuiteResult(suite, status, time.perf_counter() - start, started=start)
+
+def run(suites: List[Suite], fixtures: Fixtures, api_up: Optional[bool] = None,
+        around_suite: Optional[Callable[[Suite], ContextManager]] = None) -> List[SuiteResult]:
+    """Run suites in order; API suites are skipped when the API is down.
+
+    `around_suite(suite)` returns a context manager wrapped around each suite
+    that runs (profilers measure per suite this way).
+    """
+    if any("build" in suite.uses for suite in suites):
+        # Start compiling now so the build overlaps with the other suites
+        fixtures.build
+    if api_up is None and any(suite.needs_api for suite in suites):
+        api_up = api_available(fixtures)
+
+    results = []
+    for suite in suites:
+        if suite.needs_api and not api_up:
+            results.append(SuiteResult(suite, "skipped", 0.0, f"API not reachable at {fixtures.base_url}"))
+            continue
+        with around_suite(suite) if around_suite else contextlib.nullcontext():
+            results.append(run_suite(suite, fixtures))
+    return results
+
+def print_report(results: List[SuiteResult], fixtures: Fixtures):
+    print_header("Harness Summary")
+    for result in results:
+        line = f"{result.suite.name:<28} {result.status:<8} {result.elapsed:6.1f}s"
+        if result.message:
+            line += f"  {result.message}"
+        {"passed": print_success, "failed": print_error}.get(result.status, print_info)(line)
+
+    if fixtures.setup_times:
+        setup = ", ".join(f"{name} {seconds:.2f}s" for name, seconds in fixtures.setup_times)
+        print_info(f"Shared setup (once per run): {setup}")
+    counts = {status: sum(1 for result in results if result.status == status)
+              for status in ("passed", "failed", "skipped")}
+    print(f"\n{BOLD}{counts['passed']} passed, {counts['failed']} failed, {counts['skipped']} skipped{RESET}")
@@ -0,0 +1,327 @@
+"""
+Soak test: the procedure realization and medical shift CRUD flows at
+constant load for hours, watching the API process for drift.
+
+Every --soak-interval seconds a window is closed: request p50/p99 and
+errors since the previous window, the server's RSS, threads, open file
+descriptors and CPU from /proc, and GET /health, which reports the GC heap
+and collection counts. At the end a least-squares trend per metric (after
+the warm-up windows) is extrapolated over the run; a metric is flagged when
+it grew by more than its limit and the slope is clearly non-zero
+(t-statistic above T_LIMIT), which separates steady leaks and slowdowns
+from noise.
+
+Each flow deletes what it created, so the tables do not grow and list
+endpoints do not slow down simply because they return more rows.
+
+    python -m harness --soak 8h --start-api
+    python -m harness --soak 30m --server-pid 12345 --soak-log soak.jsonl
+"""
+
+import json
+import re
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import requests
+
+import api_client
+import load_generator
+from harness import procfs
+from harness.fixtures import Fixtures, _field
+from harness.output import BOLD, RESET, print_error, print_header, print_info, print_success
+from payloads import ROLE_ASSISTANT, build_realization_payload, build_shift_payload, find_realization_id
+from perf_regression import Trend, linear_trend, quantile
+
+DEFAULT_RATE = 2.0  # CRUD flows per second
+DEFAULT_WORKERS = 8
+DEFAULT_INTERVAL = 60.0
+WARMUP_WINDOWS = 2  # JIT, connection pools and caches settle first
+MIN_WINDOWS = 6
+T_LIMIT = 3.0
+MAX_ERROR_RATE = 0.01
+
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)([smhd]?)")
+_UNITS = {"": 1, "s": 1, "m": 60, "h": 3600, "d": 86400}
+
+def parse_duration(text: str) -> float:
+    """'90', '90s', '45m', '8h', '1h30m' -> seconds"""
+    text = text.strip().lower()
+    position, total = 0, 0.0
+    while position < len(text):
+        match = _DURATION_PART.match(text, position)
+        if not match:
+            raise ValueError(f"invalid duration: {text!r}")
+        total += float(match.group(1)) * _UNITS[match.group(2)]
+        position = match.end()
+    if total <= 0:
+        raise ValueError(f"invalid duration: {text!r}")
+    return total
+
+class Window:
+    """Client and server metrics for one sampling interval"""
+
+    def __init__(self, index: int, end: float, latencies: List[float], errors: int,
+                 sample: Optional[procfs.ProcessSample], cpu_percent: Optional[float],
+                 health_ms: Optional[float], gc: Dict[str, Any]):
+        self.index = index
+        self.end = end  # seconds since the soak started
+        self.requests = len(latencies) + errors
+        self.errors = errors
+        self.p50 = quantile(latencies, 50) if latencies else None
+        self.p99 = quantile(latencies, 99) if latencies else None
+        self.sample = sample
+        self.cpu_percent = cpu_percent
+        self.health_ms = health_ms
+        self.gc = gc
+
+    def metric(self, name: str) -> Optional[float]:
+        sample = self.sample
+        if name == "p99":
+            return self.p99
+        if name == "rss" and sample:
+            return sample.rss_kb / 1024
+        if name == "threads" and sample:
+            return sample.threads
+        if name == "fds" and sample:
+            return sample.fds
+        if name == "gc_heap" and self.gc.get("heapBytes") is not None:
+            return self.gc["heapBytes"] / 1024 / 1024
+        return None
+
+    def to_dict(self) -> Dict[str, Any]:
+        sample = self.sample
+        return {
+            "window": self.index, "elapsed_s": round(self.end, 1), "requests": self.requests,
+            "errors": self.errors, "p50_ms": self.p50, "p99_ms": self.p99,
+            "rss_kb": sample.rss_kb if sample else None, "threads": sample.threads if sample else None,
+            "fds": sample.fds if sample else None, "cpu_percent": self.cpu_percent,
+            "health_ms": self.health_ms, "gc": self.gc,
+        }
+
+# (metric, label, unit, relative growth over the run that is flagged; None = report only)
+METRICS: List[Tuple[str, str, str, Optional[float]]] = [
+    ("rss", "RSS", "MB", 0.10),
+    ("gc_heap", "GC heap", "MB", 0.10),
+    ("fds", "open fds", "", 0.10),
+    ("threads", "threads", "", None),
+    ("p99", "p99 latency", "ms", 0.25),
+]
+
+class Drift:
+    """Trend of one metric over the soak, extrapolated from first to last window"""
+
+    def __init__(self, name: str, label: str, unit: str, trend: Trend, start: float, end: float,
+                 limit: Optional[float]):
+        self.name = name
+        self.label = label
+        self.unit = unit
+        self.trend = trend
+        self.start = start
+        self.end = end
+        self.limit = limit
+
+    @property
+    def growth(self) -> float:
+        return (self.end - self.start) / self.start if self.start > 0 else 0.0
+
+    @property
+    def flagged(self) -> bool:
+        return (self.limit is not None and self.growth > self.limit
+                and self.trend.t_statistic > T_LIMIT)
+
+    def __str__(self) -> str:
+        unit = f" {self.unit}" if self.unit else ""
+        return (f"{self.label:<12} {self.start:9.1f} -> {self.end:9.1f}{unit:<3} "
+                f"({self.growth * 100:+6.1f}%, {self.trend.slope:+.2f}{unit}/h, t={self.trend.t_statistic:.1f})")
+
+def detect_drift(windows: List[Window], warmup: int = WARMUP_WINDOWS) -> List[Drift]:
+    """Linear trend per metric over the windows after warm-up, in units per hour"""
+    steady = windows[warmup:]
+    drifts = []
+    for name, label, unit, limit in METRICS:
+        points = [(w.end / 3600, w.metric(name)) for w in steady]
+        points = [(x, y) for x, y in points if y is not None]
+        if len(points) < MIN_WINDOWS:
+            continue
+        trend = linear_trend(points)
+        if trend is None:
+            continue
+        drifts.append(Drift(name, label, unit, trend, trend.at(points[0][0]), trend.at(points[-1][0]), limit))
+    return drifts
+
+class SoakMonitor:
+    """api_client listener collecting latencies per window, plus server sampling"""
+
+    def __init__(self, base_url: str, pid: Optional[int]):
+        self.base_url = base_url
+        self.pid = pid
+        self.windows: List[Window] = []
+        self._latencies: List[float] = []
+        self._errors = 0
+        self._lock = threading.Lock()
+        self._start = time.perf_counter()
+        self._previous = procfs.read_sample(pid) if pid else None
+        self._health_session = requests.Session()
+
+    def observe(self, method: str, url: str, response, elapsed: float):
+        if url.rstrip("/").endswith("/health"):
+            return
+        with self._lock:
+            if response is None or response.status_code >= 400:
+                self._errors += 1
+            else:
+                self._latencies.append(elapsed * 1000)
+
+    def _health(self) -> Tuple[Optional[float], Dict[str, Any]]:
+        # Polled on a session of its own, so api_client listeners (this
+        # monitor included) never count it as soak traffic
+        start = time.perf_counter()
+        try:
+            response = self._health_session.get(f"{self.base_url}/health", timeout=10)
+        except Exception:
+            return None, {}
+        elapsed = (time.perf_counter() - start) * 1000
+        try:
+            body = response.json()
+        except ValueError:
+            return elapsed, {}
+        return elapsed, (_field(body, "gc") or {}) if isinstance(body, dict) else {}
+
+    def close(self):
+        self._health_session.close()
+
+    def close_window(self) -> Window:
+        with self._lock:
+            latencies, self._latencies = self._latencies, []
+            errors, self._errors = self._errors, 0
+        sample = procfs.read_sample(self.pid) if self.pid else None
+        cpu_percent = None
+        if sample and self._previous and sample.at > self._previous.at:
+            cpu_percent = (sample.cpu_seconds - self._previous.cpu_seconds) / (sample.at - self._previous.at) * 100
+        if sample:
+            self._previous = sample
+        health_ms, gc = self._health()
+        window = Window(len(self.windows), time.perf_counter() - self._start, latencies, errors,
+                        sample, cpu_percent, health_ms, gc)
+        self.windows.append(window)
+        return window
+
+WINDOW_HEADER = (f"{'elapsed':>8} {'reqs':>6} {'err':>4} {'p50 ms':>7} {'p99 ms':>7} {'rss MB':>7} "
+                 f"{'thr':>4} {'fds':>5} {'cpu %':>6} {'heap MB':>8} {'gen2':>5} {'health':>7}")
+
+def format_window(window: Window) -> str:
+    def num(value: Optional[float], width: int, digits: int = 1) -> str:
+        return f"{value:{width}.{digits}f}" if value is not None else f"{'-':>{width}}"
+
+    elapsed = f"{int(window.end // 3600)}:{int(window.end % 3600 // 60):02d}:{int(window.end % 60):02d}"
+    return (f"{elapsed:>8} {window.requests:>6} {window.errors:>4} {num(window.p50, 7)} {num(window.p99, 7)} "
+            f"{num(window.metric('rss'), 7)} {num(window.metric('threads'), 4, 0)} "
+            f"{num(window.metric('fds'), 5, 0)} {num(window.cpu_percent, 6)} {num(window.metric('gc_heap'), 8)} "
+            f"{num(window.gc.get('gen2Collections'), 5, 0)} {num(window.health_ms, 7)}")
+
+def crud_operations(fx: Fixtures) -> List[Tuple[str, float, load_generator.Operation]]:
+    """Create/list/update/delete flows for procedure realizations and medical shifts"""
+
+    def realization_flow() -> bool:
+        # The POST answers without the new id, so the realization is found
+        # again in GET /procedures/user by its unique location
+        url = f"{fx.base_url}/procedures/realizations"
+        location = f"Soak {uuid.uuid4().hex[:12]}"
+        response = api_client.post(url, json=build_realization_payload(fx.procedure_requirement_id,
+                                                                       location=location))
+        if response.status_code not in (200, 201):
+            return False
+        response = api_client.get(f"{fx.base_url}/procedures/user")
+        realization_id = find_realization_id(response.json(), location) if response.status_code == 200 else None
+        if realization_id is None:
+            return False
+        update = build_realization_payload(fx.procedure_requirement_id, ROLE_ASSISTANT, "Updated Hospital")
+        ok = api_client.put(f"{url}/{realization_id}", json=update).status_code in (200, 204)
+        return api_client.delete(f"{url}/{realization_id}").status_code in (200, 204) and ok
+
+    def flow(collection: str, build: Callable[[int], Dict[str, Any]], update: Dict[str, Any]) -> Callable[[], bool]:
+        def operation() -> bool:
+            internship_id = fx.internship_id
+            url = f"{fx.base_url}/{collection}"
+            response = api_client.post(url, json=build(internship_id))
+            if response.status_code not in (200, 201):
+                return False
+            entity_id = response.json()
+            ok = api_client.get(f"{url}?internshipId={internship_id}").status_code == 200
+            ok = api_client.put(f"{url}/{entity_id}", json=update).status_code in (200, 204) and ok
+            return api_client.delete(f"{url}/{entity_id}").status_code in (200, 204) and ok
+        return operation
+
+    return [
+        ("realization CRUD", 1, realization_flow),
+        ("medical shift CRUD", 1, flow("medicalshifts", build_shift_payload,
+                                       {"hours": 10, "minutes": 0, "location": "ICU"})),
+    ]
+
+def run_soak(fx: Fixtures, duration: float, rate: float = DEFAULT_RATE, workers: int = DEFAULT_WORKERS,
+             interval: float = DEFAULT_INTERVAL, pid: Optional[int] = None, log_path: Optional[str] = None) -> bool:
+    """Run the soak; False when a metric drifted or too many requests failed"""
+    print_header(f"Soak test: {duration / 3600:.2f}h at {rate:g} CRUD flows/s")
+    if pid:
+        print_info(f"Sampling API process {pid} every {interval:g}s")
+    else:
+        print_info("API process not found - only client latencies and /health are sampled")
+    # Sign in, create the internship and look up a requirement before the clock starts
+    fx.internship_id
+    fx.procedure_requirement_id
+
+    monitor = SoakMonitor(fx.base_url, pid)
+    api_client.add_listener(monitor.observe)
+    api_client.configure(pool_size=max(workers, api_client.DEFAULT_POOL_SIZE))
+    log = open(log_path, "a", encoding="utf-8") if log_path else None
+    stop = threading.Event()
+
+    def sample_windows():
+        print(WINDOW_HEADER)
+        while not stop.wait(interval):
+            window = monitor.close_window()
+            print(format_window(window), flush=True)
+            if log:
+                log.write(json.dumps(window.to_dict()) + "\n")
+                log.flush()
+
+    sampler = threading.Thread(target=sample_windows, name="soak-sampler", daemon=True)
+    sampler.start()
+    try:
+        phases = [load_generator.Phase("soak", duration, rate, rate)]
+        result = load_generator.run_load(crud_operations(fx), phases, workers)
+    finally:
+        stop.set()
+        sampler.join()
+        api_client.remove_listener(monitor.observe)
+        monitor.close()
+        if log:
+            log.close()
+
+    print(f"\n{BOLD}Flow response times (from scheduled arrival):{RESET}")
+    for line in load_generator.format_report(result):
+        print(line)
+
+    passed = True
+    error_rate = result.error_rate
+    if error_rate > MAX_ERROR_RATE:
+        print_error(f"{error_rate * 100:.2f}% of flows failed (limit {MAX_ERROR_RATE * 100:g}%)")
+        passed = False
+
+    drifts = detect_drift(monitor.windows)
+    if not drifts:
+        print_info(f"Only {len(monitor.windows)} windows - need {WARMUP_WINDOWS + MIN_WINDOWS} "
+                   f"for a trend; run longer or lower --soak-interval")
+        return passed
+    print(f"\n{BOLD}Trend over the run (after {WARMUP_WINDOWS} warm-up windows):{RESET}")
+    for drift in drifts:
+        if drift.flagged:
+            print_error(f"{drift}  DRIFT")
+        elif drift.limit is None:
+            print_info(str(drift))
+        else:
+            print_success(str(drift))
+    return passed and not any(drift.flagged for drift in drifts)
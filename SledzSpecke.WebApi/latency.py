@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Latency histograms for the API test scripts.
+
+LatencyHistogram is an HDR-style histogram: buckets grow logarithmically,
+so every recorded value is kept with a bounded relative error (1% by
+default) from microseconds to minutes. Memory depends on the value range,
+not on the number of samples, which keeps load runs cheap.
+
+LatencyRecorder keeps one histogram per (HTTP method, endpoint) and plugs
+into api_client as a request listener:
+
+    recorder = LatencyRecorder()
+    api_client.add_listener(recorder.observe)
+"""
+
+import math
+import re
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+SUMMARY_PERCENTILES = (50.0, 90.0, 99.0, 99.9)
+
+_ID_SEGMENT = re.compile(r"^(\d+|[0-9a-fA-F]{8}-[0-9a-fA-F-]{27})$")
+
+def normalize_endpoint(url: str) -> str:
+    """'/api/procedures/42?x=1' -> '/procedures/{id}'"""
+    path = urlsplit(url).path or "/"
+    if path.startswith("/api/"):
+        path = path[4:]
+    segments = ["{id}" if _ID_SEGMENT.match(segment) else segment
+                for segment in path.rstrip("/").split("/")]
+    return "/".join(segments) or "/"
+
+class LatencyHistogram:
+    """Log-bucketed latency histogram (values in seconds)"""
+
+    def __init__(self, lowest: float = 1e-5, highest: float = 3600.0, relative_error: float = 0.01):
+        self.lowest = lowest
+        self.highest = highest
+        self.relative_error = relative_error
+        self._log_base = math.log1p(2 * relative_error)
+        self.counts: Dict[int, int] = {}
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = 0.0
+
+    def _index(self, value: float) -> int:
+        if value <= self.lowest:
+            return 0
+        return int(math.log(min(value, self.highest) / self.lowest) / self._log_base) + 1
+
+    def _value(self, index: int) -> float:
+        """Representative (mid-bucket) value of a bucket"""
+        if index == 0:
+            return self.lowest
+        return self.lowest * math.exp((index - 0.5) * self._log_base)
+
+    def record(self, value: float, count: int = 1):
+        index = self._index(value)
+        self.counts[index] = self.counts.get(index, 0) + count
+        self.count += count
+        self.total += value * count
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def merge(self, other: "LatencyHistogram"):
+        if (other.lowest, other.relative_error) != (self.lowest, self.relative_error):
+            raise ValueError("Cannot merge histograms with different bucket layouts")
+        for index, count in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + count
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def percentile(self, pct: float) -> float:
+        if self.count == 0:
+            return 0.0
+        rank = max(1, math.ceil(pct / 100.0 * self.count))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                return min(max(self._value(index), self.min), self.max)
+        return self.max
+
+    def percentiles(self, pcts: Iterable[float] = SUMMARY_PERCENTILES) -> Dict[float, float]:
+        return {pct: self.percentile(pct) for pct in pcts}
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+class LatencyRecorder:
+    """Thread-safe per-(method, endpoint) histograms"""
+
+    def __init__(self):
+        self.histograms: Dict[Tuple[str, str], LatencyHistogram] = {}
+        self.started = time.perf_counter()
+        self.finished: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def record(self, method: str, endpoint: str, seconds: float):
+        key = (method.upper(), endpoint)
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = LatencyHistogram()
+            histogram.record(seconds)
+
+    def observe(self, method: str, url: str, response, elapsed: float):
+        """api_client listener"""
+        self.record(method, normalize_endpoint(url), elapsed)
+
+    def reset(self):
+        """Drop recorded samples and restart the throughput clock"""
+        with self._lock:
+            self.histograms.clear()
+        self.started = time.perf_counter()
+        self.finished = None
+
+    def stop(self):
+        self.finished = time.perf_counter()
+
+    @property
+    def elapsed(self) -> float:
+        return (self.finished or time.perf_counter()) - self.started
+
+    def total(self) -> LatencyHistogram:
+        merged = LatencyHistogram()
+        with self._lock:
+            for histogram in self.histograms.values():
+                merged.merge(histogram)
+        return merged
+
+    def format_table(self) -> List[str]:
+        """Per-endpoint percentile table (milliseconds) plus throughput"""
+        elapsed = self.elapsed
+        header = f"{'method':<7} {'endpoint':<38} {'count':>6} {'p50':>8} {'p90':>8} " \
+                 f"{'p99':>8} {'p99.9':>8} {'max':>8} {'req/s':>7}"
+        lines = [header, "-" * len(header)]
+
+        def row(method: str, endpoint: str, histogram: LatencyHistogram):
+            p = histogram.percentiles()
+            throughput = histogram.count / elapsed if elapsed > 0 else 0.0
+            lines.append(
+                f"{method:<7} {endpoint[:38]:<38} {histogram.count:>6} "
+                + " ".join(f"{p[pct] * 1000:>8.1f}" for pct in SUMMARY_PERCENTILES)
+                + f" {histogram.max * 1000:>8.1f} {throughput:>7.1f}")
+
+        with self._lock:
+            items = sorted(self.histograms.items(), key=lambda item: (item[0][1], item[0][0]))
+        for (method, endpoint), histogram in items:
+            row(method, endpoint, histogram)
+        if len(items) > 1:
+            row("ALL", "", self.total())
+        return lines
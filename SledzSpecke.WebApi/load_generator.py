@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Open-loop load generator used by `test_api.py --load`.
+
+Requests arrive on a Poisson schedule at the target rate regardless of how
+fast the API answers (open-loop), and are executed by a pool of virtual
+users. When every virtual user is busy, new arrivals wait in a queue and
+that wait is part of the reported response time - slow responses can't hide
+queueing the way a closed loop ("send next request when the previous one
+returns") does.
+
+A run is a list of phases; each phase ramps the arrival rate linearly from
+`start_rps` to `end_rps` over `duration` seconds. build_phases() creates the
+usual ramp-up / steady-state / ramp-down profile.
+"""
+
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+from latency import LatencyHistogram
+
+# An operation returns True when the API answered as expected
+Operation = Callable[[], bool]
+
+class Phase:
+    """A load phase with a linearly changing arrival rate"""
+
+    def __init__(self, name: str, duration: float, start_rps: float, end_rps: float):
+        self.name = name
+        self.duration = duration
+        self.start_rps = start_rps
+        self.end_rps = end_rps
+
+    def rate_at(self, elapsed: float) -> float:
+        if self.duration <= 0:
+            return self.end_rps
+        fraction = min(max(elapsed / self.duration, 0.0), 1.0)
+        return self.start_rps + (self.end_rps - self.start_rps) * fraction
+
+    def cumulative(self, elapsed: float) -> float:
+        """Expected arrivals in the first `elapsed` seconds (integral of the rate)"""
+        elapsed = min(max(elapsed, 0.0), self.duration)
+        slope = (self.end_rps - self.start_rps) / self.duration if self.duration > 0 else 0.0
+        return self.start_rps * elapsed + slope * elapsed * elapsed / 2
+
+    def time_at(self, arrivals: float) -> float:
+        """Inverse of cumulative(): when `arrivals` expected arrivals have accumulated"""
+        slope = (self.end_rps - self.start_rps) / self.duration if self.duration > 0 else 0.0
+        # Root of slope/2 t^2 + start_rps t - arrivals = 0, in a form that is
+        # stable for flat (slope 0), rising and falling rates
+        denominator = self.start_rps + max(self.start_rps ** 2 + 2 * slope * arrivals, 0.0) ** 0.5
+        return 2 * arrivals / denominator if denominator > 0 else 0.0
+
+def build_phases(target_rps: float, ramp_up: float, steady: float, ramp_down: float) -> List[Phase]:
+    """Ramp-up, steady-state and ramp-down phases (zero-length phases are dropped)"""
+    phases = [
+        Phase("ramp-up", ramp_up, 0.0, target_rps),
+        Phase("steady", steady, target_rps, target_rps),
+        Phase("ramp-down", ramp_down, target_rps, 0.0),
+    ]
+    return [phase for phase in phases if phase.duration > 0]
+
+class OperationStats:
+    """Outcome of one operation within one phase"""
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.dropped = 0
+        self.response_times = LatencyHistogram()  # arrival -> completion (includes queueing)
+        self.service_times = LatencyHistogram()   # request sent -> completion
+
+class LoadResult:
+    """Collected statistics keyed by (phase, operation)"""
+
+    def __init__(self, phases: List[Phase]):
+        self.phases = phases
+        self.stats: Dict[Tuple[str, str], OperationStats] = {}
+        self.max_backlog = 0
+        self._lock = threading.Lock()
+
+    def _stats(self, phase: str, operation: str) -> OperationStats:
+        key = (phase, operation)
+        if key not in self.stats:
+            self.stats[key] = OperationStats()
+        return self.stats[key]
+
+    def record(self, phase: str, operation: str, ok: bool, response_time: float, service_time: float):
+        with self._lock:
+            stats = self._stats(phase, operation)
+            stats.count += 1
+            if not ok:
+                stats.errors += 1
+            stats.response_times.record(response_time)
+            stats.service_times.record(service_time)
+
+    def record_dropped(self, phase: str, operation: str):
+        with self._lock:
+            self._stats(phase, operation).dropped += 1
+
+    def totals(self, phase: Optional[str] = None) -> OperationStats:
+        """Merge stats of all operations, optionally limited to one phase"""
+        merged = OperationStats()
+        for (phase_name, _), stats in self.stats.items():
+            if phase is not None and phase_name != phase:
+                continue
+            merged.count += stats.count
+            merged.errors += stats.errors
+            merged.dropped += stats.dropped
+            merged.response_times.merge(stats.response_times)
+            merged.service_times.merge(stats.service_times)
+        return merged
+
+    @property
+    def error_rate(self) -> float:
+        totals = self.totals()
+        attempted = totals.count + totals.dropped
+        return (totals.errors + totals.dropped) / attempted if attempted else 0.0
+
+def run_load(operations: List[Tuple[str, float, Operation]],
+             phases: List[Phase],
+             virtual_users: int,
+             max_backlog: Optional[int] = None,
+             seed: Optional[int] = None) -> LoadResult:
+    """Drive `operations` (name, weight, callable) through `phases`.
+
+    `virtual_users` bounds the number of requests in flight. Arrivals beyond
+    `max_backlog` queued requests (default: 100 per virtual user) are dropped
+    and counted, so an overloaded API can't grow the queue without limit.
+    """
+    rng = random.Random(seed)
+    names = [name for name, _, _ in operations]
+    weights = [weight for _, weight, _ in operations]
+    funcs = {name: func for name, _, func in operations}
+    if max_backlog is None:
+        max_backlog = virtual_users * 100
+
+    result = LoadResult(phases)
+    backlog = 0
+    backlog_lock = threading.Lock()
+
+    def execute(phase_name: str, operation: str, arrival: float):
+        nonlocal backlog
+        with backlog_lock:
+            backlog -= 1
+        started = time.perf_counter()
+        try:
+            ok = bool(funcs[operation]())
+        except Exception:
+            ok = False
+        finished = time.perf_counter()
+        result.record(phase_name, operation, ok, finished - arrival, finished - started)
+
+    with ThreadPoolExecutor(max_workers=virtual_users, thread_name_prefix="vu") as executor:
+        for phase in phases:
+            phase_start = time.perf_counter()
+            # Exponential gaps are drawn on the cumulative rate and mapped back
+            # to time; a gap drawn at the current rate would be huge at the
+            # start of a ramp-up and skip the whole phase
+            total = phase.cumulative(phase.duration)
+            arrivals = 0.0
+            while True:
+                arrivals += rng.expovariate(1.0)
+                if arrivals >= total:
+                    break
+                next_arrival = phase_start + phase.time_at(arrivals)
+
+                delay = next_arrival - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+
+                operation = rng.choices(names, weights)[0]
+                with backlog_lock:
+                    if backlog >= max_backlog:
+                        dropped = True
+                    else:
+                        dropped = False
+                        backlog += 1
+                        result.max_backlog = max(result.max_backlog, backlog)
+                if dropped:
+                    result.record_dropped(phase.name, operation)
+                else:
+                    # Response time is measured from the scheduled arrival, not
+                    # from when a virtual user picked the request up.
+                    executor.submit(execute, phase.name, operation, next_arrival)
+
+    return result
+
+def format_report(result: LoadResult) -> List[str]:
+    """Human-readable per-phase and per-operation summary lines"""
+    lines = []
+    header = f"{'phase':<10} {'operation':<22} {'count':>7} {'err':>5} {'drop':>5} {'rps':>7} " \
+             f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}"
+    lines.append(header)
+    lines.append("-" * len(header))
+
+    def row(phase_name: str, operation: str, stats: OperationStats, duration: float):
+        times = stats.response_times
+        rps = stats.count / duration if duration > 0 else 0.0
+        lines.append(
+            f"{phase_name:<10} {operation:<22} {stats.count:>7} {stats.errors:>5} {stats.dropped:>5} {rps:>7.1f} "
+            f"{times.percentile(50) * 1000:>8.1f} {times.percentile(95) * 1000:>8.1f} "
+            f"{times.percentile(99) * 1000:>8.1f} {times.max * 1000:>8.1f}")
+
+    for phase in result.phases:
+        for (phase_name, operation), stats in sorted(result.stats.items()):
+            if phase_name == phase.name:
+                row(phase_name, operation, stats, phase.duration)
+        row(phase.name, "(all)", result.totals(phase.name), phase.duration)
+    lines.append(f"Max queued requests: {result.max_backlog}")
+    return lines
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Request payloads for the SledzSpecke API.
+
+Shared by test_api.py, the load and soak workloads and seed_data.py.
+Importing this module has no side effects: it does not pull in the harness
+or register api_client listeners.
+"""
+
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+# Module ID for specialization 1: 1*100 + 1
+MODULE_ID = 101
+# ProcedureRole, serialized as its value: Operator counts as code A, Assistant as code B
+ROLE_OPERATOR = 0
+ROLE_ASSISTANT = 1
+
+def _field(record: Dict[str, Any], name: str) -> Any:
+    """camelCase or PascalCase key, whichever the API sent"""
+    return record.get(name, record.get(name[:1].upper() + name[1:]))
+
+def build_internship_payload() -> Dict[str, Any]:
+    """Payload for POST /internships"""
+    return {
+        "specializationId": 1,
+        "moduleId": MODULE_ID,
+        "institutionName": "Test Hospital",
+        "departmentName": "Cardiology",
+        "supervisorName": "Dr. Test",
+        "startDate": datetime.utcnow().strftime('%Y-%m-%dT%H:%M:%SZ'),
+        "endDate": (datetime.utcnow() + timedelta(days=30)).strftime('%Y-%m-%dT%H:%M:%SZ')
+    }
+
+def build_procedure_payload(internship_id: int, smk_version: str = "new") -> Dict[str, Any]:
+    """Payload for POST /procedures"""
+    return {
+        "internshipId": internship_id,
+        "date": datetime.utcnow().strftime('%Y-%m-%dT%H:%M:%SZ'),
+        "year": 1,  # Education year, not calendar year
+        "code": "CARD-001" if smk_version == "new" else "P001",
+        "location": "Test Hospital",
+        "status": "completed",
+        "operatorCode": "OP001",
+        "performingPerson": "Dr. Test",
+        "patientInitials": "JD",
+        "patientGender": "M"
+    }
+
+def build_shift_payload(internship_id: int) -> Dict[str, Any]:
+    """Payload for POST /medicalshifts"""
+    return {
+        "internshipId": internship_id,
+        "date": datetime.utcnow().strftime('%Y-%m-%dT%H:%M:%SZ'),
+        "hours": 8,
+        "minutes": 30,
+        "location": "Emergency Department",
+        "year": 1  # Education year, not calendar year
+    }
+
+def build_realization_payload(requirement_id: int, role: int = ROLE_OPERATOR,
+                              location: str = "Test Hospital") -> Dict[str, Any]:
+    """Payload for POST /procedures/realizations"""
+    return {
+        "requirementId": requirement_id,
+        "date": datetime.utcnow().strftime('%Y-%m-%dT%H:%M:%SZ'),
+        "location": location,
+        "role": role,
+        "year": 1  # Education year, not calendar year
+    }
+
+def first_requirement_id(module: Dict[str, Any]) -> Optional[int]:
+    """RequirementId of the first procedure in a GET /procedures/modules/{id} body"""
+    procedures = _field(module, "procedures") or []
+    return _field(procedures[0], "requirementId") if procedures else None
+
+def find_realization_id(user_procedures: Dict[str, Any], location: str) -> Optional[int]:
+    """Id of the realization recorded at `location` in a GET /procedures/user body.
+
+    POST /procedures/realizations answers with a message, not the new id, so
+    callers give each realization a unique location to find it again.
+    """
+    for module in _field(user_procedures, "modules") or []:
+        for procedure in _field(module, "procedures") or []:
+            for realization in _field(procedure, "realizations") or []:
+                if _field(realization, "location") == location:
+                    return _field(realization, "id")
+    return None
@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+Performance-regression gate for `test_api.py --baseline results.jsonl`.
+
+The current run's per-endpoint latencies are compared with a stored run
+(a JSON Lines file written by `--jsonl`). A single-number diff is too noisy
+to gate a release on, so an endpoint only counts as regressed when all of
+the following hold:
+
+- the chosen percentile (p95 by default) grew by more than the threshold;
+- a bootstrap confidence interval for that relative growth excludes zero;
+- a one-sided Mann-Whitney U test says current latencies are
+  stochastically larger than the baseline ones (p < alpha).
+
+Samples are kept in fixed-size reservoirs, so long load runs don't grow
+memory.
+"""
+
+import json
+import math
+import random
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from latency import normalize_endpoint
+
+Key = Tuple[str, str]  # (method, endpoint)
+
+DEFAULT_RESERVOIR_SIZE = 10000
+MIN_SAMPLES = 5
+
+class Reservoir:
+    """Uniform random sample of at most `size` values (Algorithm R)"""
+
+    def __init__(self, size: int = DEFAULT_RESERVOIR_SIZE, rng: Optional[random.Random] = None):
+        self.size = size
+        self.values: List[float] = []
+        self.seen = 0
+        self._rng = rng or random.Random(0)
+
+    def add(self, value: float):
+        self.seen += 1
+        if len(self.values) < self.size:
+            self.values.append(value)
+        else:
+            slot = self._rng.randrange(self.seen)
+            if slot < self.size:
+                self.values[slot] = value
+
+class SampleCollector:
+    """api_client listener keeping latency samples (ms) per endpoint"""
+
+    def __init__(self, reservoir_size: int = DEFAULT_RESERVOIR_SIZE):
+        self.reservoir_size = reservoir_size
+        self.samples: Dict[Key, Reservoir] = {}
+        self._lock = threading.Lock()
+
+    def add(self, key: Key, elapsed_ms: float):
+        with self._lock:
+            reservoir = self.samples.get(key)
+            if reservoir is None:
+                reservoir = self.samples[key] = Reservoir(self.reservoir_size)
+            reservoir.add(elapsed_ms)
+
+    def observe(self, method: str, url: str, response, elapsed: float):
+        # Failed requests (connection errors) say nothing about API speed
+        if response is not None:
+            self.add((method.upper(), normalize_endpoint(url)), elapsed * 1000)
+
+    def as_lists(self) -> Dict[Key, List[float]]:
+        with self._lock:
+            return {key: list(reservoir.values) for key, reservoir in self.samples.items()}
+
+def load_baseline(path: str, run: Optional[str] = None,
+                  reservoir_size: int = DEFAULT_RESERVOIR_SIZE) -> Dict[Key, List[float]]:
+    """Read request latencies from a --jsonl file.
+
+    The file may hold several appended runs; the last one is used unless
+    `run` names another.
+    """
+    if run is None:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    run = json.loads(line).get("run", run)
+
+    collector = SampleCollector(reservoir_size)
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if record.get("type") != "request" or record.get("run") != run or record.get("error"):
+                continue
+            collector.add((record["method"], record["endpoint"]), float(record["elapsed_ms"]))
+    return collector.as_lists()
+
+def quantile(values: List[float], pct: float) -> float:
+    """Linear-interpolation percentile"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * pct / 100.0
+    lower = math.floor(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+def mann_whitney_greater(current: List[float], baseline: List[float]) -> float:
+    """One-sided p-value for 'current tends to be larger than baseline'.
+
+    Normal approximation with tie correction; fine for the sample sizes a
+    test run produces (>= MIN_SAMPLES per side).
+    """
+    n1, n2 = len(current), len(baseline)
+    combined = sorted([(value, 0) for value in current] + [(value, 1) for value in baseline])
+
+    # Average ranks over ties
+    ranks = [0.0] * len(combined)
+    tie_term = 0.0
+    i = 0
+    while i < len(combined):
+        j = i
+        while j + 1 < len(combined) and combined[j + 1][0] == combined[i][0]:
+            j += 1
+        average_rank = (i + j) / 2.0 + 1
+        for k in range(i, j + 1):
+            ranks[k] = average_rank
+        tied = j - i + 1
+        tie_term += tied ** 3 - tied
+        i = j + 1
+
+    rank_sum = sum(rank for rank, (_, group) in zip(ranks, combined) if group == 0)
+    u = rank_sum - n1 * (n1 + 1) / 2.0
+    n = n1 + n2
+    mean_u = n1 * n2 / 2.0
+    variance = n1 * n2 / 12.0 * ((n + 1) - tie_term / (n * (n - 1)))
+    if variance <= 0:
+        return 1.0
+    z = (u - mean_u - 0.5) / math.sqrt(variance)  # continuity correction
+    return 0.5 * math.erfc(z / math.sqrt(2))
+
+def bootstrap_relative_change(current: List[float], baseline: List[float], pct: float,
+                              iterations: int = 500, confidence: float = 0.95,
+                              max_samples: int = 2000, seed: int = 0) -> Tuple[float, float]:
+    """Bootstrap CI for (current_pct - baseline_pct) / baseline_pct"""
+    rng = random.Random(seed)
+    # Subsample big inputs; the CI width is dominated by the smaller side anyway
+    if len(current) > max_samples:
+        current = rng.sample(current, max_samples)
+    if len(baseline) > max_samples:
+        baseline = rng.sample(baseline, max_samples)
+
+    changes = []
+    for _ in range(iterations):
+        base = quantile(rng.choices(baseline, k=len(baseline)), pct)
+        cur = quantile(rng.choices(current, k=len(current)), pct)
+        if base > 0:
+            changes.append((cur - base) / base)
+    if not changes:
+        return 0.0, 0.0
+    tail = (1 - confidence) / 2 * 100
+    return quantile(changes, tail), quantile(changes, 100 - tail)
+
+class Trend:
+    """Least-squares line y = slope * x + intercept, with the slope's standard error"""
+
+    def __init__(self, slope: float, intercept: float, stderr: float, count: int):
+        self.slope = slope
+        self.intercept = intercept
+        self.stderr = stderr
+        self.count = count
+
+    @property
+    def t_statistic(self) -> float:
+        """How many standard errors the slope is away from zero"""
+        if self.stderr == 0:
+            return math.inf if self.slope else 0.0
+        return self.slope / self.stderr
+
+    def at(self, x: float) -> float:
+        return self.slope * x + self.intercept
+
+def linear_trend(points: List[Tuple[float, float]]) -> Optional[Trend]:
+    """Ordinary least squares over (x, y); None with fewer than two distinct x"""
+    n = len(points)
+    if len({x for x, _ in points}) < 2:
+        return None
+    mean_x = sum(x for x, _ in points) / n
+    mean_y = sum(y for _, y in points) / n
+    sxx = sum((x - mean_x) ** 2 for x, _ in points)
+    slope = sum((x - mean_x) * (y - mean_y) for x, y in points) / sxx
+    intercept = mean_y - slope * mean_x
+    if n <= 2:
+        return Trend(slope, intercept, 0.0, n)
+    residuals = sum((y - (slope * x + intercept)) ** 2 for x, y in points)
+    return Trend(slope, intercept, math.sqrt(residuals / (n - 2) / sxx), n)
+
+class Comparison:
+    """Outcome of comparing one endpoint with the baseline"""
+
+    def __init__(self, key: Key, baseline_value: float, current_value: float,
+                 ci: Tuple[float, float], p_value: float, regressed: bool,
+                 baseline_count: int, current_count: int):
+        self.key = key
+        self.baseline_value = baseline_value
+        self.current_value = current_value
+        self.ci = ci
+        self.p_value = p_value
+        self.regressed = regressed
+        self.baseline_count = baseline_count
+        self.current_count = current_count
+
+    @property
+    def change(self) -> float:
+        if self.baseline_value <= 0:
+            return 0.0
+        return (self.current_value - self.baseline_value) / self.baseline_value
+
+def compare(current: Dict[Key, List[float]], baseline: Dict[Key, List[float]],
+            pct: float = 95.0, threshold: float = 0.10, alpha: float = 0.05) -> List[Comparison]:
+    """Compare endpoints present in both runs with enough samples"""
+    results = []
+    for key in sorted(set(current) & set(baseline)):
+        cur, base = current[key], baseline[key]
+        if len(cur) < MIN_SAMPLES or len(base) < MIN_SAMPLES:
+            continue
+        base_value, cur_value = quantile(base, pct), quantile(cur, pct)
+        ci = bootstrap_relative_change(cur, base, pct)
+        p_value = mann_whitney_greater(cur, base)
+        relative = (cur_value - base_value) / base_value if base_value > 0 else 0.0
+        regressed = relative > threshold and ci[0] > 0 and p_value < alpha
+        results.append(Comparison(key, base_value, cur_value, ci, p_value, regressed, len(base), len(cur)))
+    return results
+
+def format_comparisons(comparisons: List[Comparison], pct: float) -> List[str]:
+    header = f"{'method':<7} {'endpoint':<34} {'n base/cur':>11} {f'base p{pct:g}':>10} " \
+             f"{f'cur p{pct:g}':>10} {'change':>8} {'95% CI':>17} {'p-value':>8}"
+    lines = [header, "-" * len(header)]
+    for c in comparisons:
+        method, endpoint = c.key
+        ci = f"[{c.ci[0] * 100:+.0f}%, {c.ci[1] * 100:+.0f}%]"
+        marker = "  REGRESSED" if c.regressed else ""
+        lines.append(
+            f"{method:<7} {endpoint[:34]:<34} {f'{c.baseline_count}/{c.current_count}':>11} "
+            f"{c.baseline_value:>8.1f}ms {c.current_value:>8.1f}ms {c.change * 100:>+7.1f}% "
+            f"{ci:>17} {c.p_value:>8.3f}{marker}")
+    return lines
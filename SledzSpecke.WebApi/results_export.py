@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Machine-readable exports of API test runs.
+
+- JsonLinesWriter streams one JSON object per line as results complete
+  (requests and test outcomes), so load runs with hundreds of thousands of
+  requests never hold the records in memory. It plugs into api_client as a
+  request listener.
+- write_junit_xml() writes test outcomes in the JUnit format CI understands.
+- write_prometheus_textfile() writes per-endpoint latency summaries for the
+  node-exporter textfile collector (--collector.textfile.directory); the
+  `node` job in monitoring/prometheus.yml then scrapes them.
+"""
+
+import json
+import os
+import secrets
+import tempfile
+import threading
+import time
+import xml.etree.ElementTree as ET
+from typing import Any, Dict, List, Optional
+
+from latency import SUMMARY_PERCENTILES, LatencyRecorder, normalize_endpoint
+
+METRIC_PREFIX = "sledzspecke_api_test"
+
+def _atomic_write(path: str, content: str):
+    """Write via temp file + rename so readers never see a partial file"""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=os.path.basename(path))
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(content)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+def _response_size(response) -> Optional[int]:
+    """Body size without forcing a streamed response to download"""
+    length = response.headers.get("Content-Length")
+    if length is not None and length.isdigit():
+        return int(length)
+    if getattr(response, "_content_consumed", False):
+        return len(response.content or b"")
+    return None
+
+class JsonLinesWriter:
+    """Thread-safe streaming JSON Lines writer"""
+
+    def __init__(self, path: str, run_id: Optional[str] = None):
+        self.path = path
+        # Runs started in the same second (parallel CI jobs) must not share an id
+        self.run_id = run_id or f"{time.strftime('%Y%m%dT%H%M%S')}-{secrets.token_hex(4)}"
+        self._file = open(path, "a", encoding="utf-8", buffering=1)
+        self._lock = threading.Lock()
+
+    def write(self, record: Dict[str, Any]):
+        record = {"run": self.run_id, "ts": round(time.time(), 6), **record}
+        line = json.dumps(record, separators=(",", ":"), default=str)
+        with self._lock:
+            if self._file is not None:
+                self._file.write(line + "\n")
+
+    def observe(self, method: str, url: str, response, elapsed: float):
+        """api_client listener - one record per HTTP request"""
+        self.write({
+            "type": "request",
+            "method": method.upper(),
+            "endpoint": normalize_endpoint(url),
+            "status": response.status_code if response is not None else None,
+            "elapsed_ms": round(elapsed * 1000, 3),
+            "bytes": _response_size(response) if response is not None else None,
+            "error": response is None,
+        })
+
+    def write_test(self, name: str, status: str, message: str = "", duration: Optional[float] = None):
+        self.write({
+            "type": "test",
+            "test": name,
+            "status": status,
+            "message": message,
+            "duration_ms": round(duration * 1000, 3) if duration is not None else None,
+        })
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+def write_junit_xml(path: str, details: List[Dict[str, Any]], suite_name: str = "SledzSpecke.WebApi"):
+    """Write test_results["details"] as a JUnit XML report; status "skipped" gets a <skipped/> element"""
+    failures = sum(1 for detail in details if detail["status"] == "failed")
+    skipped = sum(1 for detail in details if detail["status"] == "skipped")
+    total_time = sum(detail.get("duration") or 0.0 for detail in details)
+    suite = ET.Element("testsuite", {
+        "name": suite_name,
+        "tests": str(len(details)),
+        "failures": str(failures),
+        "errors": "0",
+        "skipped": str(skipped),
+        "time": f"{total_time:.3f}",
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    })
+    for detail in details:
+        # "Procedures new SMK - Create" -> class "Procedures new SMK", name "Create"
+        classname, _, name = detail["test"].rpartition(" - ")
+        case = ET.SubElement(suite, "testcase", {
+            "classname": classname or suite_name,
+            "name": name,
+            "time": f"{detail.get('duration') or 0.0:.3f}",
+        })
+        if detail["status"] == "failed":
+            failure = ET.SubElement(case, "failure", {"message": detail.get("message", "")})
+            failure.text = detail.get("message", "")
+        elif detail["status"] == "skipped":
+            ET.SubElement(case, "skipped", {"message": detail.get("message", "")})
+
+    tree = ET.ElementTree(ET.Element("testsuites"))
+    tree.getroot().append(suite)
+    ET.indent(tree)
+    _atomic_write(path, ET.tostring(tree.getroot(), encoding="unicode", xml_declaration=True) + "\n")
+
+def _label_value(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def write_prometheus_textfile(path: str, recorder: LatencyRecorder, test_counts: Dict[str, int]):
+    """Write latency summaries and test counts in Prometheus text format.
+
+    `path` should end in .prom and live in node-exporter's textfile directory.
+    """
+    lines = [
+        f"# HELP {METRIC_PREFIX}_request_duration_seconds API request latency seen by the test suite.",
+        f"# TYPE {METRIC_PREFIX}_request_duration_seconds summary",
+    ]
+    for (method, endpoint), histogram in sorted(recorder.histograms.items()):
+        labels = f'method="{_label_value(method)}",endpoint="{_label_value(endpoint)}"'
+        for pct in SUMMARY_PERCENTILES:
+            lines.append(f'{METRIC_PREFIX}_request_duration_seconds{{{labels},quantile="{pct / 100:g}"}} '
+                         f"{histogram.percentile(pct):.6f}")
+        lines.append(f"{METRIC_PREFIX}_request_duration_seconds_sum{{{labels}}} {histogram.total:.6f}")
+        lines.append(f"{METRIC_PREFIX}_request_duration_seconds_count{{{labels}}} {histogram.count}")
+
+    lines.append(f"# HELP {METRIC_PREFIX}_tests Test outcomes of the last run.")
+    lines.append(f"# TYPE {METRIC_PREFIX}_tests gauge")
+    for status in ("passed", "failed", "skipped"):
+        lines.append(f'{METRIC_PREFIX}_tests{{status="{status}"}} {test_counts.get(status, 0)}')
+
+    lines.append(f"# HELP {METRIC_PREFIX}_last_run_timestamp_seconds Unix time the last run finished.")
+    lines.append(f"# TYPE {METRIC_PREFIX}_last_run_timestamp_seconds gauge")
+    lines.append(f"{METRIC_PREFIX}_last_run_timestamp_seconds {time.time():.0f}")
+    _atomic_write(path, "\n".join(lines) + "\n")
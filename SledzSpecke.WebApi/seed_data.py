@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+"""
+Bulk synthetic data seeder for SledzSpecke API.
+
+Creates users (alternating Old and New SMK), their internships spread over
+the specialization's modules, and procedures and medical shifts with
+realistic dates, so the statistics and export endpoints can be benchmarked
+against a production-sized database:
+
+    python3 seed_data.py --users 2000 --procedures 40 --shifts 30 --in-flight 32
+
+Everything is generated deterministically from --seed, and each created
+entity is appended to a checkpoint file as it completes. Re-running with the
+same arguments resumes where an interrupted run stopped instead of creating
+duplicates. Use a new --checkpoint file (or --fresh) to seed a second batch.
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Iterator, List, Set, Tuple
+
+import api_client
+import auth_pool
+from harness.output import Colors
+from payloads import build_internship_payload, build_procedure_payload, build_shift_payload
+
+API_BASE_URL = "http://localhost:5000/api"
+DEFAULT_CHECKPOINT = "seed_checkpoint.jsonl"
+DATE_FORMAT = '%Y-%m-%dT%H:%M:%SZ'
+
+# Module IDs for specialization 1: 1*100 + 1 (basic) and 1*100 + 2 (specialistic)
+MODULE_IDS = (101, 102)
+LOCATIONS = ("Szpital Wojewódzki", "Szpital Kliniczny", "Szpital Powiatowy", "Centrum Onkologii")
+DEPARTMENTS = ("Anestezjologia", "Intensywna Terapia", "Chirurgia Ogólna", "Kardiologia", "SOR")
+SHIFT_LOCATIONS = ("Emergency Department", "ICU", "Operating Theatre", "Internal Medicine")
+
+def print_info(message: str):
+    print(f"{Colors.OKCYAN}ℹ {message}{Colors.ENDC}")
+
+def print_error(message: str):
+    print(f"{Colors.FAIL}✗ {message}{Colors.ENDC}")
+
+class Checkpoint:
+    """Append-only log of created entities, used to resume a run"""
+
+    def __init__(self, path: str, fresh: bool = False):
+        self.path = path
+        self.done: Set[Tuple[int, str, int]] = set()
+        self.internship_ids: Dict[Tuple[int, int], int] = {}
+        if fresh and os.path.exists(path):
+            os.remove(path)
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue  # torn last line after a crash
+                    self.done.add((record["user"], record["kind"], record["n"]))
+                    if record["kind"] == "internship":
+                        self.internship_ids[(record["user"], record["n"])] = record["id"]
+        self._file = open(path, "a", encoding="utf-8", buffering=1)
+        self._lock = threading.Lock()
+
+    def is_done(self, user: int, kind: str, n: int) -> bool:
+        return (user, kind, n) in self.done
+
+    def mark(self, user: int, kind: str, n: int, entity_id: Any = None):
+        line = json.dumps({"user": user, "kind": kind, "n": n, "id": entity_id}, separators=(",", ":"))
+        with self._lock:
+            self._file.write(line + "\n")
+            self.done.add((user, kind, n))
+            if kind == "internship":
+                self.internship_ids[(user, n)] = entity_id
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+class Progress:
+    """Thread-safe counters with a periodic one-line report"""
+
+    def __init__(self, total: int, interval: float = 2.0):
+        self.total = total
+        self.interval = interval
+        self.done = 0
+        self.skipped = 0
+        self.errors = 0
+        self.started = time.perf_counter()
+        self._last_report = 0.0
+        self._lock = threading.Lock()
+
+    def add(self, ok: bool = True, skipped: bool = False):
+        with self._lock:
+            if skipped:
+                self.skipped += 1
+            elif ok:
+                self.done += 1
+            else:
+                self.errors += 1
+            now = time.perf_counter()
+            if now - self._last_report >= self.interval:
+                self._last_report = now
+                self.report()
+
+    def report(self, final: bool = False):
+        elapsed = time.perf_counter() - self.started
+        rate = self.done / elapsed if elapsed > 0 else 0.0
+        remaining = self.total - self.done - self.skipped - self.errors
+        eta = f", ETA {remaining / rate:.0f}s" if rate > 0 and not final else ""
+        end = "\n" if final or not sys.stdout.isatty() else ""
+        print(f"\r  {self.done + self.skipped + self.errors}/{self.total} "
+              f"(created {self.done}, resumed {self.skipped}, errors {self.errors}) "
+              f"{rate:.1f} req/s{eta}   ", end=end, flush=True)
+
+class SeedPlan:
+    """Deterministic per-user data: the same seed always yields the same entities"""
+
+    def __init__(self, seed: int, internships: int, procedures: int, shifts: int):
+        self.seed = seed
+        self.internships = internships
+        self.procedures = procedures
+        self.shifts = shifts
+
+    def _rng(self, user: int, kind: str, n: int) -> random.Random:
+        return random.Random(f"{self.seed}:{user}:{kind}:{n}")
+
+    @staticmethod
+    def smk_version(user: int) -> str:
+        return "old" if user % 2 else "new"
+
+    def specialization_start(self, user: int) -> datetime:
+        # Residents started between six years and six months ago
+        rng = self._rng(user, "start", 0)
+        today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+        return today - timedelta(days=rng.randint(180, 6 * 365))
+
+    def internship_ranges(self, user: int) -> List[Tuple[datetime, datetime]]:
+        """Consecutive 2-9 month internships from the specialization start"""
+        rng = self._rng(user, "ranges", 0)
+        start = self.specialization_start(user)
+        ranges = []
+        for _ in range(self.internships):
+            end = start + timedelta(days=rng.randint(60, 270))
+            ranges.append((start, end))
+            start = end + timedelta(days=rng.randint(0, 14))
+        return ranges
+
+    def internship(self, user: int, n: int) -> Dict[str, Any]:
+        rng = self._rng(user, "internship", n)
+        start, end = self.internship_ranges(user)[n]
+        payload = build_internship_payload()
+        payload.update({
+            "moduleId": MODULE_IDS[0] if n < (self.internships + 1) // 2 else MODULE_IDS[1],
+            "institutionName": rng.choice(LOCATIONS),
+            "departmentName": rng.choice(DEPARTMENTS),
+            "supervisorName": f"Dr. {rng.choice(('Nowak', 'Kowalski', 'Wiśniewska', 'Wójcik'))}",
+            "startDate": start.strftime(DATE_FORMAT),
+            "endDate": end.strftime(DATE_FORMAT),
+        })
+        return payload
+
+    def _education_year(self, user: int, date: datetime) -> int:
+        return min(6, 1 + (date - self.specialization_start(user)).days // 365)
+
+    def _working_day(self, rng: random.Random, start: datetime, end: datetime, weekend_weight: float) -> datetime:
+        """Random day in [start, end); weekends are picked with the given relative weight"""
+        span = max(1, (end - start).days)
+        while True:
+            day = start + timedelta(days=rng.randrange(span))
+            if day.weekday() < 5 or rng.random() < weekend_weight:
+                return day
+
+    def procedure(self, user: int, n: int, internship_id: int) -> Dict[str, Any]:
+        rng = self._rng(user, "procedure", n)
+        start, end = self.internship_ranges(user)[n % self.internships]
+        # Procedures happen in working hours, rarely on weekends
+        date = self._working_day(rng, start, end, weekend_weight=0.15)
+        date += timedelta(hours=rng.triangular(7, 16, 10), minutes=rng.randrange(60))
+        smk_version = self.smk_version(user)
+        payload = build_procedure_payload(internship_id, smk_version)
+        prefix = "CARD" if smk_version == "new" else "P"
+        payload.update({
+            "date": date.strftime(DATE_FORMAT),
+            "year": self._education_year(user, date),
+            "code": f"{prefix}-{rng.randint(1, 120):03d}" if smk_version == "new" else f"{prefix}{rng.randint(1, 120):03d}",
+            "location": rng.choice(LOCATIONS),
+            "status": rng.choices(("completed", "pending", "approved"), (80, 15, 5))[0],
+            "operatorCode": rng.choice(("A", "B")) if smk_version == "old" else "OP001",
+            "patientInitials": rng.choice("ABCDEFGHKLMNPRSTW") + rng.choice("ABCDEFGHKLMNPRSTW"),
+            "patientGender": rng.choice("MK"),
+        })
+        return payload
+
+    def shift(self, user: int, n: int, internship_id: int) -> Dict[str, Any]:
+        rng = self._rng(user, "shift", n)
+        start, end = self.internship_ranges(user)[n % self.internships]
+        # On-call duties: weekends are as likely as weekdays
+        date = self._working_day(rng, start, end, weekend_weight=1.0)
+        hours, minutes = rng.choices(((16, 5), (24, 0), (12, 0), (10, 5), (8, 0)), (45, 30, 10, 10, 5))[0]
+        payload = build_shift_payload(internship_id)
+        payload.update({
+            "date": date.strftime(DATE_FORMAT),
+            "hours": hours,
+            "minutes": minutes,
+            "location": rng.choice(SHIFT_LOCATIONS),
+            "year": self._education_year(user, date),
+        })
+        return payload
+
+def run_bounded(tasks: Iterator[Callable[[], None]], in_flight: int):
+    """Run tasks with at most `in_flight` running or queued at once.
+
+    Tasks are pulled from the iterator lazily, so seeding millions of rows
+    never materializes millions of futures.
+    """
+    slots = threading.BoundedSemaphore(in_flight)
+
+    def run(task):
+        try:
+            task()
+        finally:
+            slots.release()
+
+    with ThreadPoolExecutor(max_workers=in_flight, thread_name_prefix="seed") as executor:
+        for task in tasks:
+            slots.acquire()
+            executor.submit(run, task)
+
+def seed(args) -> bool:
+    plan = SeedPlan(args.seed, args.internships, args.procedures, args.shifts)
+    checkpoint = Checkpoint(args.checkpoint, fresh=args.fresh)
+    api_client.configure(pool_size=max(args.in_flight, api_client.DEFAULT_POOL_SIZE))
+    if checkpoint.done:
+        print_info(f"Resuming from {args.checkpoint} ({len(checkpoint.done)} entities already created)")
+
+    # Old/New SMK users are interleaved so each half gets the matching smkVersion
+    pools = {}
+    users: Dict[int, auth_pool.PooledUser] = {}
+    for smk_version, smk_name in (("new", "New"), ("old", "Old")):
+        indexes = [i for i in range(args.users) if plan.smk_version(i) == smk_version]
+        if not indexes:
+            continue
+        pool = auth_pool.UserPool(args.url, len(indexes), prefix=f"{args.prefix}_{smk_version}",
+                                  cache=auth_pool.TokenCache(path=None), smk_version=smk_name,
+                                  workers=args.in_flight)
+        pools[smk_version] = (pool, indexes)
+
+    print_info(f"Provisioning {args.users} users...")
+    start_time = time.perf_counter()
+    for smk_version, (pool, indexes) in pools.items():
+        pool.provision()
+        for pooled in pool.users:
+            users[indexes[int(pooled.username.rsplit("_", 1)[1])]] = pooled
+    print_info(f"{len(users)}/{args.users} users ready in {time.perf_counter() - start_time:.1f}s")
+
+    def post(user: int, kind: str, n: int, url: str, payload: Dict[str, Any], progress: Progress):
+        try:
+            response = api_client.post(url, json=payload, headers=api_client.auth_headers(users[user].token))
+        except Exception as e:
+            print_error(f"user {user} {kind} #{n}: {e}")
+            progress.add(ok=False)
+            return
+        if response.status_code in (200, 201):
+            checkpoint.mark(user, kind, n, response.json() if response.content else None)
+            progress.add()
+        else:
+            if progress.errors < 10:
+                print_error(f"user {user} {kind} #{n}: {response.status_code} - {response.text[:200]}")
+            progress.add(ok=False)
+
+    def tasks(kind: str, count: int, url: str, build, progress: Progress) -> Iterator[Callable[[], None]]:
+        for user in sorted(users):
+            for n in range(count):
+                if checkpoint.is_done(user, kind, n):
+                    progress.add(skipped=True)
+                    continue
+                if kind == "internship":
+                    payload = build(user, n)
+                else:
+                    internship_id = checkpoint.internship_ids.get((user, n % plan.internships))
+                    if internship_id is None:
+                        progress.add(ok=False)  # its internship failed to be created
+                        continue
+                    payload = build(user, n, internship_id)
+                yield lambda user=user, n=n, payload=payload: post(user, kind, n, url, payload, progress)
+
+    # Internships first - procedures and shifts reference their IDs
+    stages = [
+        ("internships", "internship", plan.internships, f"{args.url}/internships", plan.internship),
+        ("procedures", "procedure", plan.procedures, f"{args.url}/procedures", plan.procedure),
+        ("medical shifts", "shift", plan.shifts, f"{args.url}/medicalshifts", plan.shift),
+    ]
+    failed = False
+    try:
+        for label, kind, count, url, build in stages:
+            if not count:
+                continue
+            print_info(f"Seeding {label}...")
+            progress = Progress(len(users) * count)
+            run_bounded(tasks(kind, count, url, build, progress), args.in_flight)
+            progress.report(final=True)
+            failed = failed or progress.errors > 0
+    finally:
+        checkpoint.close()
+
+    if len(users) < args.users:
+        failed = True
+    color = Colors.FAIL if failed else Colors.OKGREEN
+    print(f"{color}Seeding finished in {time.perf_counter() - start_time:.1f}s"
+          f"{' with errors - re-run to retry the missing entities' if failed else ''}{Colors.ENDC}")
+    return not failed
+
+def main():
+    parser = argparse.ArgumentParser(description="Seed SledzSpecke API with synthetic data")
+    parser.add_argument("--url", default=API_BASE_URL, help="API base URL")
+    parser.add_argument("--users", type=int, default=100, help="Number of users (half Old SMK, half New SMK)")
+    parser.add_argument("--internships", type=int, default=4, help="Internships per user")
+    parser.add_argument("--procedures", type=int, default=50, help="Procedures per user")
+    parser.add_argument("--shifts", type=int, default=40, help="Medical shifts per user")
+    parser.add_argument("--in-flight", type=int, default=16, help="Maximum concurrent requests")
+    parser.add_argument("--prefix", default="seeduser", help="Username prefix")
+    parser.add_argument("--seed", type=int, default=1, help="Random seed for generated data")
+    parser.add_argument("--checkpoint", default=DEFAULT_CHECKPOINT,
+                        help="Progress file used to resume interrupted runs")
+    parser.add_argument("--fresh", action="store_true", help="Ignore and replace an existing checkpoint")
+    args = parser.parse_args()
+    if args.internships < 1:
+        parser.error("--internships must be at least 1")
+
+    print(f"{Colors.HEADER}{Colors.BOLD}SledzSpecke Data Seeder{Colors.ENDC}")
+    print(f"{args.users} users x ({args.internships} internships, {args.procedures} procedures, "
+          f"{args.shifts} shifts) against {args.url}")
+    try:
+        sys.exit(0 if seed(args) else 1)
+    except KeyboardInterrupt:
+        print(f"\n{Colors.WARNING}Interrupted - re-run with the same arguments to resume{Colors.ENDC}")
+        sys.exit(130)
+
+if __name__ == "__main__":
+    main()
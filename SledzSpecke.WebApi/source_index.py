@@ -0,0 +1,468 @@
+#!/usr/bin/env python3
+"""
+In-memory index of the C# sources for the implementation check scripts.
+
+SourceIndex reads each .cs file under src/ at most once and tokenizes it
+with a small C# tokenizer (comments, strings and code tokens are kept
+apart). Each file gets a symbol table of its types and their members
+(methods, constructors, properties, fields), with modifiers, parameters,
+attributes and the token range of the body.
+
+Checks are declared as data and run against the index:
+
+    CHECKS = [
+        Check("Core/Entities/MedicalShift.cs::MedicalShift.UpdateShiftDetails",
+              code=["SyncStatus = SyncStatus.Modified;"],
+              success="MedicalShift transitions sync status on update",
+              failure="MedicalShift is missing the sync status transition"),
+    ]
+    run_checks(SourceIndex("src"), CHECKS, printers)
+
+Code snippets are compared token by token, so whitespace, line breaks and
+comments in the source don't matter; text phrases are searched in string
+literals and comments only.
+"""
+
+import os
+import re
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+_TOKEN = re.compile(r'''
+    (?P<ws>\s+)
+  | (?P<comment>//[^\n]*|/\*.*?\*/)
+  | (?P<preproc>^[ \t]*\#[^\n]*)
+  | (?P<string>\$*"""+.*?"""+                     # raw string
+      | (?:\$@|@\$|@)"(?:[^"]|"")*"                # verbatim string
+      | \$?"(?:\\.|[^"\\\n])*")                    # regular / interpolated string
+  | (?P<char>'(?:\\.|[^'\\\n])+')
+  | (?P<ident>@?[A-Za-z_]\w*)
+  | (?P<number>\d[\d_]*(?:\.\d[\d_]*)?(?:[eE][+-]?\d+)?[A-Za-z]*)
+  | (?P<op>=>|\?\?=?|\?\.|::|&&|\|\||[=!<>]=|\+\+|--|[-+*/%&|^]=|<<=?|.)
+''', re.S | re.M | re.X)
+
+TYPE_KEYWORDS = {"class", "struct", "interface", "record", "enum"}
+MODIFIERS = {"public", "private", "protected", "internal", "static", "abstract", "virtual",
+             "override", "sealed", "async", "readonly", "const", "partial", "new", "extern",
+             "unsafe", "volatile", "required", "file"}
+_CLOSING = {"(": ")", "[": "]", "{": "}"}
+
+class Token:
+    __slots__ = ("kind", "text", "line")
+
+    def __init__(self, kind: str, text: str, line: int):
+        self.kind = kind
+        self.text = text
+        self.line = line
+
+def tokenize(source: str) -> Tuple[List[Token], List[Tuple[int, Token]]]:
+    """Code tokens (incl. string/char literals) and (code token index, comment) pairs"""
+    code: List[Token] = []
+    comments: List[Tuple[int, Token]] = []
+    line = 1
+    for match in _TOKEN.finditer(source):
+        kind, text = match.lastgroup, match.group()
+        if kind == "comment":
+            comments.append((len(code), Token(kind, text, line)))
+        elif kind not in ("ws", "preproc"):
+            code.append(Token(kind, text, line))
+        line += text.count("\n")
+    return code, comments
+
+def snippet_tokens(snippet: str) -> List[str]:
+    return [token.text for token in tokenize(snippet)[0]]
+
+def _join(tokens: List[Token]) -> str:
+    """Source text of tokens, spaced only where needed"""
+    text = ""
+    previous = None
+    for token in tokens:
+        if previous is not None and previous.kind in ("ident", "number") and token.kind in ("ident", "number"):
+            text += " "
+        text += token.text
+        previous = token
+    return text
+
+def _split_parameters(tokens: List[Token]) -> List[List[str]]:
+    """Split a parameter list on top-level commas"""
+    parameters: List[List[str]] = [[]]
+    depth = 0
+    for token in tokens:
+        if token.kind == "op":
+            if token.text in "([{<":
+                depth += 1
+            elif token.text in ")]}>":
+                depth -= 1
+            elif token.text == "," and depth == 0:
+                parameters.append([])
+                continue
+        parameters[-1].append(token.text)
+    return [parameter for parameter in parameters if parameter]
+
+def _contains_sequence(haystack: List[str], needle: List[str]) -> bool:
+    return any(haystack[i:i + len(needle)] == needle for i in range(len(haystack) - len(needle) + 1))
+
+class Member:
+    """Method, constructor, property or field of a type"""
+
+    def __init__(self, kind: str, name: str, owner: "TypeSymbol", modifiers: List[str],
+                 header: Tuple[int, int], body: Tuple[int, int], attributes: List[str],
+                 parameters: List[List[str]], line: int):
+        self.kind = kind
+        self.name = name
+        self.owner = owner
+        self.modifiers = modifiers
+        self.header = header      # code token range of the declaration
+        self.body = body          # code token range of the body (empty if none)
+        self.attributes = attributes
+        self.parameters = parameters  # token texts of each parameter declaration
+        self.line = line
+
+    @property
+    def span(self) -> Tuple[int, int]:
+        return self.header[0], max(self.header[1], self.body[1])
+
+class TypeSymbol:
+    """class/struct/interface/record/enum declaration"""
+
+    def __init__(self, kind: str, name: str, span: Tuple[int, int], line: int,
+                 outer: Optional["TypeSymbol"] = None):
+        self.kind = kind
+        self.name = name
+        self.span = span
+        self.line = line
+        self.outer = outer
+        self.members: List[Member] = []
+
+    def member(self, name: str) -> List[Member]:
+        """All members called `name` (overloads included)"""
+        return [member for member in self.members if member.name == name]
+
+    @property
+    def methods(self) -> List[Member]:
+        return [member for member in self.members if member.kind == "method"]
+
+    @property
+    def properties(self) -> List[Member]:
+        return [member for member in self.members if member.kind == "property"]
+
+class SourceFile:
+    """Tokens and symbol table of one .cs file"""
+
+    def __init__(self, path: str, source: str):
+        self.path = path
+        self.source = source
+        self.tokens, self.comments = tokenize(source)
+        self.types: List[TypeSymbol] = []
+        self._parse_block(0, len(self.tokens), None)
+
+    # -- parsing -------------------------------------------------------------
+
+    def _skip_group(self, pos: int) -> int:
+        """Index after the bracket group opening at `pos`"""
+        stack = [_CLOSING[self.tokens[pos].text]]
+        pos += 1
+        while pos < len(self.tokens) and stack:
+            text = self.tokens[pos].text
+            if self.tokens[pos].kind == "op":
+                if text in _CLOSING:
+                    stack.append(_CLOSING[text])
+                elif text == stack[-1]:
+                    stack.pop()
+            pos += 1
+        return pos
+
+    def _skip_statement(self, pos: int, end: int) -> int:
+        """Index after the ';' ending the expression starting at `pos`"""
+        while pos < end:
+            token = self.tokens[pos]
+            if token.kind == "op" and token.text in _CLOSING:
+                pos = self._skip_group(pos)
+                continue
+            pos += 1
+            if token.kind == "op" and token.text == ";":
+                break
+        return pos
+
+    def _is_parameter_list(self, pos: int, header_start: int) -> bool:
+        """Whether the '(' at `pos` opens parameters, not a tuple type like (int, int) or Task<(...)>"""
+        if pos == header_start:
+            return False
+        previous = self.tokens[pos - 1]
+        if previous.kind == "ident":
+            return previous.text not in MODIFIERS
+        if pos - 2 >= header_start and self.tokens[pos - 2].text == "operator":
+            return True
+        return previous.text == ">"
+
+    def _parse_block(self, pos: int, end: int, owner: Optional[TypeSymbol]):
+        """Parse declarations between `pos` and `end` (a namespace or type body)"""
+        tokens = self.tokens
+        while pos < end:
+            start = pos
+            attributes = []
+            # [Attribute(...)] groups before the declaration
+            while pos < end and tokens[pos].text == "[" and tokens[pos].kind == "op":
+                group_end = self._skip_group(pos)
+                attributes.append(_join(tokens[pos + 1:group_end - 1]))
+                pos = group_end
+            header_start = pos
+            paren = None
+            angle = 0
+            # Scan the header up to its terminator
+            while pos < end:
+                token = tokens[pos]
+                if token.kind == "op":
+                    if token.text in ("{", ";", "=>", "="):
+                        break
+                    # A tuple inside Task<(...)> isn't the parameter list
+                    if token.text in ("<", ">"):
+                        angle += 1 if token.text == "<" else -1
+                    elif token.text in ("(", "["):
+                        if token.text == "(" and paren is None and angle == 0 \
+                                and self._is_parameter_list(pos, header_start):
+                            paren = pos
+                        pos = self._skip_group(pos)
+                        continue
+                pos += 1
+            if pos >= end:
+                break
+            header = tokens[header_start:pos]
+            terminator = tokens[pos].text
+            header_before_paren = tokens[header_start:paren] if paren is not None else header
+            words = [token.text for token in header_before_paren if token.kind == "ident"]
+
+            type_keyword = next((i for i, word in enumerate(words) if word in TYPE_KEYWORDS
+                                 and i + 1 < len(words)), None)
+            if words[:1] == ["namespace"]:
+                if terminator == "{":
+                    body_end = self._skip_group(pos)
+                    self._parse_block(pos + 1, body_end - 1, owner)
+                    pos = body_end
+                else:
+                    pos += 1
+                continue
+            if type_keyword is not None and terminator != "=":
+                kind, name = words[type_keyword], words[type_keyword + 1]
+                if terminator == "{":
+                    body_end = self._skip_group(pos)
+                    symbol = TypeSymbol(kind, name, (start, body_end), tokens[header_start].line, owner)
+                    self.types.append(symbol)
+                    if kind != "enum":
+                        self._parse_block(pos + 1, body_end - 1, symbol)
+                    pos = body_end
+                else:  # record Foo(...);
+                    self.types.append(TypeSymbol(kind, name, (start, pos + 1), tokens[header_start].line, owner))
+                    pos = self._skip_statement(pos, end)
+                continue
+
+            # Member (or, outside a type, a top-level statement)
+            body_start = pos + 1
+            if terminator == "{":
+                pos = self._skip_group(pos)
+                body = (body_start, pos - 1)
+                # Property initializer: { get; set; } = value;
+                if pos < end and tokens[pos].text == "=" and paren is None:
+                    pos = self._skip_statement(pos, end)
+            elif terminator == ";":
+                pos += 1
+                body = (body_start, body_start)
+            else:  # => expression body, or = initializer
+                pos = self._skip_statement(pos, end)
+                body = (body_start, pos - 1)
+            if owner is None or not header:
+                continue
+
+            modifiers = [word for word in words if word in MODIFIERS]
+            if paren is not None:
+                name_index = paren - 1
+                if tokens[name_index].text == ">":  # generic method Foo<T>(
+                    depth = 0
+                    while name_index > header_start:
+                        depth += {">": 1, "<": -1}.get(tokens[name_index].text, 0)
+                        name_index -= 1
+                        if depth == 0:
+                            break
+                name = tokens[name_index].text
+                kind = "constructor" if name == owner.name else "method"
+                parameters = _split_parameters(tokens[paren + 1:self._skip_group(paren) - 1])
+            else:
+                name = words[-1] if words else ""
+                kind = "property" if terminator in ("{", "=>") else "field"
+                parameters = []
+            owner.members.append(Member(kind, name, owner, modifiers, (start, header_start + len(header)),
+                                        body, attributes, parameters, tokens[header_start].line))
+
+    # -- queries -------------------------------------------------------------
+
+    def type(self, name: str) -> Optional[TypeSymbol]:
+        return next((symbol for symbol in self.types if symbol.name == name), None)
+
+    def find_code(self, snippet: str, span: Optional[Tuple[int, int]] = None) -> int:
+        """Number of occurrences of the snippet's token sequence"""
+        wanted = snippet_tokens(snippet)
+        if not wanted:
+            return 0
+        start, end = span or (0, len(self.tokens))
+        texts = [token.text for token in self.tokens[start:end]]
+        first, count = wanted[0], 0
+        for i, text in enumerate(texts):
+            if text == first and texts[i:i + len(wanted)] == wanted:
+                count += 1
+        return count
+
+    def text_in(self, span: Optional[Tuple[int, int]] = None, comments: bool = True,
+                strings: bool = True) -> str:
+        """Comments and/or string literals within the span, lower-cased"""
+        start, end = span or (0, len(self.tokens))
+        parts = []
+        if strings:
+            parts.extend(token.text for token in self.tokens[start:end] if token.kind == "string")
+        if comments:
+            # Comments directly above a member belong to it
+            parts.extend(comment.text for pos, comment in self.comments if start <= pos <= end)
+        return "\n".join(parts).lower()
+
+class SourceIndex:
+    """Lazily parsed, cached SourceFiles under `root`"""
+
+    def __init__(self, root: str = "src"):
+        self.root = root
+        self._files: Dict[str, Optional[SourceFile]] = {}
+
+    def file(self, relpath: str) -> Optional[SourceFile]:
+        """Parsed file (path relative to the root), or None if it doesn't exist"""
+        if relpath not in self._files:
+            path = os.path.join(self.root, relpath)
+            try:
+                with open(path, encoding="utf-8-sig") as f:
+                    self._files[relpath] = SourceFile(path, f.read())
+            except OSError:
+                self._files[relpath] = None
+        return self._files[relpath]
+
+    def exists(self, relpath: str) -> bool:
+        return os.path.isfile(os.path.join(self.root, relpath))
+
+class Check:
+    """A declarative assertion about one file, type or member.
+
+    `target` is "path/File.cs", "path/File.cs::Type" or
+    "path/File.cs::Type.Member" (path relative to the index root; overloads
+    of a member are checked together). All given conditions must hold:
+
+    - code / no_code: token sequences that must (not) appear; any_code:
+      at least one must appear
+    - text / no_text: phrases that must (not) appear in string literals or
+      comments (case-insensitive); comment_words: groups of alternatives,
+      each group must appear in comments
+    - members: member names the target type must declare
+    - modifiers: e.g. "public void" - every word must be a modifier or the
+      return type of some matching member
+    - attributes: attributes some member must carry, e.g. 'HttpPut("{id:int}")'
+    - parameters: parameter declarations some overload must take, e.g. "int year"
+
+    `success` may use {count} (occurrences of the first code snippet).
+    `failure` is printed at `level` ("error" or "info"); None stays silent.
+    `children` only run when this check passes.
+    """
+
+    def __init__(self, target: str, success: Optional[str] = None, failure: Optional[str] = None,
+                 level: str = "error", children: Sequence["Check"] = (),
+                 code: Sequence[str] = (), any_code: Sequence[str] = (), no_code: Sequence[str] = (),
+                 text: Sequence[str] = (), no_text: Sequence[str] = (),
+                 comment_words: Sequence[Sequence[str]] = (), members: Sequence[str] = (),
+                 modifiers: str = "", attributes: Sequence[str] = (), parameters: Sequence[str] = ()):
+        self.target = target
+        self.success = success
+        self.failure = failure
+        self.level = level
+        self.children = children
+        self.code = code
+        self.any_code = any_code
+        self.no_code = no_code
+        self.text = text
+        self.no_text = no_text
+        self.comment_words = comment_words
+        self.members = members
+        self.modifiers = modifiers
+        self.attributes = attributes
+        self.parameters = parameters  # token texts of each parameter declaration
+
+    def _resolve(self, index: SourceIndex):
+        """(file, type, members) for the target; None parts when not found"""
+        path, _, symbol = self.target.partition("::")
+        source = index.file(path)
+        if source is None or not symbol:
+            return source, None, None
+        type_name, _, member_name = symbol.partition(".")
+        symbol_type = source.type(type_name)
+        if symbol_type is None or not member_name:
+            return source, symbol_type, None
+        return source, symbol_type, symbol_type.member(member_name) or None
+
+    def evaluate(self, index: SourceIndex) -> Tuple[bool, int]:
+        """(passed, occurrences of the first code snippet)"""
+        source, symbol_type, members = self._resolve(index)
+        path, _, symbol = self.target.partition("::")
+        if source is None or (symbol and symbol_type is None) or ("." in symbol and members is None):
+            return False, 0
+
+        if members:
+            spans = [member.span for member in members]
+        elif symbol_type is not None:
+            spans = [symbol_type.span]
+        else:
+            spans = [(0, len(source.tokens))]
+
+        def occurrences(snippet: str) -> int:
+            return sum(source.find_code(snippet, span) for span in spans)
+
+        text = "\n".join(source.text_in(span) for span in spans)
+        comments = "\n".join(source.text_in(span, strings=False) for span in spans)
+        candidates = members or (symbol_type.members if symbol_type is not None else [])
+
+        count = occurrences(self.code[0]) if self.code else 0
+        passed = (
+            all(occurrences(snippet) for snippet in self.code)
+            and (not self.any_code or any(occurrences(snippet) for snippet in self.any_code))
+            and not any(occurrences(snippet) for snippet in self.no_code)
+            and all(phrase.lower() in text for phrase in self.text)
+            and not any(phrase.lower() in text for phrase in self.no_text)
+            and all(any(word.lower() in comments for word in group) for group in self.comment_words)
+            and all(symbol_type is not None and symbol_type.member(name) for name in self.members)
+            and (not self.modifiers or any(_has_modifiers(source, member, self.modifiers)
+                                           for member in candidates))
+            and all(any(attribute in member.attributes for member in candidates)
+                    for attribute in self.attributes)
+            and all(any(_contains_sequence(declaration, snippet_tokens(parameter))
+                        for member in candidates for declaration in member.parameters)
+                    for parameter in self.parameters)
+        )
+        return passed, count
+
+def _has_modifiers(source: SourceFile, member: Member, words: str) -> bool:
+    header = {token.text for token in source.tokens[member.header[0]:member.header[1]]}
+    return all(word in header for word in words.split())
+
+def run_checks(index: SourceIndex, checks: Iterable[Check],
+               printers: Dict[str, Callable[[str], None]]) -> Tuple[int, int]:
+    """Evaluate checks, printing with printers["success"/"error"/"info"].
+
+    Returns (passed, failed) counts; silent and info-level failures are not
+    counted as failed.
+    """
+    passed = failed = 0
+    for check in checks:
+        ok, count = check.evaluate(index)
+        if ok:
+            passed += 1
+            if check.success:
+                printers["success"](check.success.format(count=count))
+            child_passed, child_failed = run_checks(index, check.children, printers)
+            passed += child_passed
+            failed += child_failed
+        elif check.failure:
+            printers[check.level](check.failure)
+            if check.level == "error":
+                failed += 1
+    return passed, failed
@@ -38,7 +38,8 @@ public class HealthController : ControllerBase
                 },
                 version = Assembly.GetExecutingAssembly().GetName().Version?.ToString() ?? "1.0.0",
                 environment = Environment.GetEnvironmentVariable("ASPNETCORE_ENVIRONMENT") ?? "Production",
-                uptime = GetUptime()
+                uptime = GetUptime(),
+                gc = GetGcInfo()
             };
 
             if (!canConnect)
@@ -74,4 +75,20 @@ public class HealthController : ControllerBase
         var uptime = DateTime.UtcNow - System.Diagnostics.Process.GetCurrentProcess().StartTime.ToUniversalTime();
         return $"{(int)uptime.TotalDays}d {uptime.Hours}h {uptime.Minutes}m {uptime.Seconds}s";
     }
+
+    private static object GetGcInfo()
+    {
+        // Cheap counters, sampled by the soak tests to spot heap growth and GC pressure
+        var info = GC.GetGCMemoryInfo();
+        return new
+        {
+            heapBytes = GC.GetTotalMemory(false),
+            heapSizeBytes = info.HeapSizeBytes,
+            gen0Collections = GC.CollectionCount(0),
+            gen1Collections = GC.CollectionCount(1),
+            gen2Collections = GC.CollectionCount(2),
+            totalPauseMs = GC.GetTotalPauseDuration().TotalMilliseconds,
+            pauseTimePercentage = info.PauseTimePercentage
+        };
+    }
 }
\ No newline at end of file
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Reference implementation of the medical shift statistics endpoint, used to
+check its numbers.
+
+The user's medical shifts are fetched once (GET /medicalshifts) and turned
+into column arrays. The expected statistics for every filter the data
+allows - each calendar year and year/month for /medicalshifts/statistics -
+are computed in one grouped pass over those columns, then compared with
+what the API returns for the same filter:
+
+    oracle = StatisticsOracle.fetch(base_url)
+    for mismatch in oracle.verify(base_url):
+        print(mismatch)
+
+With NumPy installed the grouping is vectorized (np.unique + np.bincount),
+which keeps a 100k-record user well under a second; without it the same
+results come from plain Python counters.
+
+The expected values follow GetMedicalShiftStatisticsHandler: its range
+ends at 00:00 of the last day of the month (Dec 31 for a year), so a shift
+later on that day is left out, just as here; hours and minutes are the
+total duration split at 60 minutes.
+
+Procedure statistics are not verified: the API has no
+GET /procedures/statistics route (see SKIPPED).
+"""
+
+import calendar
+import re
+from collections import Counter, defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import api_client
+
+try:
+    import numpy as np
+except ImportError:  # plain Python grouping
+    np = None
+
+SHIFT_FIELDS = ("totalShifts", "totalHours", "totalMinutes", "averageShiftDuration",
+                "shiftsByLocation", "shiftsByMonth")
+TIME_PATTERN = re.compile(r"(\d{2}):(\d{2})(?::(\d{2})(?:\.(\d+))?)?")
+
+# Filters: (year, month or None)
+ShiftKey = Tuple[int, Optional[int]]
+# Statistics endpoints that are not verified, with the reason
+SKIPPED = {"procedures/statistics": "the API has no such route"}
+
+def _field(record: Dict[str, Any], name: str, default: Any = None) -> Any:
+    """camelCase or PascalCase key, whichever the API sent"""
+    return record.get(name, record.get(name[:1].upper() + name[1:], default))
+
+def _items(body: Any) -> List[Dict[str, Any]]:
+    if isinstance(body, dict):
+        return _field(body, "items", [])
+    return body or []
+
+class Mismatch:
+    """One statistics field that differs from the recomputed value"""
+
+    def __init__(self, endpoint: str, field: str, expected: Any, actual: Any):
+        self.endpoint = endpoint
+        self.field = field
+        self.expected = expected
+        self.actual = actual
+
+    def __str__(self) -> str:
+        return f"{self.endpoint}: {self.field} expected {self.expected!r}, API returned {self.actual!r}"
+
+def _after_range_end(date: str) -> Tuple[bool, bool]:
+    """Whether a shift falls after the handler's month and year range ends
+    (00:00 of the last day of the month, of Dec 31)"""
+    year, month, day = int(date[:4]), int(date[5:7]), int(date[8:10])
+    time_of_day = TIME_PATTERN.match(date[11:])
+    after_midnight = bool(time_of_day) and any(int(part or 0) for part in time_of_day.groups())
+    if not after_midnight or day != calendar.monthrange(year, month)[1]:
+        return False, False
+    return True, month == 12
+
+def shift_columns(shifts: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Calendar year and month, total minutes, location and whether the month
+    and year filters include it, one entry per shift"""
+    months, minutes, locations, in_month, in_year = [], [], [], [], []
+    for shift in shifts:
+        date = str(_field(shift, "date"))
+        months.append(date[:7])
+        minutes.append((_field(shift, "hours") or 0) * 60 + (_field(shift, "minutes") or 0))
+        locations.append(_field(shift, "location") or "")
+        after_month, after_year = _after_range_end(date)
+        in_month.append(not after_month)
+        in_year.append(not after_year)
+    if np is None:
+        return {"year": [int(m[:4]) for m in months], "month": [int(m[5:7]) for m in months],
+                "minutes": minutes, "location": locations, "inMonth": in_month, "inYear": in_year}
+    month_index = np.array(months, dtype="datetime64[M]").astype(np.int64)
+    return {"year": month_index // 12 + 1970, "month": month_index % 12 + 1,
+            "minutes": np.array(minutes, dtype=np.int64), "location": np.array(locations, dtype=object),
+            "inMonth": np.array(in_month, dtype=bool), "inYear": np.array(in_year, dtype=bool)}
+
+def _shift_summary(count: int, minutes: int, locations: Dict[str, int], months: Dict[str, int]) -> Dict[str, Any]:
+    return {
+        "totalShifts": int(count),
+        "totalHours": int(minutes) // 60,
+        "totalMinutes": int(minutes) % 60,
+        "averageShiftDuration": minutes / count if count else 0,
+        "shiftsByLocation": locations,
+        "shiftsByMonth": months,
+    }
+
+def expected_shift_statistics(columns: Dict[str, Any]) -> Dict[ShiftKey, Dict[str, Any]]:
+    """Shift totals per calendar year and per year/month, within the handler's ranges"""
+    if np is None:
+        counts: Counter = Counter()
+        minutes: Counter = Counter()
+        locations: Dict[ShiftKey, Counter] = defaultdict(Counter)
+        months: Dict[ShiftKey, Counter] = defaultdict(Counter)
+        for year, month, duration, location, in_month, in_year in zip(
+                columns["year"], columns["month"], columns["minutes"], columns["location"],
+                columns["inMonth"], columns["inYear"]):
+            keys = [(year, None)] if in_year else []
+            for key in keys + ([(year, month)] if in_month else []):
+                counts[key] += 1
+                minutes[key] += duration
+                locations[key][location] += 1
+                months[key][f"{year:04d}-{month:02d}"] += 1
+        return {key: _shift_summary(counts[key], minutes[key], dict(locations[key]), dict(months[key]))
+                for key in counts}
+
+    if not len(columns["year"]):
+        return {}
+    location_names, all_location_index = np.unique(columns["location"].astype(str), return_inverse=True)
+    result = {}
+    # Group keys: YYYY00 for a whole year, YYYYMM for one month
+    for whole_year, included in ((True, columns["inYear"]), (False, columns["inMonth"])):
+        year, month = columns["year"][included], columns["month"][included]
+        duration, location_index = columns["minutes"][included], all_location_index[included]
+        if not len(year):
+            continue
+        year_month = year * 100 + month
+        keys, inverse = np.unique(year * 100 if whole_year else year_month, return_inverse=True)
+        counts = np.bincount(inverse, minlength=len(keys))
+        totals = np.bincount(inverse, duration, minlength=len(keys))
+        # (group, location) and (group, month) pair counts, also without a Python loop over rows
+        by_location = np.bincount(inverse * len(location_names) + location_index,
+                                  minlength=len(keys) * len(location_names)).reshape(len(keys), -1)
+        month_keys, month_inverse = np.unique(inverse * 1000000 + year_month, return_inverse=True)
+        month_counts = np.bincount(month_inverse)
+        by_month: Dict[int, Dict[str, int]] = defaultdict(dict)
+        for key, count in zip(month_keys, month_counts):
+            group_index, ym = divmod(int(key), 1000000)
+            by_month[group_index][f"{ym // 100:04d}-{ym % 100:02d}"] = int(count)
+        for i, key in enumerate(keys):
+            nonzero = np.nonzero(by_location[i])[0]
+            locations = {str(location_names[j]): int(by_location[i, j]) for j in nonzero}
+            result_key = (int(key) // 100, int(key) % 100 or None)
+            result[result_key] = _shift_summary(int(counts[i]), int(totals[i]), locations, by_month[i])
+    return result
+
+def _label(endpoint: str, params: Dict[str, int]) -> str:
+    return endpoint + ("?" + "&".join(f"{k}={v}" for k, v in params.items()) if params else "")
+
+def _compare(endpoint: str, expected: Dict[str, Any], actual: Dict[str, Any],
+             fields: Iterable[str]) -> List[Mismatch]:
+    mismatches = []
+    for name in fields:
+        want = expected[name]
+        got = _field(actual, name)
+        if isinstance(want, float):
+            same = got is not None and abs(got - want) < 1e-6 * max(1.0, abs(want))
+        else:
+            same = got == want
+        if not same:
+            mismatches.append(Mismatch(endpoint, name, want, got))
+    return mismatches
+
+class StatisticsOracle:
+    """Expected statistics for one user's data"""
+
+    def __init__(self, shifts: List[Dict[str, Any]]):
+        self.shift_count = len(shifts)
+        self.shifts = expected_shift_statistics(shift_columns(shifts))
+
+    @classmethod
+    def fetch(cls, base_url: str, **kwargs) -> "StatisticsOracle":
+        """Download the user's raw records (api_client's auth by default)"""
+        response = api_client.get(f"{base_url}/medicalshifts", **kwargs)
+        if response.status_code != 200:
+            raise RuntimeError(f"GET /medicalshifts returned {response.status_code}")
+        return cls(_items(response.json()))
+
+    def filters(self, limit: Optional[int] = None) -> List[Tuple[str, Dict[str, int]]]:
+        """(endpoint, query parameters) for every filter, yearly first"""
+        shift_keys = sorted(self.shifts, key=lambda key: (key[1] is not None, key[0], key[1] or 0))
+        requests = [("medicalshifts/statistics", {"year": year, **({"month": month} if month else {})})
+                     for year, month in shift_keys]
+        return requests[:limit] if limit is not None else requests
+
+    def expected(self, endpoint: str, params: Dict[str, int]) -> Dict[str, Any]:
+        return self.shifts.get((params["year"], params.get("month")), _shift_summary(0, 0, {}, {}))
+
+    def check(self, endpoint: str, params: Dict[str, int], actual: Dict[str, Any]) -> List[Mismatch]:
+        """Compare one API response with the expected statistics for its filter"""
+        return _compare(_label(endpoint, params), self.expected(endpoint, params), actual, SHIFT_FIELDS)
+
+    def verify(self, base_url: str, limit: Optional[int] = None, **kwargs) -> List[Mismatch]:
+        """Request every filter and return all mismatches; failed requests count as one"""
+        mismatches = []
+        for endpoint, params in self.filters(limit):
+            response = api_client.get(f"{base_url}/{endpoint}", params=params, **kwargs)
+            if response.status_code != 200:
+                mismatches.append(Mismatch(_label(endpoint, params), "status", 200, response.status_code))
+                continue
+            mismatches.extend(self.check(endpoint, params, response.json()))
+        return mismatches
@@ -8,7 +8,20 @@ This script tests all endpoints including:
 - Medical Shifts (Old and New SMK)
 - Internships
 
-Run with: python test_api.py
+Run with: python test_api.py [--workers N]
+
+Load mode: python test_api.py --load --users 20 --rps 50 --duration 120
+drives the procedure, medical shift and internship endpoints with an
+open-loop workload built from the same payload builders (see
+load_generator.py).
+
+Suites are scheduled as a dependency graph (authentication -> internships ->
+procedures/medical shifts x {new, old} SMK); independent branches run
+concurrently on a thread pool limited by --workers.
+
+After the suites, per-endpoint latency budgets (harness/budgets.py) are
+checked over the warmed-up request timings; --budgets warn only reports
+exceeded budgets, --budgets off skips them.
 
 TROUBLESHOOTING GUIDE:
 ======================
@@ -49,16 +62,30 @@ TROUBLESHOOTING GUIDE:
    - Rebuild and run: dotnet build && dotnet run --project src/SledzSpecke.Api/SledzSpecke.Api.csproj
 """
 
-import requests
-import json
+import api_client
+import load_generator
+import latency
+import results_export
+import perf_regression
+import auth_pool
+import harness
+from harness import budgets
+from harness.output import Colors
+from payloads import (MODULE_ID, ROLE_ASSISTANT, ROLE_OPERATOR, build_internship_payload,
+                      build_procedure_payload, build_realization_payload, build_shift_payload,
+                      first_requirement_id)
 import sys
 import subprocess
 import time
 import os
-from datetime import datetime, timedelta
 from typing import Optional, Dict, Any, List, Tuple
 import argparse
 import platform
+import threading
+import io
+import collections
+import contextlib
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 
 # Configuration
 API_BASE_URL = "http://localhost:5000/api"
@@ -75,17 +102,21 @@ test_results = {
     "details": []
 }
 
-# Color codes for output
-class Colors:
-    HEADER = '\033[95m'
-    OKBLUE = '\033[94m'
-    OKCYAN = '\033[96m'
-    OKGREEN = '\033[92m'
-    WARNING = '\033[93m'
-    FAIL = '\033[91m'
-    ENDC = '\033[0m'
-    BOLD = '\033[1m'
-    UNDERLINE = '\033[4m'
+# Guards test_results - suites record results from worker threads
+_results_lock = threading.Lock()
+
+# Per-endpoint request latencies and response-time budgets (harness/budgets.py).
+# Both are api_client listeners, attached only while this module's suites run
+# so they never see other suites' traffic.
+latency_recorder = latency.LatencyRecorder()
+budget_tracker = budgets.BudgetTracker()
+LATENCY_LISTENERS = (latency_recorder.observe, budget_tracker.observe)
+
+# JWTs survive between runs, see auth_pool.py
+token_cache = auth_pool.TokenCache()
+
+# Streams request and test records when --jsonl is given
+results_writer: Optional[results_export.JsonLinesWriter] = None
 
 def print_header(text: str):
     """Print a formatted header"""
@@ -119,6 +150,7 @@ def print_summary():
     
     success_rate = (passed / total * 100) if total > 0 else 0
     print(f"\nSuccess Rate: {success_rate:.1f}%")
+    print_latency_summary()
     
     if failed > 0:
         print(f"\n{Colors.FAIL}Failed Tests:{Colors.ENDC}")
@@ -126,32 +158,117 @@ def print_summary():
             if result["status"] == "failed":
                 print(f"  - {result['test']}: {result['message']}")
 
-def record_test(test_name: str, passed: bool, message: str = ""):
-    """Record a test result"""
-    test_results["total"] += 1
-    if passed:
-        test_results["passed"] += 1
-        status = "passed"
-    else:
-        test_results["failed"] += 1
-        status = "failed"
-    
-    test_results["details"].append({
-        "test": test_name,
-        "status": status,
-        "message": message
-    })
-
-def check_api_health(url: str = API_BASE_URL) -> bool:
-    """Check if the API is responding"""
-    try:
-        # Try to access the root endpoint or swagger
-        response = requests.get(f"{url.replace('/api', '')}/swagger/index.html", timeout=5)
-        return response.status_code in [200, 301, 302]
-    except:
-        return False
+def print_latency_summary():
+    """Print per-endpoint latency percentiles (ms) and throughput"""
+    total = latency_recorder.total()
+    if total.count == 0:
+        return
+    elapsed = latency_recorder.elapsed
+    print(f"Requests: {total.count} in {elapsed:.2f}s ({total.count / elapsed:.1f} req/s)")
+    print(f"\n{Colors.BOLD}Latency (ms):{Colors.ENDC}")
+    for line in latency_recorder.format_table():
+        print(f"  {line}")
+
+def record_test(test_name: str, passed: bool, message: str = "", duration: Optional[float] = None):
+    """Record a test result (thread-safe)"""
+    status = "passed" if passed else "failed"
+    with _results_lock:
+        test_results["total"] += 1
+        test_results[status] += 1
+        test_results["details"].append({
+            "test": test_name,
+            "status": status,
+            "message": message,
+            "duration": duration
+        })
+    if results_writer:
+        results_writer.write_test(test_name, status, message, duration)
+
+def record_skipped(suite_name: str, count: int, reason: str = ""):
+    """Record the `count` tests of a skipped suite (thread-safe)"""
+    names = [f"Suite {suite_name} - Skipped {n} of {count}" for n in range(1, count + 1)]
+    with _results_lock:
+        test_results["skipped"] += count
+        test_results["details"].extend({"test": name, "status": "skipped", "message": reason, "duration": None}
+                                       for name in names)
+    if results_writer:
+        for name in names:
+            results_writer.write_test(name, "skipped", reason)
+
+def probe_api_health(url: Optional[str] = None, timeout: float = 2) -> Optional[int]:
+    """Status code of HEAD /api/health, or None when nothing answered (no retries, no listeners)"""
+    return api_client.probe_health(url or API_BASE_URL, timeout)
+
+def check_api_health(url: Optional[str] = None, timeout: float = 2) -> bool:
+    """Check if the API is responding (any HTTP status from HEAD /api/health).
 
-def start_api() -> subprocess.Popen:
+    The health endpoint answers 503 while the database is unreachable, but
+    the API process is up then - starting a second one would only fail to
+    bind the port. report_database_health() tells the two apart.
+    """
+    return probe_api_health(url, timeout) is not None
+
+def report_database_health(url: Optional[str] = None) -> bool:
+    """Warn when the running API reports an unhealthy database"""
+    status = probe_api_health(url)
+    if status == 200:
+        return True
+    print(f"{Colors.WARNING}API is running but /api/health returned {status} - "
+          f"is PostgreSQL up? (see TROUBLESHOOTING GUIDE, 2){Colors.ENDC}")
+    return False
+
+class OutputTail:
+    """Drains a child process's output on a background thread.
+
+    Keeps the last `max_lines` lines for error reports and signals `listening`
+    as soon as Kestrel logs "Now listening on". Draining also stops a chatty
+    `dotnet run` from blocking on a full stdout pipe.
+    """
+
+    def __init__(self, stream, max_lines: int = 200):
+        self.lines = collections.deque(maxlen=max_lines)
+        self.listening = threading.Event()
+        self._thread = threading.Thread(target=self._drain, args=(stream,), daemon=True)
+        self._thread.start()
+
+    def _drain(self, stream):
+        for line in iter(stream.readline, ""):
+            line = line.rstrip()
+            self.lines.append(line)
+            if "Now listening on" in line:
+                self.listening.set()
+        stream.close()
+
+    def tail(self, count: int = 20) -> List[str]:
+        return list(self.lines)[-count:]
+
+def wait_for_api(process: subprocess.Popen, output: OutputTail, timeout: float = 60,
+                 initial_delay: float = 0.05, max_delay: float = 2.0) -> float:
+    """Wait until the API answers its health probe with any status; returns seconds waited.
+
+    Probes back off exponentially from `initial_delay`, and the wait is cut
+    short as soon as the server logs that it is listening.
+    """
+    start = time.perf_counter()
+    deadline = start + timeout
+    delay = initial_delay
+    while True:
+        if process.poll() is not None:
+            raise Exception(f"API process exited with code {process.returncode}")
+        if check_api_health(timeout=min(2.0, max(deadline - time.perf_counter(), 0.1))):
+            return time.perf_counter() - start
+        now = time.perf_counter()
+        if now >= deadline:
+            raise Exception(f"API not responding after {timeout:.0f}s")
+        # Sleeps until the next probe or until Kestrel reports it is listening
+        was_listening = output.listening.is_set()
+        if output.listening.wait(min(delay, deadline - now)) and not was_listening:
+            print("API reports it is listening, probing it...")
+            delay = initial_delay
+        else:
+            delay = min(delay * 2, max_delay)
+
+def start_api(timeout: float = 60) -> subprocess.Popen:
     """Start the API if it's not running"""
     print("Starting API...")
     
@@ -166,25 +283,30 @@ def start_api() -> subprocess.Popen:
         cmd = ["dotnet", "run"]
         shell = False
     
-    # Start the API process
+    # Start the API process (stderr folded into stdout, drained by OutputTail)
     process = subprocess.Popen(
         cmd,
         cwd=api_dir,
         stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+        errors="replace",
         shell=shell
     )
+    output = OutputTail(process.stdout)
     
-    # Wait for API to start
-    max_retries = 30
-    for i in range(max_retries):
-        time.sleep(2)
-        if check_api_health():
-            print(f"{Colors.OKGREEN}API started successfully!{Colors.ENDC}")
-            return process
-        print(f"Waiting for API to start... ({i+1}/{max_retries})")
+    try:
+        waited = wait_for_api(process, output, timeout=timeout)
+    except Exception as e:
+        print(f"{Colors.FAIL}{e}. Last API output:{Colors.ENDC}")
+        for line in output.tail():
+            print(f"  | {line}")
+        if process.poll() is None:
+            process.terminate()
+        raise Exception("Failed to start API") from e
     
-    raise Exception("Failed to start API")
+    print(f"{Colors.OKGREEN}API started successfully in {waited:.1f}s!{Colors.ENDC}")
+    return process
 
 def create_test_user(token: Optional[str] = None) -> bool:
     """Create a test user if it doesn't exist"""
@@ -199,7 +321,7 @@ def create_test_user(token: Optional[str] = None) -> bool:
             "specializationId": 1  # Cardiology Old SMK
         }
         
-        response = requests.post(
+        response = api_client.post(
             f"{API_BASE_URL}/auth/sign-up",
             json=signup_data
         )
@@ -221,9 +343,19 @@ def create_test_user(token: Optional[str] = None) -> bool:
         print(f"Error creating test user: {e}")
         return False
 
-def get_auth_token() -> Optional[str]:
-    """Authenticate and get JWT token"""
+def get_auth_token(use_cache: bool = True) -> Optional[str]:
+    """Authenticate and get JWT token (cached on disk until shortly before expiry)"""
     try:
+        token = token_cache.get(API_BASE_URL, TEST_USERNAME) if use_cache else None
+        if token and auth_pool.token_rejected(API_BASE_URL, token):
+            print(f"Cached token for {TEST_USERNAME} was rejected, signing in again")
+            token_cache.invalidate(API_BASE_URL, TEST_USERNAME)
+            token = None
+        if token:
+            print(f"Using cached token for {TEST_USERNAME}")
+            api_client.set_auth_token(token)
+            return token
+        
         # Ensure test user exists
         create_test_user()
         
@@ -235,13 +367,16 @@ def get_auth_token() -> Optional[str]:
         
         print(f"Signing in with: {signin_data}")
         
-        response = requests.post(
+        response = api_client.post(
             f"{API_BASE_URL}/auth/sign-in",
             json=signin_data
         )
         
         if response.status_code == 200:
-            token = response.json().get("AccessToken")
+            token = auth_pool.read_access_token(response.json())
+            token_cache.put(API_BASE_URL, TEST_USERNAME, token)
+            # Authenticated suites rely on the shared session's default header
+            api_client.set_auth_token(token)
             return token
         else:
             print(f"Authentication failed: {response.status_code} - {response.text}")
@@ -250,19 +385,12 @@ def get_auth_token() -> Optional[str]:
         print(f"Authentication error: {e}")
         return None
 
-def get_headers(token: str) -> Dict[str, str]:
-    """Get headers with authorization"""
-    return {
-        "Authorization": f"Bearer {token}",
-        "Content-Type": "application/json"
-    }
-
 def test_authentication():
     """Test authentication endpoints"""
     print_header("Testing Authentication")
     
     # Test sign-up
-    start_time = time.time()
+    start_time = time.perf_counter()
     try:
         signup_data = {
             "username": f"testuser_{int(time.time())}",
@@ -273,31 +401,31 @@ def test_authentication():
             "specializationId": 1  # Anestezjologia i intensywna terapia
         }
         
-        response = requests.post(
+        response = api_client.post(
             f"{API_BASE_URL}/auth/sign-up",
             json=signup_data
         )
         
         passed = response.status_code == 200
-        duration = time.time() - start_time
+        duration = time.perf_counter() - start_time
         print_test_result("Sign Up", passed, 
                          f"Status: {response.status_code}", duration)
         record_test("Authentication - Sign Up", passed, 
-                   f"Status code: {response.status_code}")
+                   f"Status code: {response.status_code}", duration)
     except Exception as e:
         print_test_result("Sign Up", False, str(e))
         record_test("Authentication - Sign Up", False, str(e))
     
     # Test sign-in
-    start_time = time.time()
+    start_time = time.perf_counter()
     try:
-        token = get_auth_token()
+        token = get_auth_token(use_cache=False)
         passed = token is not None
-        duration = time.time() - start_time
+        duration = time.perf_counter() - start_time
         print_test_result("Sign In", passed, 
                          "Token received" if passed else "No token", duration)
         record_test("Authentication - Sign In", passed,
-                   "Token received" if passed else "Authentication failed")
+                   "Token received" if passed else "Authentication failed", duration)
         return token
     except Exception as e:
         print_test_result("Sign In", False, str(e))
@@ -309,48 +437,38 @@ def test_internships(token: str):
     print_header("Testing Internships")
     
     # Create an internship
-    start_time = time.time()
+    start_time = time.perf_counter()
     try:
-        internship_data = {
-            "specializationId": 1,
-            "moduleId": 101,  # Module ID for specialization 1: 1*100 + 1
-            "institutionName": "Test Hospital",
-            "departmentName": "Cardiology",
-            "supervisorName": "Dr. Test",
-            "startDate": datetime.utcnow().strftime('%Y-%m-%dT%H:%M:%SZ'),
-            "endDate": (datetime.utcnow() + timedelta(days=30)).strftime('%Y-%m-%dT%H:%M:%SZ')
-        }
+        internship_data = build_internship_payload()
         
-        response = requests.post(
+        response = api_client.post(
             f"{API_BASE_URL}/internships",
-            json=internship_data,
-            headers=get_headers(token)
+            json=internship_data
         )
         
         passed = response.status_code in [200, 201]
-        duration = time.time() - start_time
+        duration = time.perf_counter() - start_time
         internship_id = response.json() if passed else None
         
         print_test_result("Create Internship", passed,
                          f"Status: {response.status_code}, ID: {internship_id}", duration)
         record_test("Internships - Create", passed,
-                   f"Status code: {response.status_code}")
+                   f"Status code: {response.status_code}", duration)
         
         # Get internships
-        start_time = time.time()
-        response = requests.get(
-            f"{API_BASE_URL}/internships?specializationId=1",
-            headers=get_headers(token)
+        start_time = time.perf_counter()
+        response = api_client.get(
+            f"{API_BASE_URL}/internships?specializationId=1"
         )
         
         passed = response.status_code == 200
-        duration = time.time() - start_time
+        duration = time.perf_counter() - start_time
         count = len(response.json()) if passed else 0
         
         print_test_result("Get Internships", passed,
                          f"Status: {response.status_code}, Count: {count}", duration)
         record_test("Internships - Get List", passed,
-                   f"Retrieved {count} internships")
+                   f"Retrieved {count} internships", duration)
         
         return internship_id
     except Exception as e:
@@ -363,88 +481,73 @@ def test_procedures(token: str, internship_id: int, smk_version: str = "new"):
     print_header(f"Testing Procedures - {smk_version.upper()} SMK")
     
     # Create a procedure
-    start_time = time.time()
+    start_time = time.perf_counter()
     try:
-        procedure_data = {
-            "internshipId": internship_id,
-            "date": datetime.utcnow().strftime('%Y-%m-%dT%H:%M:%SZ'),
-            "year": 1,  # Education year, not calendar year
-            "code": "CARD-001" if smk_version == "new" else "P001",
-            "location": "Test Hospital",
-            "status": "completed",
-            "operatorCode": "OP001",
-            "performingPerson": "Dr. Test",
-            "patientInitials": "JD",
-            "patientGender": "M"
-        }
+        procedure_data = build_procedure_payload(internship_id, smk_version)
         
-        response = requests.post(
+        response = api_client.post(
             f"{API_BASE_URL}/procedures",
-            json=procedure_data,
-            headers=get_headers(token)
+            json=procedure_data
         )
         
         passed = response.status_code in [200, 201]
-        duration = time.time() - start_time
+        duration = time.perf_counter() - start_time
         procedure_id = response.json() if passed else None
         
         print_test_result(f"Create Procedure ({smk_version} SMK)", passed,
                          f"Status: {response.status_code}, ID: {procedure_id}", duration)
         record_test(f"Procedures {smk_version} SMK - Create", passed,
-                   f"Status code: {response.status_code}")
+                   f"Status code: {response.status_code}", duration)
         
         # Get procedures
-        start_time = time.time()
-        response = requests.get(
-            f"{API_BASE_URL}/procedures?internshipId={internship_id}",
-            headers=get_headers(token)
+        start_time = time.perf_counter()
+        response = api_client.get(
+            f"{API_BASE_URL}/procedures?internshipId={internship_id}"
         )
         
         passed = response.status_code == 200
-        duration = time.time() - start_time
+        duration = time.perf_counter() - start_time
         count = len(response.json()) if passed else 0
         
         print_test_result(f"Get Procedures ({smk_version} SMK)", passed,
                          f"Status: {response.status_code}, Count: {count}", duration)
         record_test(f"Procedures {smk_version} SMK - Get List", passed,
-                   f"Retrieved {count} procedures")
+                   f"Retrieved {count} procedures", duration)
         
         # Update procedure
         if procedure_id:
-            start_time = time.time()
+            start_time = time.perf_counter()
             update_data = {
                 "status": "reviewed",
                 "location": "Updated Hospital"
             }
             
-            response = requests.put(
+            response = api_client.put(
                 f"{API_BASE_URL}/procedures/{procedure_id}",
-                json=update_data,
-                headers=get_headers(token)
+                json=update_data
             )
             
             passed = response.status_code in [200, 204]
-            duration = time.time() - start_time
+            duration = time.perf_counter() - start_time
             
             print_test_result(f"Update Procedure ({smk_version} SMK)", passed,
                              f"Status: {response.status_code}", duration)
             record_test(f"Procedures {smk_version} SMK - Update", passed,
-                       f"Status code: {response.status_code}")
+                       f"Status code: {response.status_code}", duration)
             
             # Delete procedure
-            start_time = time.time()
-            response = requests.delete(
-                f"{API_BASE_URL}/procedures/{procedure_id}",
-                headers=get_headers(token)
+            start_time = time.perf_counter()
+            response = api_client.delete(
+                f"{API_BASE_URL}/procedures/{procedure_id}"
             )
             
             passed = response.status_code in [200, 204]
-            duration = time.time() - start_time
+            duration = time.perf_counter() - start_time
             
             print_test_result(f"Delete Procedure ({smk_version} SMK)", passed,
                              f"Status: {response.status_code}", duration)
             record_test(f"Procedures {smk_version} SMK - Delete", passed,
-                       f"Status code: {response.status_code}")
+                       f"Status code: {response.status_code}", duration)
     except Exception as e:
         print_test_result(f"Procedure Tests ({smk_version} SMK)", False, str(e))
         record_test(f"Procedures {smk_version} SMK - General", False, str(e))
@@ -454,96 +557,455 @@ def test_medical_shifts(token: str, internship_id: int, smk_version: str = "new"
     print_header(f"Testing Medical Shifts - {smk_version.upper()} SMK")
     
     # Create a medical shift
-    start_time = time.time()
+    start_time = time.perf_counter()
     try:
-        shift_data = {
-            "internshipId": internship_id,
-            "date": datetime.utcnow().strftime('%Y-%m-%dT%H:%M:%SZ'),
-            "hours": 8,
-            "minutes": 30,
-            "location": "Emergency Department",
-            "year": 1  # Education year, not calendar year
-        }
+        shift_data = build_shift_payload(internship_id)
         
-        response = requests.post(
+        response = api_client.post(
             f"{API_BASE_URL}/medicalshifts",
-            json=shift_data,
-            headers=get_headers(token)
+            json=shift_data
         )
         
         passed = response.status_code in [200, 201]
-        duration = time.time() - start_time
+        duration = time.perf_counter() - start_time
         shift_id = response.json() if passed else None
         
         print_test_result(f"Create Medical Shift ({smk_version} SMK)", passed,
                          f"Status: {response.status_code}, ID: {shift_id}", duration)
         record_test(f"Medical Shifts {smk_version} SMK - Create", passed,
-                   f"Status code: {response.status_code}")
+                   f"Status code: {response.status_code}", duration)
         
         # Get medical shifts
-        start_time = time.time()
-        response = requests.get(
-            f"{API_BASE_URL}/medicalshifts?internshipId={internship_id}",
-            headers=get_headers(token)
+        start_time = time.perf_counter()
+        response = api_client.get(
+            f"{API_BASE_URL}/medicalshifts?internshipId={internship_id}"
         )
         
         passed = response.status_code == 200
-        duration = time.time() - start_time
+        duration = time.perf_counter() - start_time
         count = len(response.json()) if passed else 0
         
         print_test_result(f"Get Medical Shifts ({smk_version} SMK)", passed,
                          f"Status: {response.status_code}, Count: {count}", duration)
         record_test(f"Medical Shifts {smk_version} SMK - Get List", passed,
-                   f"Retrieved {count} shifts")
+                   f"Retrieved {count} shifts", duration)
         
         # Update medical shift
         if shift_id:
-            start_time = time.time()
+            start_time = time.perf_counter()
             update_data = {
                 "hours": 10,
                 "minutes": 0,
                 "location": "ICU"
             }
             
-            response = requests.put(
+            response = api_client.put(
                 f"{API_BASE_URL}/medicalshifts/{shift_id}",
-                json=update_data,
-                headers=get_headers(token)
+                json=update_data
             )
             
             passed = response.status_code in [200, 204]
-            duration = time.time() - start_time
+            duration = time.perf_counter() - start_time
             
             print_test_result(f"Update Medical Shift ({smk_version} SMK)", passed,
                              f"Status: {response.status_code}", duration)
             record_test(f"Medical Shifts {smk_version} SMK - Update", passed,
-                       f"Status code: {response.status_code}")
+                       f"Status code: {response.status_code}", duration)
             
             # Delete medical shift
-            start_time = time.time()
-            response = requests.delete(
-                f"{API_BASE_URL}/medicalshifts/{shift_id}",
-                headers=get_headers(token)
+            start_time = time.perf_counter()
+            response = api_client.delete(
+                f"{API_BASE_URL}/medicalshifts/{shift_id}"
             )
             
             passed = response.status_code in [200, 204]
-            duration = time.time() - start_time
+            duration = time.perf_counter() - start_time
             
             print_test_result(f"Delete Medical Shift ({smk_version} SMK)", passed,
                              f"Status: {response.status_code}", duration)
             record_test(f"Medical Shifts {smk_version} SMK - Delete", passed,
-                       f"Status code: {response.status_code}")
+                       f"Status code: {response.status_code}", duration)
     except Exception as e:
         print_test_result(f"Medical Shift Tests ({smk_version} SMK)", False, str(e))
         record_test(f"Medical Shifts {smk_version} SMK - General", False, str(e))
 
+class _SuiteOutput(io.TextIOBase):
+    """stdout proxy that buffers writes per worker thread.
+
+    Each suite's output is flushed as one block when it finishes, so
+    concurrently running suites don't interleave their lines.
+    """
+
+    def __init__(self, target):
+        self._target = target
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def begin(self):
+        self._local.buffer = io.StringIO()
+
+    def end(self):
+        buffer = getattr(self._local, "buffer", None)
+        self._local.buffer = None
+        if buffer is not None:
+            with self._lock:
+                self._target.write(buffer.getvalue())
+                self._target.flush()
+
+    def write(self, text):
+        buffer = getattr(self._local, "buffer", None)
+        if buffer is not None:
+            return buffer.write(text)
+        with self._lock:
+            return self._target.write(text)
+
+    def flush(self):
+        self._target.flush()
+
+class Suite:
+    """A node in the suite dependency graph.
+
+    `func` is called with the results of `depends_on` (in order). A falsy
+    dependency result skips the suite and everything that depends on it;
+    `skip_count` tests are then recorded as skipped.
+    """
+
+    def __init__(self, name: str, func, depends_on: Tuple[str, ...] = (), skip_count: int = 0):
+        self.name = name
+        self.func = func
+        self.depends_on = depends_on
+        self.skip_count = skip_count
+
+def build_suite_graph() -> List[Suite]:
+    """Build the default suite graph"""
+    suites = [
+        Suite("authentication", test_authentication),
+        Suite("internships", test_internships, ("authentication",), skip_count=2),
+    ]
+    for smk_version in ("new", "old"):
+        suites.append(Suite(
+            f"procedures-{smk_version}",
+            lambda token, internship_id, v=smk_version: test_procedures(token, internship_id, v),
+            ("authentication", "internships"), skip_count=2))
+    for smk_version in ("new", "old"):
+        suites.append(Suite(
+            f"medical-shifts-{smk_version}",
+            lambda token, internship_id, v=smk_version: test_medical_shifts(token, internship_id, v),
+            ("authentication", "internships"), skip_count=2))
+    return suites
+
+def run_suites(suites: List[Suite], workers: int = 1) -> Dict[str, Any]:
+    """Run suites respecting dependencies; independent ones run in parallel"""
+    by_name = {suite.name: suite for suite in suites}
+    for suite in suites:
+        missing = [dep for dep in suite.depends_on if dep not in by_name]
+        if missing:
+            raise ValueError(f"Suite '{suite.name}' depends on unknown suite(s): {missing}")
+
+    output = _SuiteOutput(sys.stdout) if workers > 1 else None
+
+    def execute(suite: Suite, args: List[Any]):
+        if output:
+            output.begin()
+        try:
+            return suite.func(*args)
+        except Exception as e:
+            print_test_result(f"Suite {suite.name}", False, str(e))
+            record_test(f"Suite {suite.name} - General", False, str(e))
+            return None
+        finally:
+            if output:
+                output.end()
+
+    results: Dict[str, Any] = {}
+    pending = list(suites)
+    running = {}
+
+    original_stdout = sys.stdout
+    if output:
+        sys.stdout = output
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            while pending or running:
+                progressed = False
+                for suite in list(pending):
+                    if not all(dep in results for dep in suite.depends_on):
+                        continue
+                    pending.remove(suite)
+                    progressed = True
+                    args = [results[dep] for dep in suite.depends_on]
+                    failed_deps = [dep for dep, value in zip(suite.depends_on, args) if not value]
+                    if failed_deps:
+                        reason = f"no result from {', '.join(failed_deps)}"
+                        print(f"{Colors.WARNING}Skipping {suite.name} ({reason}){Colors.ENDC}")
+                        record_skipped(suite.name, suite.skip_count, reason)
+                        results[suite.name] = None
+                        continue
+                    running[executor.submit(execute, suite, args)] = suite
+
+                if not running:
+                    if not progressed:
+                        raise ValueError(f"Dependency cycle between suites: {[suite.name for suite in pending]}")
+                    # Skipping may have unblocked further suites
+                    continue
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    results[running.pop(future).name] = future.result()
+    finally:
+        sys.stdout = original_stdout
+
+    return results
+
+def check_latency_budgets(suite_results: Dict[str, Any], mode: str = "enforce") -> bool:
+    """Top up budgeted list endpoints with repeated requests, then check every budget"""
+    if mode == "off":
+        return True
+    print_header("Latency Budgets")
+    internship_id = suite_results.get("internships")
+    budget_tracker.top_up(f"{API_BASE_URL}/internships?specializationId=1")
+    if internship_id:
+        budget_tracker.top_up(f"{API_BASE_URL}/procedures?internshipId={internship_id}")
+        budget_tracker.top_up(f"{API_BASE_URL}/medicalshifts?internshipId={internship_id}")
+    
+    results = budget_tracker.check(mode)
+    for result in results:
+        if result.status == "insufficient":
+            print(f"  {Colors.WARNING}[SKIPPED]{Colors.ENDC} {result}")
+            continue
+        if result.status == "warned":
+            print(f"  {Colors.WARNING}[WARNING]{Colors.ENDC} {result}")
+        else:
+            print_test_result(str(result.budget), result.status == "passed", result.summary)
+        record_test(f"Latency budget - {result.budget.method} {result.budget.endpoint}",
+                    result.status != "failed", str(result))
+    return budgets.budgets_passed(results)
+
+def build_load_workload(acquire, requirement_id: int) -> List[Tuple[str, float, load_generator.Operation]]:
+    """Hot endpoints as (name, weight, operation) tuples for load_generator.
+
+    `acquire()` is a context manager yielding (headers, internship_id) for
+    the user an operation runs as; headers=None means the session's token.
+    Procedure realizations are logged against `requirement_id`.
+    """
+    def ok(response, expected) -> bool:
+        return response.status_code in expected
+
+    def create_realization(role: int):
+        def operation():
+            with acquire() as (headers, _):
+                return ok(api_client.post(f"{API_BASE_URL}/procedures/realizations", headers=headers,
+                                          json=build_realization_payload(requirement_id, role)), (200, 201))
+        return operation
+
+    def list_procedures():
+        with acquire() as (headers, _):
+            return ok(api_client.get(f"{API_BASE_URL}/procedures/user", headers=headers), (200,))
+
+    def create_shift():
+        with acquire() as (headers, internship_id):
+            return ok(api_client.post(f"{API_BASE_URL}/medicalshifts", headers=headers,
+                                      json=build_shift_payload(internship_id)), (200, 201))
+
+    def list_shifts():
+        with acquire() as (headers, internship_id):
+            return ok(api_client.get(f"{API_BASE_URL}/medicalshifts?internshipId={internship_id}",
+                                     headers=headers), (200,))
+
+    def create_internship():
+        with acquire() as (headers, _):
+            return ok(api_client.post(f"{API_BASE_URL}/internships", headers=headers,
+                                      json=build_internship_payload()), (200, 201))
+
+    def list_internships():
+        with acquire() as (headers, _):
+            return ok(api_client.get(f"{API_BASE_URL}/internships?specializationId=1", headers=headers), (200,))
+
+    # Roughly what residents do: mostly logging procedures and shifts,
+    # reading lists more often than creating internships.
+    return [
+        ("POST realization op", 3, create_realization(ROLE_OPERATOR)),
+        ("POST realization asst", 3, create_realization(ROLE_ASSISTANT)),
+        ("GET /procedures/user", 4, list_procedures),
+        ("POST /medicalshifts", 3, create_shift),
+        ("GET /medicalshifts", 4, list_shifts),
+        ("POST /internships", 1, create_internship),
+        ("GET /internships", 2, list_internships),
+    ]
+
+def create_internship_for(headers: Optional[Dict[str, str]] = None) -> Optional[int]:
+    """Create the internship load-test requests reference"""
+    response = api_client.post(f"{API_BASE_URL}/internships", json=build_internship_payload(), headers=headers)
+    if response.status_code not in (200, 201):
+        print(f"{Colors.FAIL}Failed to create load-test internship: {response.status_code} - {response.text}{Colors.ENDC}")
+        return None
+    return response.json()
+
+def load_requirement_id(headers: Optional[Dict[str, str]] = None) -> Optional[int]:
+    """Procedure requirement the load test logs realizations against"""
+    response = api_client.get(f"{API_BASE_URL}/procedures/modules/{MODULE_ID}", headers=headers)
+    requirement_id = first_requirement_id(response.json()) if response.status_code == 200 else None
+    if requirement_id is None:
+        print(f"{Colors.FAIL}No procedure requirements in module {MODULE_ID}: {response.status_code}{Colors.ENDC}")
+    return requirement_id
+
+def prepare_load_users(args):
+    """Context-manager factory for build_load_workload, or None on failure"""
+    if args.user_pool <= 0:
+        token = get_auth_token()
+        if not token:
+            print(f"{Colors.FAIL}Cannot run load test without a token{Colors.ENDC}")
+            return None
+        internship_id = create_internship_for()
+        if not internship_id:
+            return None
+
+        @contextlib.contextmanager
+        def single_user():
+            yield None, internship_id
+        return single_user
+
+    def setup(user: auth_pool.PooledUser):
+        user.data["internship_id"] = create_internship_for(api_client.auth_headers(user.token))
+
+    pool = auth_pool.UserPool(API_BASE_URL, args.user_pool, cache=token_cache)
+    start_time = time.perf_counter()
+    ready = pool.provision(setup)
+    print(f"Provisioned {ready}/{args.user_pool} pooled users in {time.perf_counter() - start_time:.1f}s")
+    if not ready or any(not user.data.get("internship_id") for user in pool.users):
+        print(f"{Colors.FAIL}User pool provisioning failed{Colors.ENDC}")
+        return None
+
+    @contextlib.contextmanager
+    def pooled_user():
+        with pool.user() as user:
+            yield api_client.auth_headers(user.token), user.data["internship_id"]
+    return pooled_user
+
+def run_load_test(args) -> bool:
+    """Run the open-loop load test; returns True when the error rate is acceptable"""
+    print_header("Load Test")
+    acquire = prepare_load_users(args)
+    if acquire is None:
+        return False
+    with acquire() as (headers, _):
+        requirement_id = load_requirement_id(headers)
+    if requirement_id is None:
+        return False
+
+    # Every virtual user needs its own pooled connection
+    api_client.configure(pool_size=max(args.users, api_client.DEFAULT_POOL_SIZE))
+
+    phases = load_generator.build_phases(args.rps, args.ramp_up, args.duration, args.ramp_down)
+    print(f"Virtual users: {args.users}, target: {args.rps} req/s, "
+          f"phases: {', '.join(f'{p.name} {p.duration:g}s' for p in phases)}")
+    latency_recorder.reset()
+    start_time = time.perf_counter()
+    result = load_generator.run_load(build_load_workload(acquire, requirement_id), phases, args.users)
+    duration = time.perf_counter() - start_time
+    latency_recorder.stop()
+
+    print(f"\n{Colors.BOLD}Response time from scheduled arrival (includes queueing):{Colors.ENDC}")
+    for line in load_generator.format_report(result):
+        print(line)
+    print(f"\n{Colors.BOLD}Service time per endpoint (ms):{Colors.ENDC}")
+    for line in latency_recorder.format_table():
+        print(line)
+
+    error_rate = result.error_rate * 100
+    passed = error_rate <= args.max_error_rate
+    color = Colors.OKGREEN if passed else Colors.FAIL
+    print(f"\n{color}Error rate: {error_rate:.2f}% (limit {args.max_error_rate:g}%){Colors.ENDC}")
+    record_test("Load Test - Error Rate", passed,
+                f"{error_rate:.2f}% errors over {result.totals().count} requests", duration)
+    return passed
+
+def check_regressions(args, baseline, current) -> bool:
+    """Compare latencies with the baseline run; False when an endpoint regressed"""
+    print_header("Performance vs Baseline")
+    comparisons = perf_regression.compare(current, baseline,
+                                          pct=args.regression_percentile,
+                                          threshold=args.regression_threshold / 100,
+                                          alpha=args.regression_alpha)
+    if not comparisons:
+        print(f"{Colors.WARNING}No endpoint has at least {perf_regression.MIN_SAMPLES} samples in both runs "
+              f"- use --load for a meaningful comparison{Colors.ENDC}")
+        return True
+
+    for line in perf_regression.format_comparisons(comparisons, args.regression_percentile):
+        print(line)
+    regressed = [c for c in comparisons if c.regressed]
+    if regressed:
+        print(f"\n{Colors.FAIL}{len(regressed)} endpoint(s) regressed by more than "
+              f"{args.regression_threshold:g}% at p{args.regression_percentile:g}{Colors.ENDC}")
+        return False
+    print(f"\n{Colors.OKGREEN}No significant latency regression{Colors.ENDC}")
+    return True
+
+def export_results(args):
+    """Write the JUnit and Prometheus reports requested on the command line"""
+    if args.junit:
+        results_export.write_junit_xml(args.junit, test_results["details"])
+        print(f"JUnit report written to {args.junit}")
+    if args.prom_textfile:
+        results_export.write_prometheus_textfile(args.prom_textfile, latency_recorder, test_results)
+        print(f"Prometheus textfile written to {args.prom_textfile}")
+    if args.jsonl:
+        print(f"JSON Lines results written to {args.jsonl}")
+
+@harness.suite("api", description="Authentication, internships, procedures and medical shifts")
+def run_suite(fx):
+    global API_BASE_URL
+    API_BASE_URL = fx.base_url
+    # The authentication suite signs in itself on purpose - sign-in is under test
+    for listener in LATENCY_LISTENERS:
+        api_client.add_listener(listener)
+    try:
+        latency_recorder.reset()
+        check_latency_budgets(run_suites(build_suite_graph(), workers=4))
+        latency_recorder.stop()
+    finally:
+        for listener in LATENCY_LISTENERS:
+            api_client.remove_listener(listener)
+    print_summary()
+    return test_results["failed"] == 0
+
 def main():
     """Main test execution"""
-    global API_BASE_URL
+    global API_BASE_URL, results_writer
     
     parser = argparse.ArgumentParser(description="Test SledzSpecke Web API")
     parser.add_argument("--url", default=API_BASE_URL, help="API base URL")
     parser.add_argument("--no-start", action="store_true", help="Don't start API if not running")
+    parser.add_argument("--workers", type=int, default=4,
+                        help="Maximum number of suites run concurrently (1 = sequential)")
+    load_group = parser.add_argument_group("load mode")
+    load_group.add_argument("--load", action="store_true", help="Run the load test instead of the functional suites")
+    load_group.add_argument("--users", type=int, default=10, help="Number of virtual users (max requests in flight)")
+    load_group.add_argument("--rps", type=float, default=20, help="Target arrival rate in requests per second")
+    load_group.add_argument("--ramp-up", type=float, default=10, help="Ramp-up duration in seconds")
+    load_group.add_argument("--duration", type=float, default=60, help="Steady-state duration in seconds")
+    load_group.add_argument("--ramp-down", type=float, default=5, help="Ramp-down duration in seconds")
+    load_group.add_argument("--user-pool", type=int, default=0,
+                            help="Spread load over this many pre-provisioned users (0 = single test user)")
+    load_group.add_argument("--max-error-rate", type=float, default=1.0,
+                            help="Fail the load test above this error percentage")
+    parser.add_argument("--budgets", choices=budgets.MODES, default="enforce",
+                        help="Latency budgets: fail on exceeded budgets, only warn, or skip them")
+    export_group = parser.add_argument_group("result export")
+    export_group.add_argument("--jsonl", metavar="PATH", help="Stream request and test records to a JSON Lines file")
+    export_group.add_argument("--junit", metavar="PATH", help="Write a JUnit XML report")
+    export_group.add_argument("--prom-textfile", metavar="PATH",
+                              help="Write a node-exporter textfile (*.prom) with latency metrics")
+    regression_group = parser.add_argument_group("performance regression gate")
+    regression_group.add_argument("--baseline", metavar="PATH",
+                                  help="JSON Lines file from a previous --jsonl run to compare latencies with")
+    regression_group.add_argument("--regression-percentile", type=float, default=95,
+                                  help="Percentile compared against the baseline")
+    regression_group.add_argument("--regression-threshold", type=float, default=10,
+                                  help="Fail when the percentile grows by more than this many percent")
+    regression_group.add_argument("--regression-alpha", type=float, default=0.05,
+                                  help="Significance level of the Mann-Whitney test")
     args = parser.parse_args()
     
     API_BASE_URL = args.url
@@ -551,6 +1013,7 @@ def main():
     print_header("SledzSpecke Web API Test Suite")
     print(f"API URL: {API_BASE_URL}")
     print(f"Test User: {TEST_USERNAME}")
+    print(f"Workers: {args.workers}")
     
     # Check if API is running
     api_process = None
@@ -571,37 +1034,52 @@ def main():
                 sys.exit(1)
     else:
         print(f"{Colors.OKGREEN}API is already running!{Colors.ENDC}")
+    report_database_health()
+    
+    baseline = None
+    sample_collector = None
+    if args.baseline:
+        # Read the baseline before --jsonl possibly appends to the same file
+        baseline = perf_regression.load_baseline(args.baseline)
+        sample_collector = perf_regression.SampleCollector()
+    
+    if args.jsonl:
+        results_writer = results_export.JsonLinesWriter(args.jsonl)
+        api_client.add_listener(results_writer.observe)
     
+    for listener in LATENCY_LISTENERS:
+        api_client.add_listener(listener)
+    latency_recorder.reset()
+    if sample_collector:
+        api_client.add_listener(sample_collector.observe)
     try:
-        # Run tests
-        token = test_authentication()
-        
-        if token:
-            # Create internship for testing
-            internship_id = test_internships(token)
-            
-            if internship_id:
-                # Test procedures for both SMK versions
-                test_procedures(token, internship_id, "new")
-                test_procedures(token, internship_id, "old")
-                
-                # Test medical shifts for both SMK versions
-                test_medical_shifts(token, internship_id, "new")
-                test_medical_shifts(token, internship_id, "old")
-            else:
-                print(f"{Colors.WARNING}Skipping procedure and medical shift tests (no internship){Colors.ENDC}")
-                test_results["skipped"] += 8
+        if args.load:
+            passed = run_load_test(args)
         else:
-            print(f"{Colors.WARNING}Skipping authenticated endpoint tests (no token){Colors.ENDC}")
-            test_results["skipped"] += 10
+            # Run tests
+            suite_results = run_suites(build_suite_graph(), workers=args.workers)
+            check_latency_budgets(suite_results, args.budgets)
+            latency_recorder.stop()
+            
+            # Print summary
+            print_summary()
+            passed = test_results["failed"] == 0
+        
+        export_results(args)
         
-        # Print summary
-        print_summary()
+        if baseline is not None:
+            api_client.remove_listener(sample_collector.observe)
+            passed = check_regressions(args, baseline, sample_collector.as_lists()) and passed
         
         # Exit with appropriate code
-        sys.exit(0 if test_results["failed"] == 0 else 1)
+        sys.exit(0 if passed else 1)
         
     finally:
+        for listener in LATENCY_LISTENERS:
+            api_client.remove_listener(listener)
+        if results_writer:
+            api_client.remove_listener(results_writer.observe)
+            results_writer.close()
         # Clean up API process if we started it
         if api_process:
             print("\nStopping API...")
@@ -5,9 +5,10 @@ Tests implementation details of the 5 completed tasks.
 """
 
 import os
-import subprocess
-import re
-import json
+
+import harness
+from build_runner import BuildRunner, format_build_report
+from source_index import Check, SourceIndex, run_checks
 
 # Colors for output
 GREEN = '\033[92m'
@@ -30,261 +31,180 @@ def print_error(message):
 def print_info(message):
     print(f"{YELLOW}ℹ {message}{RESET}")
 
-def search_file_content(file_path, pattern):
-    """Search for pattern in file content"""
-    try:
-        with open(file_path, 'r') as f:
-            content = f.read()
-            return pattern in content
-    except:
-        return False
+PRINTERS = {"success": print_success, "error": print_error, "info": print_info}
+
+# Paths relative to src/
+MEDICAL_SHIFT = "SledzSpecke.Core/Entities/MedicalShift.cs"
+PROCEDURE_BASE = "SledzSpecke.Core/Entities/ProcedureBase.cs"
+PROCEDURE = "SledzSpecke.Core/Entities/Procedure.cs"
+INTERNSHIP = "SledzSpecke.Core/Entities/Internship.cs"
+UPDATE_INTERNSHIP_HANDLER = "SledzSpecke.Application/Commands/Handlers/UpdateInternshipHandler.cs"
+COMPLETE_INTERNSHIP_HANDLER = "SledzSpecke.Application/Commands/Handlers/MarkInternshipAsCompletedHandler.cs"
+ADD_MEDICAL_SHIFT_HANDLER = "SledzSpecke.Application/MedicalShifts/Handlers/AddMedicalShiftHandler.cs"
+TIME_NORMALIZATION_HELPER = "SledzSpecke.Application/Helpers/TimeNormalizationHelper.cs"
+INTERNSHIPS_CONTROLLER = "SledzSpecke.Api/Controllers/InternshipsController.cs"
+YEAR_CALCULATION_SERVICE = "SledzSpecke.Application/Services/YearCalculationService.cs"
+YEAR_CALCULATION_INTERFACE = "SledzSpecke.Application/Abstractions/IYearCalculationService.cs"
+ADD_PROCEDURE_HANDLER = "SledzSpecke.Application/Procedures/Handlers/AddProcedureHandler.cs"
+APPLICATION_EXTENSIONS = "SledzSpecke.Application/Extensions.cs"
+
+SYNC_STATUS_CHECKS = [
+    Check(MEDICAL_SHIFT, failure=f"File not found: src/{MEDICAL_SHIFT}", children=[
+        Check(f"{MEDICAL_SHIFT}::MedicalShift.UpdateShiftDetails",
+              code=["if (SyncStatus == SyncStatus.Synced)", "SyncStatus = SyncStatus.Modified;"],
+              success="MedicalShift entity has sync status auto-transition in UpdateShiftDetails",
+              failure="MedicalShift entity missing sync status auto-transition"),
+        Check(f"{MEDICAL_SHIFT}::MedicalShift",
+              no_code=["CanBeModified => SyncStatus != SyncStatus.Synced"],
+              success="MedicalShift allows modification of synced items",
+              failure="MedicalShift still restricts modification of synced items"),
+    ]),
+    Check(PROCEDURE_BASE, failure=f"File not found: src/{PROCEDURE_BASE}", level="info", children=[
+        Check(f"{PROCEDURE_BASE}::ProcedureBase", code=["if (SyncStatus == SyncStatus.Synced)"],
+              success="ProcedureBase entity has sync status transition logic",
+              failure="ProcedureBase might handle sync status differently", level="info"),
+    ]),
+    Check(INTERNSHIP, failure=f"File not found: src/{INTERNSHIP}", children=[
+        Check(f"{INTERNSHIP}::Internship", code=["SyncStatus = SyncStatus.Modified;"],
+              success="Internship entity has sync status transitions in update methods",
+              failure="Internship entity missing sync status transitions"),
+    ]),
+]
+
+DOCUMENTED_FILES = [MEDICAL_SHIFT, INTERNSHIP, UPDATE_INTERNSHIP_HANDLER]
+SYNC_DOCUMENTATION_WORDS = [["sync"], ["automatic", "transition"]]
+
+MEDICAL_SHIFT_VALIDATION_CHECKS = [
+    Check(ADD_MEDICAL_SHIFT_HANDLER, failure=f"File not found: src/{ADD_MEDICAL_SHIFT_HANDLER}", children=[
+        Check(ADD_MEDICAL_SHIFT_HANDLER, no_code=["command.Hours > 24"], no_text=["shift duration cannot exceed"],
+              success="Maximum duration limits removed (24h restriction gone)",
+              failure="Still has maximum duration restrictions"),
+        Check(ADD_MEDICAL_SHIFT_HANDLER, no_code=["command.Minutes > 59"], no_text=["minutes must be between"],
+              success="Minutes > 59 allowed (no 0-59 restriction)",
+              failure="Still restricts minutes to 0-59"),
+        Check(ADD_MEDICAL_SHIFT_HANDLER, code=["command.Hours == 0 && command.Minutes == 0"],
+              success="Only checks that total duration > 0",
+              failure="Duration validation logic might be different", level="info"),
+    ]),
+    Check(TIME_NORMALIZATION_HELPER, success="TimeNormalizationHelper created for display formatting",
+          failure="TimeNormalizationHelper not found", children=[
+        Check(f"{TIME_NORMALIZATION_HELPER}::TimeNormalizationHelper.NormalizeTime", code=["minutes >= 60"],
+              success="TimeNormalizationHelper properly normalizes excess minutes"),
+    ]),
+]
+
+INTERNSHIP_UPDATE_CHECKS = [
+    Check(UPDATE_INTERNSHIP_HANDLER, success="UpdateInternshipHandler created",
+          failure="UpdateInternshipHandler not found", children=[
+        Check(UPDATE_INTERNSHIP_HANDLER, code=["ValidateInternshipDates"],
+              success="Handler includes date validation"),
+        Check(UPDATE_INTERNSHIP_HANDLER, any_code=["UpdateInstitution", "UpdateDates"],
+              success="Handler calls entity update methods"),
+    ]),
+    Check(COMPLETE_INTERNSHIP_HANDLER, success="MarkInternshipAsCompletedHandler created",
+          failure="MarkInternshipAsCompletedHandler not found"),
+    Check(INTERNSHIP, children=[
+        Check(f"{INTERNSHIP}::Internship.{method}", modifiers="public void",
+              success=f"Internship.{method} method implemented",
+              failure=f"Internship.{method} method not found")
+        for method in ("UpdateInstitution", "UpdateDates", "MarkAsCompleted")
+    ]),
+    Check(INTERNSHIPS_CONTROLLER, children=[
+        Check(f"{INTERNSHIPS_CONTROLLER}::InternshipsController", attributes=['HttpPut("{internshipId:int}")'],
+              success="PUT endpoint for internship update exists"),
+        Check(f"{INTERNSHIPS_CONTROLLER}::InternshipsController",
+              attributes=['HttpPost("{internshipId:int}/complete")'],
+              success="POST endpoint for marking complete exists"),
+    ]),
+]
+
+YEAR_CALCULATION_CHECKS = [
+    Check(YEAR_CALCULATION_SERVICE, success="YearCalculationService created",
+          failure="YearCalculationService not found", children=[
+        Check(f"{YEAR_CALCULATION_SERVICE}::YearCalculationService.{method}",
+              success=f"{method} implemented - {description}", failure=f"{method} not found")
+        for method, description in (
+            ("GetAvailableYears", "Returns years 1-6 for Old SMK"),
+            ("GetModuleYearRange", "Returns year ranges for modules"),
+            ("IsYearValidForModule", "Validates year including 0 for unassigned"),
+            ("CalculateCurrentYear", "Calculates current year from elapsed time"),
+        )
+    ] + [
+        Check(f"{YEAR_CALCULATION_SERVICE}::YearCalculationService", code=["year == 0"],
+              success="Supports year 0 for unassigned items"),
+    ]),
+    Check(f"{YEAR_CALCULATION_INTERFACE}::IYearCalculationService", success="IYearCalculationService interface exists",
+          failure="IYearCalculationService interface not found"),
+    Check(ADD_PROCEDURE_HANDLER, code=["_yearCalculationService"],
+          success="YearCalculationService integrated in AddProcedureHandler", children=[
+        Check(ADD_PROCEDURE_HANDLER, code=["availableYears.Contains"],
+              success="Year validation using available years"),
+    ]),
+    Check(PROCEDURE, children=[
+        Check(f"{PROCEDURE}::Procedure.Create", parameters=["int year"],
+              success="Procedure.Create accepts year parameter",
+              failure="Procedure.Create doesn't accept year parameter"),
+    ]),
+    Check(APPLICATION_EXTENSIONS, code=["IYearCalculationService, YearCalculationService"],
+          success="YearCalculationService registered in DI container"),
+]
 
-def test_sync_status_management():
+def test_sync_status_management(index):
     """Test 1: Sync status auto-transition implementation"""
     print_test_header("Task 1: Sync Status Management Implementation")
-    
-    # Check MedicalShift entity has sync status transition
-    medical_shift_file = "src/SledzSpecke.Core/Entities/MedicalShift.cs"
-    if os.path.exists(medical_shift_file):
-        with open(medical_shift_file, 'r') as f:
-            content = f.read()
-            
-        # Check for sync status transition in UpdateShiftDetails
-        if "if (SyncStatus == SyncStatus.Synced)" in content and "SyncStatus = SyncStatus.Modified;" in content:
-            print_success("MedicalShift entity has sync status auto-transition in UpdateShiftDetails")
-        else:
-            print_error("MedicalShift entity missing sync status auto-transition")
-            
-        # Check that CanBeModified doesn't restrict synced items
-        if "CanBeModified => SyncStatus != SyncStatus.Synced" not in content:
-            print_success("MedicalShift allows modification of synced items")
-        else:
-            print_error("MedicalShift still restricts modification of synced items")
-    else:
-        print_error(f"File not found: {medical_shift_file}")
-    
-    # Check Procedure entity
-    procedure_file = "src/SledzSpecke.Core/Entities/ProcedureBase.cs"
-    if os.path.exists(procedure_file):
-        with open(procedure_file, 'r') as f:
-            content = f.read()
-            
-        if "if (SyncStatus == SyncStatus.Synced)" in content:
-            print_success("ProcedureBase entity has sync status transition logic")
-        else:
-            print_info("ProcedureBase might handle sync status differently")
-    else:
-        print_info(f"File not found: {procedure_file}")
-        
-    # Check Internship entity
-    internship_file = "src/SledzSpecke.Core/Entities/Internship.cs"
-    if os.path.exists(internship_file):
-        with open(internship_file, 'r') as f:
-            content = f.read()
-            
-        if "SyncStatus = SyncStatus.Modified;" in content:
-            print_success("Internship entity has sync status transitions in update methods")
-        else:
-            print_error("Internship entity missing sync status transitions")
-    else:
-        print_error(f"File not found: {internship_file}")
+    return run_checks(index, SYNC_STATUS_CHECKS, PRINTERS)
 
-def test_documentation():
+def test_documentation(index):
     """Test 2: Documentation of sync status management"""
     print_test_header("Task 2: Sync Status Documentation")
     
-    # Check for documentation in code files
-    files_to_check = [
-        "src/SledzSpecke.Core/Entities/MedicalShift.cs",
-        "src/SledzSpecke.Core/Entities/Internship.cs",
-        "src/SledzSpecke.Application/Commands/Handlers/UpdateInternshipHandler.cs"
-    ]
-    
-    doc_found = False
-    for file_path in files_to_check:
-        if os.path.exists(file_path):
-            with open(file_path, 'r') as f:
-                content = f.read()
-                if "sync" in content.lower() and ("automatic" in content.lower() or "transition" in content.lower()):
-                    print_success(f"Documentation found in {os.path.basename(file_path)}")
-                    doc_found = True
-        else:
-            print_info(f"File not found: {file_path}")
+    # Check for documentation in code comments
+    for file_path in DOCUMENTED_FILES:
+        if not index.exists(file_path):
+            print_info(f"File not found: src/{file_path}")
+    checks = [Check(file_path, comment_words=SYNC_DOCUMENTATION_WORDS,
+                    success=f"Documentation found in {os.path.basename(file_path)}")
+              for file_path in DOCUMENTED_FILES if index.exists(file_path)]
+    passed, failed = run_checks(index, checks, PRINTERS)
     
-    if not doc_found:
+    if not passed:
         print_info("No explicit sync status documentation found in comments")
+    return passed, failed
 
-def test_medical_shift_validation():
+def test_medical_shift_validation(index):
     """Test 3: Medical shift duration validation alignment with MAUI"""
     print_test_header("Task 3: Medical Shift Duration Validation")
-    
-    # Check AddMedicalShiftHandler
-    handler_file = "src/SledzSpecke.Application/MedicalShifts/Handlers/AddMedicalShiftHandler.cs"
-    if os.path.exists(handler_file):
-        with open(handler_file, 'r') as f:
-            content = f.read()
-            
-        # Check for removal of maximum duration limits
-        if "command.Hours > 24" not in content and "shift duration cannot exceed" not in content.lower():
-            print_success("Maximum duration limits removed (24h restriction gone)")
-        else:
-            print_error("Still has maximum duration restrictions")
-            
-        # Check for allowing minutes > 59
-        if "command.Minutes > 59" not in content and "minutes must be between" not in content.lower():
-            print_success("Minutes > 59 allowed (no 0-59 restriction)")
-        else:
-            print_error("Still restricts minutes to 0-59")
-            
-        # Check for only validating > 0
-        if "command.Hours == 0 && command.Minutes == 0" in content:
-            print_success("Only checks that total duration > 0")
-        else:
-            print_info("Duration validation logic might be different")
-    else:
-        print_error(f"File not found: {handler_file}")
-    
-    # Check TimeNormalizationHelper
-    helper_file = "src/SledzSpecke.Application/Helpers/TimeNormalizationHelper.cs"
-    if os.path.exists(helper_file):
-        print_success("TimeNormalizationHelper created for display formatting")
-        with open(helper_file, 'r') as f:
-            content = f.read()
-            if "NormalizeTime" in content and "minutes >= 60" in content:
-                print_success("TimeNormalizationHelper properly normalizes excess minutes")
-    else:
-        print_error("TimeNormalizationHelper not found")
+    return run_checks(index, MEDICAL_SHIFT_VALIDATION_CHECKS, PRINTERS)
 
-def test_internship_update():
+def test_internship_update(index):
     """Test 4: Internship update functionality"""
     print_test_header("Task 4: Internship Update Functionality")
-    
-    # Check UpdateInternshipHandler exists
-    update_handler_file = "src/SledzSpecke.Application/Commands/Handlers/UpdateInternshipHandler.cs"
-    if os.path.exists(update_handler_file):
-        print_success("UpdateInternshipHandler created")
-        with open(update_handler_file, 'r') as f:
-            content = f.read()
-            if "ValidateInternshipDates" in content:
-                print_success("Handler includes date validation")
-            if "UpdateInstitution" in content or "UpdateDates" in content:
-                print_success("Handler calls entity update methods")
-    else:
-        print_error("UpdateInternshipHandler not found")
-    
-    # Check MarkInternshipAsCompletedHandler
-    complete_handler_file = "src/SledzSpecke.Application/Commands/Handlers/MarkInternshipAsCompletedHandler.cs"
-    if os.path.exists(complete_handler_file):
-        print_success("MarkInternshipAsCompletedHandler created")
-    else:
-        print_error("MarkInternshipAsCompletedHandler not found")
-    
-    # Check Internship entity update methods
-    internship_file = "src/SledzSpecke.Core/Entities/Internship.cs"
-    if os.path.exists(internship_file):
-        with open(internship_file, 'r') as f:
-            content = f.read()
-            methods = ["UpdateInstitution", "UpdateDates", "MarkAsCompleted"]
-            for method in methods:
-                if f"public void {method}" in content:
-                    print_success(f"Internship.{method} method implemented")
-                else:
-                    print_error(f"Internship.{method} method not found")
-    
-    # Check controller endpoints
-    controller_file = "src/SledzSpecke.Api/Controllers/InternshipsController.cs"
-    if os.path.exists(controller_file):
-        with open(controller_file, 'r') as f:
-            content = f.read()
-            if '[HttpPut("{internshipId:int}")]' in content:
-                print_success("PUT endpoint for internship update exists")
-            if '[HttpPost("{internshipId:int}/complete")]' in content:
-                print_success("POST endpoint for marking complete exists")
+    return run_checks(index, INTERNSHIP_UPDATE_CHECKS, PRINTERS)
 
-def test_year_calculation():
+def test_year_calculation(index):
     """Test 5: Year calculation based on specialization structure"""
     print_test_header("Task 5: Year Calculation Implementation")
-    
-    # Check YearCalculationService
-    service_file = "src/SledzSpecke.Application/Services/YearCalculationService.cs"
-    if os.path.exists(service_file):
-        print_success("YearCalculationService created")
-        with open(service_file, 'r') as f:
-            content = f.read()
-            
-        # Check for key methods
-        methods = [
-            ("GetAvailableYears", "Returns years 1-6 for Old SMK"),
-            ("GetModuleYearRange", "Returns year ranges for modules"),
-            ("IsYearValidForModule", "Validates year including 0 for unassigned"),
-            ("CalculateCurrentYear", "Calculates current year from elapsed time")
-        ]
-        
-        for method, description in methods:
-            if f"public {method}" in content or f"{method}(" in content:
-                print_success(f"{method} implemented - {description}")
-            else:
-                print_error(f"{method} not found")
-                
-        # Check for year 0 support
-        if "year == 0" in content:
-            print_success("Supports year 0 for unassigned items")
-    else:
-        print_error("YearCalculationService not found")
-    
-    # Check interface
-    interface_file = "src/SledzSpecke.Application/Abstractions/IYearCalculationService.cs"
-    if os.path.exists(interface_file):
-        print_success("IYearCalculationService interface exists")
-    else:
-        print_error("IYearCalculationService interface not found")
-    
-    # Check integration in handlers
-    procedure_handler = "src/SledzSpecke.Application/Procedures/Handlers/AddProcedureHandler.cs"
-    if os.path.exists(procedure_handler):
-        with open(procedure_handler, 'r') as f:
-            content = f.read()
-            if "_yearCalculationService" in content:
-                print_success("YearCalculationService integrated in AddProcedureHandler")
-                if "availableYears.Contains" in content:
-                    print_success("Year validation using available years")
-    
-    # Check Procedure.Create accepts year parameter
-    procedure_file = "src/SledzSpecke.Core/Entities/Procedure.cs"
-    if os.path.exists(procedure_file):
-        with open(procedure_file, 'r') as f:
-            content = f.read()
-            if "int year," in content or "int year)" in content:
-                print_success("Procedure.Create accepts year parameter")
-            else:
-                print_error("Procedure.Create doesn't accept year parameter")
-    
-    # Check DI registration
-    extensions_file = "src/SledzSpecke.Application/Extensions.cs"
-    if os.path.exists(extensions_file):
-        with open(extensions_file, 'r') as f:
-            content = f.read()
-            if "IYearCalculationService" in content and "YearCalculationService" in content:
-                print_success("YearCalculationService registered in DI container")
+    return run_checks(index, YEAR_CALCULATION_CHECKS, PRINTERS)
 
-def run_build_test():
+def run_build_test(build):
     """Test that the project builds successfully"""
     print_test_header("Build Test")
     
-    print_info("Running dotnet build...")
-    result = subprocess.run(["dotnet", "build"], capture_output=True, text=True)
+    print_info("Waiting for dotnet build...")
+    result = build.wait()
     
-    if result.returncode == 0:
+    if result.succeeded:
         print_success("Project builds successfully")
-        # Count warnings
-        warning_count = result.stdout.count("Warning(s)")
-        if warning_count > 0:
-            print_info(f"Build completed with warnings")
     else:
         print_error("Build failed")
-        print(result.stderr)
+        for error in result.errors[:20] or result.tail:
+            print(error)
+    for line in format_build_report(result):
+        print_info(line)
+    return result.succeeded
 
-def main():
+def main(build=None, index=None):
+    """Returns True when every check passed and the project builds"""
     print(f"\n{BLUE}Testing Completed Features Implementation{RESET}")
     print(f"{BLUE}This tests the code changes without requiring database data{RESET}")
     
@@ -296,17 +216,31 @@ def main():
         print_info("Changed to SledzSpecke.WebApi directory")
     else:
         print_error("Cannot find project directory")
-        return
+        return False
     
-    # Run tests
-    test_sync_status_management()
-    test_documentation()
-    test_medical_shift_validation()
-    test_internship_update()
-    test_year_calculation()
-    run_build_test()
+    # The build is the slowest step; run the static checks while it compiles
+    if build is None:
+        build = BuildRunner().start()
+    
+    # Run tests; every source file is read and parsed at most once
+    if index is None:
+        index = SourceIndex("src")
+    failed = 0
+    failed += test_sync_status_management(index)[1]
+    failed += test_documentation(index)[1]
+    failed += test_medical_shift_validation(index)[1]
+    failed += test_internship_update(index)[1]
+    failed += test_year_calculation(index)[1]
+    built = run_build_test(build)
     
     print(f"\n{BLUE}All tests completed!{RESET}")
+    
+    return failed == 0 and built
+
+@harness.suite("completed-features", description="Source checks for the last 5 completed tasks",
+               needs_api=False, uses=("build",))
+def run_suite(fx):
+    return main(fx.build, fx.source_index)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -8,9 +8,15 @@ Test script for the last 5 completed tasks:
 5. Implement year calculation based on specialization structure
 """
 
+import argparse
+import asyncio
 import requests
+import api_client
+import auth_pool
+import harness
 import json
 import sys
+from async_client import AsyncClient
 from datetime import datetime, timedelta
 
 # API Base URL
@@ -43,34 +49,55 @@ def print_error(message):
 def print_info(message):
     print(f"{YELLOW}ℹ {message}{RESET}")
 
+SHIFT_DURATION_CASES = [
+    {"hours": 0, "minutes": 30, "expected": "success", "description": "Valid: 30 minutes"},
+    {"hours": 12, "minutes": 0, "expected": "success", "description": "Valid: 12 hours"},
+    {"hours": 24, "minutes": 0, "expected": "success", "description": "Valid: 24 hours (no max limit)"},
+    {"hours": 8, "minutes": 90, "expected": "success", "description": "Valid: 8h 90min (minutes > 59 allowed)"},
+    {"hours": 0, "minutes": 0, "expected": "error", "description": "Invalid: Zero duration"},
+    {"hours": -1, "minutes": 30, "expected": "error", "description": "Invalid: Negative hours"},
+    {"hours": 8, "minutes": -30, "expected": "error", "description": "Invalid: Negative minutes"}
+]
+
+PROCEDURE_YEAR_CASES = [
+    {"year": 1, "expected": "success", "description": "Valid year 1"},
+    {"year": 6, "expected": "success", "description": "Valid year 6"},
+    {"year": 0, "expected": "success", "description": "Valid year 0 (unassigned)"},
+    {"year": 7, "expected": "error", "description": "Invalid year 7 (exceeds max)"},
+    {"year": -1, "expected": "error", "description": "Invalid negative year"}
+]
+
 class TestRunner:
     def __init__(self):
         self.token = None
         self.user_id = None
         self.specialization_id = None
         self.internship_id = None
-        self.procedure_id = None
-        self.medical_shift_id = None
+        self.procedure_ids = []
+        self.medical_shift_ids = []
+        self.failures = 0
+
+    def error(self, message):
+        """Report a failed check; run_tests() fails when any were reported"""
+        self.failures += 1
+        print_error(message)
 
     def login(self):
         """Login and get JWT token"""
         print_test_header("Login")
         
-        response = requests.post(f"{BASE_URL}/auth/sign-in", json=TEST_USER)
+        response = api_client.post(f"{BASE_URL}/auth/sign-in", json=TEST_USER)
         if response.status_code == 200:
             data = response.json()
-            self.token = data['accessToken']
+            self.token = auth_pool.read_access_token(data)
+            api_client.set_auth_token(self.token)
             self.user_id = data.get('userId', 1)  # Assuming user ID is returned
             print_success("Login successful")
             return True
         else:
-            print_error(f"Login failed: {response.status_code} - {response.text}")
+            self.error(f"Login failed: {response.status_code} - {response.text}")
             return False
 
-    def get_headers(self):
-        """Get headers with JWT token"""
-        return {"Authorization": f"Bearer {self.token}"}
-
     def setup_test_data(self):
         """Create necessary test data (specialization, internship)"""
         print_test_header("Setting up test data")
@@ -89,13 +116,13 @@ class TestRunner:
             "endDate": (datetime.now() + timedelta(days=30)).isoformat()
         }
         
-        response = requests.post(f"{BASE_URL}/internships", json=internship_data, headers=self.get_headers())
+        response = api_client.post(f"{BASE_URL}/internships", json=internship_data)
         if response.status_code in [200, 201]:
             self.internship_id = response.json()
             print_success(f"Created internship ID: {self.internship_id}")
             return True
         else:
-            print_error(f"Failed to create internship: {response.status_code} - {response.text}")
+            self.error(f"Failed to create internship: {response.status_code} - {response.text}")
             return False
 
     def test_sync_status_management(self):
@@ -112,21 +139,22 @@ class TestRunner:
             "year": 1
         }
         
-        response = requests.post(f"{BASE_URL}/medical-shifts", json=shift_data, headers=self.get_headers())
+        response = api_client.post(f"{BASE_URL}/medical-shifts", json=shift_data)
         if response.status_code in [200, 201]:
-            self.medical_shift_id = response.json()
-            print_success(f"Created medical shift ID: {self.medical_shift_id}")
+            shift_id = response.json()
+            self.medical_shift_ids.append(shift_id)
+            print_success(f"Created medical shift ID: {shift_id}")
         else:
-            print_error(f"Failed to create medical shift: {response.status_code} - {response.text}")
+            self.error(f"Failed to create medical shift: {response.status_code} - {response.text}")
             return
 
         # Get the shift to check initial status
-        response = requests.get(f"{BASE_URL}/medical-shifts/{self.medical_shift_id}", headers=self.get_headers())
+        response = api_client.get(f"{BASE_URL}/medical-shifts/{shift_id}")
         if response.status_code == 200:
             shift = response.json()
             print_info(f"Initial sync status: {shift.get('syncStatus', 'Unknown')}")
         else:
-            print_error(f"Failed to get medical shift: {response.status_code}")
+            self.error(f"Failed to get medical shift: {response.status_code}")
             return
 
         # Update the shift (should auto-transition if it was Synced)
@@ -136,37 +164,27 @@ class TestRunner:
             "location": "ICU"
         }
         
-        response = requests.put(f"{BASE_URL}/medical-shifts/{self.medical_shift_id}", 
-                               json=update_data, headers=self.get_headers())
+        response = api_client.put(f"{BASE_URL}/medical-shifts/{shift_id}", 
+                               json=update_data)
         if response.status_code == 200:
             print_success("Medical shift updated successfully")
             
             # Check the status after update
-            response = requests.get(f"{BASE_URL}/medical-shifts/{self.medical_shift_id}", headers=self.get_headers())
+            response = api_client.get(f"{BASE_URL}/medical-shifts/{shift_id}")
             if response.status_code == 200:
                 shift = response.json()
                 print_info(f"Sync status after update: {shift.get('syncStatus', 'Unknown')}")
                 print_success("Sync status management test completed")
             else:
-                print_error("Failed to verify updated status")
+                self.error("Failed to verify updated status")
         else:
-            print_error(f"Failed to update medical shift: {response.status_code} - {response.text}")
+            self.error(f"Failed to update medical shift: {response.status_code} - {response.text}")
 
     def test_medical_shift_duration_validation(self):
         """Test 3: Medical shift duration validation (MAUI alignment)"""
         print_test_header("Task 3: Medical Shift Duration Validation")
         
-        test_cases = [
-            {"hours": 0, "minutes": 30, "expected": "success", "description": "Valid: 30 minutes"},
-            {"hours": 12, "minutes": 0, "expected": "success", "description": "Valid: 12 hours"},
-            {"hours": 24, "minutes": 0, "expected": "success", "description": "Valid: 24 hours (no max limit)"},
-            {"hours": 8, "minutes": 90, "expected": "success", "description": "Valid: 8h 90min (minutes > 59 allowed)"},
-            {"hours": 0, "minutes": 0, "expected": "error", "description": "Invalid: Zero duration"},
-            {"hours": -1, "minutes": 30, "expected": "error", "description": "Invalid: Negative hours"},
-            {"hours": 8, "minutes": -30, "expected": "error", "description": "Invalid: Negative minutes"}
-        ]
-        
-        for test in test_cases:
+        for test in SHIFT_DURATION_CASES:
             shift_data = {
                 "internshipId": self.internship_id,
                 "date": datetime.now().isoformat(),
@@ -176,18 +194,21 @@ class TestRunner:
                 "year": 1
             }
             
-            response = requests.post(f"{BASE_URL}/medical-shifts", json=shift_data, headers=self.get_headers())
+            response = api_client.post(f"{BASE_URL}/medical-shifts", json=shift_data)
             
             if test["expected"] == "success":
                 if response.status_code in [200, 201]:
                     print_success(f"{test['description']} - Accepted as expected")
+                    self.medical_shift_ids.append(response.json())
                 else:
-                    print_error(f"{test['description']} - Rejected unexpectedly: {response.text}")
+                    self.error(f"{test['description']} - Rejected unexpectedly: {response.text}")
             else:  # expected error
                 if response.status_code >= 400:
                     print_success(f"{test['description']} - Rejected as expected")
                 else:
-                    print_error(f"{test['description']} - Accepted unexpectedly")
+                    self.error(f"{test['description']} - Accepted unexpectedly")
+                    if response.status_code in [200, 201]:
+                        self.medical_shift_ids.append(response.json())
 
     def test_internship_update_functionality(self):
         """Test 4: Update functionality for InternshipsController"""
@@ -202,48 +223,38 @@ class TestRunner:
             "endDate": (datetime.now() + timedelta(days=40)).isoformat()
         }
         
-        response = requests.put(f"{BASE_URL}/internships/{self.internship_id}", 
-                               json=update_data, headers=self.get_headers())
+        response = api_client.put(f"{BASE_URL}/internships/{self.internship_id}", 
+                               json=update_data)
         if response.status_code == 200:
             print_success("Internship updated successfully")
             
             # Verify the update
-            response = requests.get(f"{BASE_URL}/internships?specializationId={self.specialization_id}", 
-                                  headers=self.get_headers())
+            response = api_client.get(f"{BASE_URL}/internships?specializationId={self.specialization_id}")
             if response.status_code == 200:
                 internships = response.json()
                 updated = next((i for i in internships if i['id'] == self.internship_id), None)
                 if updated and updated['institutionName'] == "Updated Hospital":
                     print_success("Update verified - institution name changed")
                 else:
-                    print_error("Update not reflected in data")
+                    self.error("Update not reflected in data")
             else:
-                print_error("Failed to verify update")
+                self.error("Failed to verify update")
         else:
-            print_error(f"Failed to update internship: {response.status_code} - {response.text}")
+            self.error(f"Failed to update internship: {response.status_code} - {response.text}")
         
         # Test marking internship as completed
-        response = requests.post(f"{BASE_URL}/internships/{self.internship_id}/complete", 
-                               headers=self.get_headers())
+        response = api_client.post(f"{BASE_URL}/internships/{self.internship_id}/complete")
         if response.status_code == 200:
             print_success("Internship marked as completed")
         else:
-            print_error(f"Failed to mark internship as completed: {response.status_code} - {response.text}")
+            self.error(f"Failed to mark internship as completed: {response.status_code} - {response.text}")
 
     def test_year_calculation(self):
         """Test 5: Year calculation based on specialization structure"""
         print_test_header("Task 5: Year Calculation for Procedures")
         
         # Test year validation for procedures
-        test_cases = [
-            {"year": 1, "expected": "success", "description": "Valid year 1"},
-            {"year": 6, "expected": "success", "description": "Valid year 6"},
-            {"year": 0, "expected": "success", "description": "Valid year 0 (unassigned)"},
-            {"year": 7, "expected": "error", "description": "Invalid year 7 (exceeds max)"},
-            {"year": -1, "expected": "error", "description": "Invalid negative year"}
-        ]
-        
-        for test in test_cases:
+        for test in PROCEDURE_YEAR_CASES:
             procedure_data = {
                 "internshipId": self.internship_id,
                 "date": datetime.now().isoformat(),
@@ -253,71 +264,336 @@ class TestRunner:
                 "status": "Pending"
             }
             
-            response = requests.post(f"{BASE_URL}/procedures", json=procedure_data, headers=self.get_headers())
+            response = api_client.post(f"{BASE_URL}/procedures", json=procedure_data)
             
             if test["expected"] == "success":
                 if response.status_code in [200, 201]:
                     print_success(f"{test['description']} - Accepted as expected")
-                    self.procedure_id = response.json()
+                    self.procedure_ids.append(response.json())
                 else:
-                    print_error(f"{test['description']} - Rejected unexpectedly: {response.text}")
+                    self.error(f"{test['description']} - Rejected unexpectedly: {response.text}")
             else:  # expected error
                 if response.status_code >= 400:
                     print_success(f"{test['description']} - Rejected as expected")
                 else:
-                    print_error(f"{test['description']} - Accepted unexpectedly")
+                    self.error(f"{test['description']} - Accepted unexpectedly")
+                    if response.status_code in [200, 201]:
+                        self.procedure_ids.append(response.json())
 
     def cleanup(self):
         """Clean up test data"""
         print_test_header("Cleanup")
         
         # Delete created resources
-        if self.medical_shift_id:
-            response = requests.delete(f"{BASE_URL}/medical-shifts/{self.medical_shift_id}", 
-                                     headers=self.get_headers())
-            if response.status_code in [200, 204]:
-                print_success("Deleted test medical shift")
+        for resource, ids, label in (("medical-shifts", self.medical_shift_ids, "medical shifts"),
+                                     ("procedures", self.procedure_ids, "procedures")):
+            deleted = sum(1 for item_id in ids
+                          if api_client.delete(f"{BASE_URL}/{resource}/{item_id}").status_code in [200, 204])
+            if deleted == len(ids):
+                print_success(f"Deleted {deleted} test {label}")
             else:
-                print_info("Could not delete medical shift")
+                print_info(f"Could not delete {len(ids) - deleted} of {len(ids)} test {label}")
         
-        if self.procedure_id:
-            response = requests.delete(f"{BASE_URL}/procedures/{self.procedure_id}", 
-                                     headers=self.get_headers())
-            if response.status_code in [200, 204]:
-                print_success("Deleted test procedure")
-            else:
-                print_info("Could not delete procedure")
-        
-        # Note: Internship deletion endpoint is not implemented yet
-        print_info("Internship cleanup skipped (delete endpoint not implemented)")
+        # Completed internships can still be deleted; only synced or approved ones can't
+        if self.internship_id is None:
+            return
+        response = api_client.delete(f"{BASE_URL}/internships/{self.internship_id}")
+        if response.status_code in [200, 204]:
+            print_success(f"Deleted test internship {self.internship_id}")
+        else:
+            print_info(f"Could not delete test internship {self.internship_id}: {response.status_code}")
 
     def run_all_tests(self):
         """Run all tests"""
         print(f"\n{BLUE}Starting tests for completed tasks...{RESET}")
         
         if not self.login():
-            print_error("Failed to login. Exiting.")
+            self.error("Failed to login. Exiting.")
             return
         
         if not self.setup_test_data():
-            print_error("Failed to setup test data. Exiting.")
+            self.error("Failed to setup test data. Exiting.")
             return
         
-        # Run tests
-        self.test_sync_status_management()
-        self.test_medical_shift_duration_validation()
-        self.test_internship_update_functionality()
-        self.test_year_calculation()
-        
-        # Cleanup
-        self.cleanup()
+        self.run_tests()
         
         print(f"\n{BLUE}All tests completed!{RESET}")
 
+    def run_tests(self):
+        """Task tests and cleanup; needs login() and setup_test_data() first.
+
+        Returns True when every check passed.
+        """
+        try:
+            self.test_sync_status_management()
+            self.test_medical_shift_duration_validation()
+            self.test_internship_update_functionality()
+            self.test_year_calculation()
+        finally:
+            self.cleanup()
+        return self.failures == 0
+
+class Section:
+    """Output of one test, buffered so concurrent tests don't interleave"""
+
+    def __init__(self, title: str):
+        self.title = title
+        self.lines = []
+
+    def success(self, message):
+        self.lines.append((print_success, message))
+
+    def error(self, message):
+        self.lines.append((print_error, message))
+
+    def info(self, message):
+        self.lines.append((print_info, message))
+
+    def flush(self):
+        print_test_header(self.title)
+        for printer, message in self.lines:
+            printer(message)
+        self.lines = []
+
+class AsyncTestRunner:
+    """TestRunner on an async HTTP client.
+
+    After login and setup, the sync-status, shift-duration and year tests
+    run concurrently, and each table of cases is sent as one gather. The
+    internship update runs last because it marks the internship completed,
+    which the other tests still post against. Output is printed per test,
+    in the same order as TestRunner.
+    """
+
+    def __init__(self, max_connections: int = 16):
+        self.max_connections = max_connections
+        self.client = None
+        self.specialization_id = None
+        self.internship_id = None
+        self.medical_shift_ids = []
+        self.procedure_ids = []
+
+    async def login(self):
+        section = Section("Login")
+        response = await self.client.post(f"{BASE_URL}/auth/sign-in", json=TEST_USER)
+        if response.status_code == 200:
+            self.client.set_token(auth_pool.read_access_token(response.json()))
+            section.success("Login successful")
+        else:
+            section.error(f"Login failed: {response.status_code} - {response.text}")
+        section.flush()
+        return self.client.token is not None
+
+    async def setup_test_data(self):
+        section = Section("Setting up test data")
+        self.specialization_id = 1
+        section.info(f"Using seeded specialization ID: {self.specialization_id} (Cardiology Old SMK)")
+
+        internship_data = {
+            "specializationId": self.specialization_id,
+            "institutionName": "Test Hospital",
+            "departmentName": "Test Department",
+            "supervisorName": "Dr. Test",
+            "startDate": (datetime.now() - timedelta(days=30)).isoformat(),
+            "endDate": (datetime.now() + timedelta(days=30)).isoformat()
+        }
+        response = await self.client.post(f"{BASE_URL}/internships", json=internship_data)
+        if response.status_code in [200, 201]:
+            self.internship_id = response.json()
+            section.success(f"Created internship ID: {self.internship_id}")
+        else:
+            section.error(f"Failed to create internship: {response.status_code} - {response.text}")
+        section.flush()
+        return self.internship_id is not None
+
+    def _shift_data(self, hours, minutes, location):
+        return {
+            "internshipId": self.internship_id,
+            "date": datetime.now().isoformat(),
+            "hours": hours,
+            "minutes": minutes,
+            "location": location,
+            "year": 1
+        }
+
+    async def test_sync_status_management(self):
+        section = Section("Task 1: Sync Status Management")
+        # Each step depends on the previous one, so this test stays sequential
+        response = await self.client.post(f"{BASE_URL}/medical-shifts",
+                                          json=self._shift_data(8, 30, "Emergency Room"))
+        if response.status_code not in [200, 201]:
+            section.error(f"Failed to create medical shift: {response.status_code} - {response.text}")
+            return section
+        shift_id = response.json()
+        self.medical_shift_ids.append(shift_id)
+        section.success(f"Created medical shift ID: {shift_id}")
+
+        response = await self.client.get(f"{BASE_URL}/medical-shifts/{shift_id}")
+        if response.status_code != 200:
+            section.error(f"Failed to get medical shift: {response.status_code}")
+            return section
+        section.info(f"Initial sync status: {response.json().get('syncStatus', 'Unknown')}")
+
+        response = await self.client.put(f"{BASE_URL}/medical-shifts/{shift_id}",
+                                         json={"hours": 9, "minutes": 0, "location": "ICU"})
+        if response.status_code != 200:
+            section.error(f"Failed to update medical shift: {response.status_code} - {response.text}")
+            return section
+        section.success("Medical shift updated successfully")
+
+        response = await self.client.get(f"{BASE_URL}/medical-shifts/{shift_id}")
+        if response.status_code == 200:
+            section.info(f"Sync status after update: {response.json().get('syncStatus', 'Unknown')}")
+            section.success("Sync status management test completed")
+        else:
+            section.error("Failed to verify updated status")
+        return section
+
+    def _check_expected(self, section, test, response):
+        """Report one case; True when the API created the resource"""
+        created = response.status_code in [200, 201]
+        if test["expected"] == "success":
+            if created:
+                section.success(f"{test['description']} - Accepted as expected")
+            else:
+                section.error(f"{test['description']} - Rejected unexpectedly: {response.text}")
+        elif response.status_code >= 400:
+            section.success(f"{test['description']} - Rejected as expected")
+        else:
+            section.error(f"{test['description']} - Accepted unexpectedly")
+        return created
+
+    async def test_medical_shift_duration_validation(self):
+        section = Section("Task 3: Medical Shift Duration Validation")
+        responses = await asyncio.gather(*(
+            self.client.post(f"{BASE_URL}/medical-shifts",
+                             json=self._shift_data(test["hours"], test["minutes"], "Test Location"))
+            for test in SHIFT_DURATION_CASES))
+        for test, response in zip(SHIFT_DURATION_CASES, responses):
+            if self._check_expected(section, test, response):
+                self.medical_shift_ids.append(response.json())
+        return section
+
+    async def test_year_calculation(self):
+        section = Section("Task 5: Year Calculation for Procedures")
+        responses = await asyncio.gather(*(
+            self.client.post(f"{BASE_URL}/procedures", json={
+                "internshipId": self.internship_id,
+                "date": datetime.now().isoformat(),
+                "year": test["year"],
+                "code": "TEST001",
+                "location": "Operating Room",
+                "status": "Pending"
+            })
+            for test in PROCEDURE_YEAR_CASES))
+        for test, response in zip(PROCEDURE_YEAR_CASES, responses):
+            if self._check_expected(section, test, response):
+                self.procedure_ids.append(response.json())
+        return section
+
+    async def test_internship_update_functionality(self):
+        section = Section("Task 4: Internship Update Functionality")
+        update_data = {
+            "institutionName": "Updated Hospital",
+            "departmentName": "Updated Department",
+            "supervisorName": "Dr. Updated",
+            "startDate": (datetime.now() - timedelta(days=20)).isoformat(),
+            "endDate": (datetime.now() + timedelta(days=40)).isoformat()
+        }
+        response = await self.client.put(f"{BASE_URL}/internships/{self.internship_id}", json=update_data)
+        if response.status_code == 200:
+            section.success("Internship updated successfully")
+            response = await self.client.get(f"{BASE_URL}/internships?specializationId={self.specialization_id}")
+            if response.status_code == 200:
+                updated = next((i for i in response.json() if i['id'] == self.internship_id), None)
+                if updated and updated['institutionName'] == "Updated Hospital":
+                    section.success("Update verified - institution name changed")
+                else:
+                    section.error("Update not reflected in data")
+            else:
+                section.error("Failed to verify update")
+        else:
+            section.error(f"Failed to update internship: {response.status_code} - {response.text}")
+
+        response = await self.client.post(f"{BASE_URL}/internships/{self.internship_id}/complete")
+        if response.status_code == 200:
+            section.success("Internship marked as completed")
+        else:
+            section.error(f"Failed to mark internship as completed: {response.status_code} - {response.text}")
+        return section
+
+    async def _delete_all(self, resource, ids):
+        """DELETE every id concurrently; returns how many succeeded"""
+        responses = await asyncio.gather(*(self.client.delete(f"{BASE_URL}/{resource}/{item_id}")
+                                           for item_id in ids), return_exceptions=True)
+        return sum(1 for response in responses
+                   if not isinstance(response, Exception) and response.status_code in [200, 204])
+
+    async def cleanup(self):
+        section = Section("Cleanup")
+        shifts, procedures = await asyncio.gather(
+            self._delete_all("medical-shifts", self.medical_shift_ids),
+            self._delete_all("procedures", self.procedure_ids))
+        for deleted, total, label in ((shifts, len(self.medical_shift_ids), "medical shifts"),
+                                      (procedures, len(self.procedure_ids), "procedures")):
+            if deleted == total:
+                section.success(f"Deleted {deleted} test {label}")
+            else:
+                section.info(f"Could not delete {total - deleted} of {total} test {label}")
+        # After the shifts and procedures that reference it
+        if await self._delete_all("internships", [self.internship_id]):
+            section.success(f"Deleted test internship {self.internship_id}")
+        else:
+            section.info(f"Could not delete test internship {self.internship_id}")
+        section.flush()
+
+    async def run_all_tests(self):
+        print(f"\n{BLUE}Starting tests for completed tasks (async)...{RESET}")
+        async with AsyncClient(max_connections=self.max_connections) as client:
+            self.client = client
+            if not await self.login():
+                print_error("Failed to login. Exiting.")
+                return
+            if not await self.setup_test_data():
+                print_error("Failed to setup test data. Exiting.")
+                return
+
+            sections = await asyncio.gather(
+                self.test_sync_status_management(),
+                self.test_medical_shift_duration_validation(),
+                self.test_year_calculation())
+            sections = list(sections)
+            # Completes the internship, so it must come after the tests posting to it
+            sections.insert(2, await self.test_internship_update_functionality())
+            for section in sections:
+                section.flush()
+
+            await self.cleanup()
+        print(f"\n{BLUE}All tests completed!{RESET}")
+
+@harness.suite("completed-tasks", description="API behavior of the last 5 completed tasks")
+def run_suite(fx):
+    global BASE_URL
+    BASE_URL = fx.base_url
+    runner = TestRunner()
+    runner.token = fx.token
+    # The tests mark the internship completed, so the shared one can't be used;
+    # cleanup deletes it along with its shifts and procedures
+    if not runner.setup_test_data():
+        return False
+    return runner.run_tests()
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Test the last 5 completed tasks against a running API")
+    parser.add_argument("--async", dest="use_async", action="store_true",
+                        help="Run independent tests concurrently on an async HTTP client")
+    parser.add_argument("--connections", type=int, default=16,
+                        help="Connection limit for --async (default 16)")
+    args = parser.parse_args()
+
     # Check if API is running by trying to access auth endpoint
     try:
-        response = requests.post(f"{BASE_URL}/auth/sign-in", json={"username": "test", "password": "test"})
+        response = api_client.post(f"{BASE_URL}/auth/sign-in", json={"username": "test", "password": "test"})
         # We expect 400 or 401, not connection error
         if response.status_code == 0:
             print_error("API is not responding. Please start the API first.")
@@ -329,5 +605,8 @@ if __name__ == "__main__":
         sys.exit(1)
     
     # Run tests
-    runner = TestRunner()
-    runner.run_all_tests()
\ No newline at end of file
+    if args.use_async:
+        asyncio.run(AsyncTestRunner(args.connections).run_all_tests())
+    else:
+        runner = TestRunner()
+        runner.run_all_tests()
\ No newline at end of file
@@ -4,8 +4,10 @@ Test script for module-based validation for New SMK procedures.
 """
 
 import os
-import subprocess
-import json
+
+import harness
+from build_runner import BuildRunner, format_build_report
+from source_index import Check, SourceIndex, run_checks
 
 # Colors for output
 GREEN = '\033[92m'
@@ -28,153 +30,121 @@ def print_error(message):
 def print_info(message):
     print(f"{YELLOW}ℹ {message}{RESET}")
 
-def test_module_validation_implementation():
+PRINTERS = {"success": print_success, "error": print_error, "info": print_info}
+
+# Paths relative to src/
+VALIDATION_SERVICE = "SledzSpecke.Application/Services/SpecializationValidationService.cs"
+VALIDATION_INTERFACE = "SledzSpecke.Application/Abstractions/ISpecializationValidationService.cs"
+ADD_PROCEDURE_HANDLER = "SledzSpecke.Application/Procedures/Handlers/AddProcedureHandler.cs"
+
+MODULE_VALIDATION_CHECKS = [
+    Check(VALIDATION_SERVICE, failure=f"File not found: src/{VALIDATION_SERVICE}", children=[
+        Check(VALIDATION_SERVICE, text=["Module-based validation for New SMK"],
+              success="Module-based validation logic implemented",
+              failure="Module-based validation not found"),
+        Check(VALIDATION_SERVICE,
+              text=["No current module selected. Cannot add procedures without an active module."],
+              success="Current module requirement enforced",
+              failure="Current module validation not found"),
+        Check(VALIDATION_SERVICE, text=["belongs to module", "but current module is"],
+              success="Module mismatch validation implemented",
+              failure="Module mismatch validation not found"),
+        Check(VALIDATION_SERVICE, text=["For New SMK, only search in current module"],
+              success="Module-specific procedure search implemented",
+              failure="Module-specific procedure search not found"),
+    ]),
+]
+
+MODULE_PROGRESS_PROPERTIES = [
+    "CompletedProceduresA",
+    "CompletedProceduresB",
+    "TotalRequiredProceduresA",
+    "TotalRequiredProceduresB",
+    "ProcedureACompletionPercentage",
+    "ProcedureBCompletionPercentage",
+    "OverallCompletionPercentage",
+]
+
+MODULE_PROGRESS_CHECKS = [
+    Check(VALIDATION_SERVICE, children=[
+        Check(f"{VALIDATION_SERVICE}::SpecializationValidationService.CalculateModuleProgressAsync",
+              success="CalculateModuleProgressAsync method implemented",
+              failure="CalculateModuleProgressAsync not found", children=[
+            Check(f"{VALIDATION_SERVICE}::SpecializationValidationService.CalculateModuleProgressAsync",
+                  code=[formula], success=f"MAUI progress formula implemented ({description})")
+            for formula, description in (
+                ("internshipProgress * 0.35", "35% internship"),
+                ("courseProgress * 0.25", "25% courses"),
+                ("procedureProgress * 0.30", "30% procedures"),
+                ("shiftProgress * 0.10", "10% shifts"),
+            )
+        ]),
+    ]),
+    Check(f"{VALIDATION_INTERFACE}::ModuleProgress", success="ModuleProgress class defined", children=[
+        Check(f"{VALIDATION_INTERFACE}::ModuleProgress.{prop}",
+              success=f"ModuleProgress.{prop} property exists",
+              failure=f"ModuleProgress.{prop} property missing")
+        for prop in MODULE_PROGRESS_PROPERTIES
+    ]),
+]
+
+MODULE_FEATURE_CHECKS = [
+    Check(VALIDATION_SERVICE, code=["specialization.SmkVersion == SmkVersion.New"],
+          success="New SMK specific checks found ({count} occurrences)"),
+    Check(VALIDATION_SERVICE, code=["ModuleTemplate"], success="Uses ModuleTemplate for validation"),
+    Check(VALIDATION_SERVICE, code=["procedureTemplate.InternshipId"],
+          success="Validates procedure internship requirements"),
+]
+
+INTEGRATION_CHECKS = [
+    Check(ADD_PROCEDURE_HANDLER, code=["_validationService"],
+          success="AddProcedureHandler integrated with validation service"),
+    Check(f"{VALIDATION_INTERFACE}::ISpecializationValidationService.CalculateModuleProgressAsync",
+          success="Interface includes module progress calculation"),
+]
+
+def test_module_validation_implementation(index):
     """Test module-based validation for New SMK procedures"""
     print_test_header("Module-Based Validation for New SMK")
-    
-    # Check SpecializationValidationService enhancements
-    validation_file = "src/SledzSpecke.Application/Services/SpecializationValidationService.cs"
-    if os.path.exists(validation_file):
-        with open(validation_file, 'r') as f:
-            content = f.read()
-            
-        # Check for module validation in ValidateProcedureAsync
-        if "Module-based validation for New SMK" in content:
-            print_success("Module-based validation logic implemented")
-        else:
-            print_error("Module-based validation not found")
-            
-        # Check for current module validation
-        if "No current module selected. Cannot add procedures without an active module." in content:
-            print_success("Current module requirement enforced")
-        else:
-            print_error("Current module validation not found")
-            
-        # Check for module mismatch validation
-        if "belongs to module" in content and "but current module is" in content:
-            print_success("Module mismatch validation implemented")
-        else:
-            print_error("Module mismatch validation not found")
-            
-        # Check for module-specific procedure search
-        if "For New SMK, only search in current module" in content:
-            print_success("Module-specific procedure search implemented")
-        else:
-            print_error("Module-specific procedure search not found")
-    else:
-        print_error(f"File not found: {validation_file}")
+    return run_checks(index, MODULE_VALIDATION_CHECKS, PRINTERS)
 
-def test_module_progress_calculation():
+def test_module_progress_calculation(index):
     """Test module progress calculation functionality"""
     print_test_header("Module Progress Calculation")
-    
-    validation_file = "src/SledzSpecke.Application/Services/SpecializationValidationService.cs"
-    if os.path.exists(validation_file):
-        with open(validation_file, 'r') as f:
-            content = f.read()
-            
-        # Check for CalculateModuleProgressAsync method
-        if "CalculateModuleProgressAsync" in content:
-            print_success("CalculateModuleProgressAsync method implemented")
-            
-            # Check for progress calculation formula
-            if "internshipProgress * 0.35" in content:
-                print_success("MAUI progress formula implemented (35% internship)")
-            if "courseProgress * 0.25" in content:
-                print_success("MAUI progress formula implemented (25% courses)")
-            if "procedureProgress * 0.30" in content:
-                print_success("MAUI progress formula implemented (30% procedures)")
-            if "shiftProgress * 0.10" in content:
-                print_success("MAUI progress formula implemented (10% shifts)")
-        else:
-            print_error("CalculateModuleProgressAsync not found")
-    
-    # Check ModuleProgress class
-    interface_file = "src/SledzSpecke.Application/Abstractions/ISpecializationValidationService.cs"
-    if os.path.exists(interface_file):
-        with open(interface_file, 'r') as f:
-            content = f.read()
-            
-        if "class ModuleProgress" in content:
-            print_success("ModuleProgress class defined")
-            
-            # Check required properties
-            required_props = [
-                "CompletedProceduresA",
-                "CompletedProceduresB", 
-                "TotalRequiredProceduresA",
-                "TotalRequiredProceduresB",
-                "ProcedureACompletionPercentage",
-                "ProcedureBCompletionPercentage",
-                "OverallCompletionPercentage"
-            ]
-            
-            for prop in required_props:
-                if prop in content:
-                    print_success(f"ModuleProgress.{prop} property exists")
-                else:
-                    print_error(f"ModuleProgress.{prop} property missing")
-
-def test_module_specific_features():
+    return run_checks(index, MODULE_PROGRESS_CHECKS, PRINTERS)
+
+def test_module_specific_features(index):
     """Test module-specific features"""
     print_test_header("Module-Specific Features")
     
-    validation_file = "src/SledzSpecke.Application/Services/SpecializationValidationService.cs"
-    if os.path.exists(validation_file):
-        with open(validation_file, 'r') as f:
-            content = f.read()
-            
+    if index.exists(VALIDATION_SERVICE):
         print_info("Checking module-specific validations:")
-        
-        # Check for New SMK specific logic
-        if "specialization.SmkVersion == SmkVersion.New" in content:
-            count = content.count("specialization.SmkVersion == SmkVersion.New")
-            print_success(f"New SMK specific checks found ({count} occurrences)")
-        
-        # Check for module template usage
-        if "ModuleTemplate" in content:
-            print_success("Uses ModuleTemplate for validation")
-        
-        # Check for internship ID validation
-        if "procedureTemplate.InternshipId" in content:
-            print_success("Validates procedure internship requirements")
-
-def test_integration_points():
+    return run_checks(index, MODULE_FEATURE_CHECKS, PRINTERS)
+
+def test_integration_points(index):
     """Test integration with other components"""
     print_test_header("Integration Points")
-    
-    # Check if handlers use the new validation
-    handler_file = "src/SledzSpecke.Application/Procedures/Handlers/AddProcedureHandler.cs"
-    if os.path.exists(handler_file):
-        with open(handler_file, 'r') as f:
-            content = f.read()
-            
-        if "_validationService" in content:
-            print_success("AddProcedureHandler integrated with validation service")
-    
-    # Check interface updates
-    interface_file = "src/SledzSpecke.Application/Abstractions/ISpecializationValidationService.cs"
-    if os.path.exists(interface_file):
-        with open(interface_file, 'r') as f:
-            content = f.read()
-            
-        if "CalculateModuleProgressAsync" in content:
-            print_success("Interface includes module progress calculation")
-
-def run_build_test():
+    return run_checks(index, INTEGRATION_CHECKS, PRINTERS)
+
+def run_build_test(build):
     """Test that the project builds successfully"""
     print_test_header("Build Test")
     
-    print_info("Running dotnet build...")
-    result = subprocess.run(["dotnet", "build"], capture_output=True, text=True)
+    print_info("Waiting for dotnet build...")
+    result = build.wait()
     
-    if result.returncode == 0:
+    if result.succeeded:
         print_success("Project builds successfully with module validation")
     else:
         print_error("Build failed")
-        print(result.stderr)
+        for error in result.errors[:20] or result.tail:
+            print(error)
+    for line in format_build_report(result):
+        print_info(line)
+    return result.succeeded
 
-def main():
+def main(build=None, index=None):
+    """Returns True when every check passed and the project builds"""
     print(f"\n{BLUE}Testing Module-Based Validation Implementation{RESET}")
     
     # Change to project directory
@@ -185,14 +155,21 @@ def main():
         print_info("Changed to SledzSpecke.WebApi directory")
     else:
         print_error("Cannot find project directory")
-        return
+        return False
+    
+    # The build is the slowest step; run the static checks while it compiles
+    if build is None:
+        build = BuildRunner().start()
     
-    # Run tests
-    test_module_validation_implementation()
-    test_module_progress_calculation()
-    test_module_specific_features()
-    test_integration_points()
-    run_build_test()
+    # Run tests; every source file is read and parsed at most once
+    if index is None:
+        index = SourceIndex("src")
+    failed = 0
+    failed += test_module_validation_implementation(index)[1]
+    failed += test_module_progress_calculation(index)[1]
+    failed += test_module_specific_features(index)[1]
+    failed += test_integration_points(index)[1]
+    built = run_build_test(build)
     
     print(f"\n{BLUE}Summary:{RESET}")
     print("✓ Module-based validation ensures procedures are tied to correct modules")
@@ -200,6 +177,13 @@ def main():
     print("✓ Procedures can only be added to the active module")
     print("✓ Module progress calculation follows MAUI formula (35/25/30/10)")
     print("✓ Procedure search is module-specific for New SMK")
+    
+    return failed == 0 and built
+
+@harness.suite("module-validation", description="Source checks for module-based validation",
+               needs_api=False, uses=("build",))
+def run_suite(fx):
+    return main(fx.build, fx.source_index)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,60 +1,73 @@
 #!/usr/bin/env python3
-import requests
+import api_client
+import auth_pool
+import harness
 import json
 from datetime import datetime, timedelta
 
 API_BASE_URL = "http://localhost:5000/api"
 
-# Get auth token
-auth_response = requests.post(
-    f"{API_BASE_URL}/sign-in",
-    json={"username": "testuser", "password": "Test123!"}
-)
-token = auth_response.json()["accessToken"]
-headers = {"Authorization": f"Bearer {token}"}
+def create_internship():
+    internship_data = {
+        "specializationId": 1,
+        "moduleId": 101,
+        "institutionName": "Test Hospital",
+        "departmentName": "Cardiology",
+        "supervisorName": "Dr. Test",
+        "startDate": datetime.utcnow().strftime('%Y-%m-%dT%H:%M:%SZ'),
+        "endDate": (datetime.utcnow() + timedelta(days=30)).strftime('%Y-%m-%dT%H:%M:%SZ')
+    }
+    
+    internship_response = api_client.post(f"{API_BASE_URL}/internships", json=internship_data)
+    internship_id = internship_response.json()
+    print(f"Created internship ID: {internship_id}")
+    return internship_id
 
-# Create internship first
-internship_data = {
-    "specializationId": 1,
-    "moduleId": 101,
-    "institutionName": "Test Hospital",
-    "departmentName": "Cardiology",
-    "supervisorName": "Dr. Test",
-    "startDate": datetime.utcnow().strftime('%Y-%m-%dT%H:%M:%SZ'),
-    "endDate": (datetime.utcnow() + timedelta(days=30)).strftime('%Y-%m-%dT%H:%M:%SZ')
-}
+def post_procedure(internship_id):
+    """Try to create procedure"""
+    procedure_data = {
+        "internshipId": internship_id,
+        "date": datetime.utcnow().strftime('%Y-%m-%dT%H:%M:%SZ'),
+        "year": datetime.now().year,
+        "code": "CARD-001",
+        "location": "Test Hospital",
+        "status": "completed",
+        "operatorCode": "OP001",
+        "performingPerson": "Dr. Test",
+        "patientInitials": "JD",
+        "patientGender": "M",
+        "supervisor": "Dr. Supervisor"  # Required for new SMK
+    }
+    
+    print("\nSending procedure data:")
+    print(json.dumps(procedure_data, indent=2))
+    
+    response = api_client.post(f"{API_BASE_URL}/procedures", json=procedure_data)
+    
+    print(f"\nStatus code: {response.status_code}")
+    print(f"Response: {response.text}")
+    return response
 
-internship_response = requests.post(
-    f"{API_BASE_URL}/internships",
-    json=internship_data,
-    headers=headers
-)
-internship_id = internship_response.json()
-print(f"Created internship ID: {internship_id}")
+@harness.suite("procedure-error", description="Reproduce the procedure creation error")
+def run_suite(fx):
+    global API_BASE_URL
+    API_BASE_URL = fx.base_url
+    fx.token
+    # The internship needs no special setup here, so the shared one will do
+    response = post_procedure(fx.internship_id)
+    if response.status_code != 201:
+        return False
+    api_client.delete(f"{API_BASE_URL}/procedures/{response.json()}")
 
-# Try to create procedure
-procedure_data = {
-    "internshipId": internship_id,
-    "date": datetime.utcnow().strftime('%Y-%m-%dT%H:%M:%SZ'),
-    "year": datetime.now().year,
-    "code": "CARD-001",
-    "location": "Test Hospital",
-    "status": "completed",
-    "operatorCode": "OP001",
-    "performingPerson": "Dr. Test",
-    "patientInitials": "JD",
-    "patientGender": "M",
-    "supervisor": "Dr. Supervisor"  # Required for new SMK
-}
+def main():
+    # Get auth token
+    auth_response = api_client.post(
+        f"{API_BASE_URL}/auth/sign-in",
+        json={"username": "testuser", "password": "Test123!"}
+    )
+    api_client.set_auth_token(auth_pool.read_access_token(auth_response.json()))
+    
+    post_procedure(create_internship())
 
-print("\nSending procedure data:")
-print(json.dumps(procedure_data, indent=2))
-
-response = requests.post(
-    f"{API_BASE_URL}/procedures",
-    json=procedure_data,
-    headers=headers
-)
-
-print(f"\nStatus code: {response.status_code}")
-print(f"Response: {response.text}")
\ No newline at end of file
+if __name__ == "__main__":
+    main()
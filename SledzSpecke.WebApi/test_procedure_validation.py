@@ -1,23 +1,32 @@
 #!/usr/bin/env python3
 """Integration tests for SMK version-specific procedure behaviors"""
 
-import requests
-import json
+import api_client
+import argparse
+import auth_pool
+import case_runner
+import harness
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 
 # API configuration
 API_URL = "http://localhost:5000/api"
 USERNAME = "testuser"
 PASSWORD = "Test123!"
+PROCEDURE_CASES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cases", "procedure_creation.json")
 
 def get_auth_token():
     """Get authentication token"""
-    response = requests.post(f"{API_URL}/auth/sign-in", json={
+    response = api_client.post(f"{API_URL}/auth/sign-in", json={
         "username": USERNAME,
         "password": PASSWORD
     })
     if response.status_code == 200:
-        return response.json()['AccessToken']
+        token = auth_pool.read_access_token(response.json())
+        api_client.set_auth_token(token)
+        return token
     else:
         print(f"Authentication failed: {response.status_code}")
         print(response.text)
@@ -25,7 +34,6 @@ def get_auth_token():
 
 def create_test_internship(token):
     """Create a test internship"""
-    headers = {"Authorization": f"Bearer {token}"}
     internship_data = {
         "startDate": datetime.now(timezone.utc).isoformat(),
         "endDate": (datetime.now(timezone.utc) + timedelta(days=30)).isoformat(),
@@ -39,7 +47,7 @@ def create_test_internship(token):
         "institutionName": "Test Medical Institution"
     }
     
-    response = requests.post(f"{API_URL}/internships", json=internship_data, headers=headers)
+    response = api_client.post(f"{API_URL}/internships", json=internship_data)
     if response.status_code == 201:
         return response.json()
     else:
@@ -47,135 +55,62 @@ def create_test_internship(token):
         print(response.text)
         return None
 
-def test_procedure_creation_variations(token, internship_id):
-    """Test different procedure creation scenarios"""
+def test_procedure_creation_variations(token, internship_id, case_file=PROCEDURE_CASES,
+                                       threads=16, processes=0):
+    """Test different procedure creation scenarios from the case file.
+
+    Returns the ids of the explicit cases' procedures, the ids of every procedure
+    created, and whether every case passed.
+    """
     print("\n=== Testing Procedure Creation Variations ===")
     
-    headers = {"Authorization": f"Bearer {token}"}
-    test_cases = []
+    spec = case_runner.load_case_file(case_file)
+    cases = case_runner.build_cases(spec, {"internship_id": internship_id})
+    explicit = len(spec.get("cases", []))
+    print(f"Running {len(cases)} cases ({explicit} explicit, {len(cases) - explicit} from matrices)")
     
-    # Test case 1: Basic procedure with minimum fields
-    test_cases.append({
-        "name": "Minimal Procedure",
-        "data": {
-            "internshipId": internship_id,
-            "date": datetime.now(timezone.utc).isoformat(),
-            "year": 1,
-            "code": "MIN001",
-            "location": "Hospital",
-            "status": "Pending"
-        },
-        "expect_success": True
-    })
+    start = time.perf_counter()
+    results = case_runner.run_cases(API_URL, cases, threads=threads, processes=processes, token=token)
+    elapsed = time.perf_counter() - start
     
-    # Test case 2: Old SMK style procedure
-    test_cases.append({
-        "name": "Old SMK Style Procedure",
-        "data": {
-            "internshipId": internship_id,
-            "date": datetime.now(timezone.utc).isoformat(),
-            "year": 2,
-            "code": "OLD001",
-            "location": "Old Hospital",
-            "status": "Completed",
-            "operatorCode": "A",
-            "performingPerson": "Dr. Old",
-            "patientInitials": "JD",
-            "patientGender": "M",
-            "procedureRequirementId": 1,
-            "procedureGroup": "Cardiac",
-            "assistantData": "Assistant info",
-            "internshipName": "Old SMK Internship"
-        },
-        "expect_success": True
-    })
-    
-    # Test case 3: New SMK style procedure
-    test_cases.append({
-        "name": "New SMK Style Procedure",
-        "data": {
-            "internshipId": internship_id,
-            "date": datetime.now(timezone.utc).isoformat(),
-            "year": 1,
-            "code": "NEW001",
-            "location": "New Hospital",
-            "status": "Pending",
-            "moduleId": 1,
-            "procedureName": "Advanced Procedure",
-            "countA": 3,
-            "countB": 2,
-            "supervisor": "Prof. New",
-            "institution": "Medical Center",
-            "comments": "Multiple procedures"
-        },
-        "expect_success": True
-    })
-    
-    # Test case 4: Mixed fields (both Old and New SMK)
-    test_cases.append({
-        "name": "Mixed SMK Fields",
-        "data": {
-            "internshipId": internship_id,
-            "date": datetime.now(timezone.utc).isoformat(),
-            "year": 1,
-            "code": "MIX001",
-            "location": "Mixed Hospital",
-            "status": "Pending",
-            # Old SMK fields
-            "operatorCode": "B",
-            "procedureGroup": "Surgery",
-            # New SMK fields
-            "countA": 1,
-            "countB": 1,
-            "moduleId": 1
-        },
-        "expect_success": True  # Should succeed as API accepts both
-    })
-    
-    # Test case 5: Future date (should succeed now)
-    test_cases.append({
-        "name": "Future Date Procedure",
-        "data": {
-            "internshipId": internship_id,
-            "date": (datetime.now(timezone.utc) + timedelta(days=90)).isoformat(),
-            "year": 1,
-            "code": "FUT001",
-            "location": "Future Hospital",
-            "status": "Pending"
-        },
-        "expect_success": True
-    })
-    
-    # Run test cases
-    results = []
-    for test_case in test_cases:
-        print(f"\nTesting: {test_case['name']}")
-        response = requests.post(f"{API_URL}/procedures", json=test_case['data'], headers=headers)
-        
-        success = response.status_code == 201
-        expected = test_case['expect_success']
-        
-        if success == expected:
-            print(f"✅ PASS: Got expected result (success={success})")
-            if success:
-                procedure_id = response.json()
-                print(f"   Created procedure ID: {procedure_id}")
-                results.append(procedure_id)
+    # Explicit cases are reported one by one, expanded ones only when they fail
+    procedure_ids = []
+    created = [result.body for result in results
+               if result.passed and result.status == 201 and isinstance(result.body, int)]
+    for index, result in enumerate(results):
+        if index < explicit:
+            print(f"\nTesting: {result.name}")
+        if result.passed:
+            if index < explicit:
+                print(f"✅ PASS: Got expected result (status={result.status})")
+                print(f"   Created procedure ID: {result.body}")
+                procedure_ids.append(result.body)
         else:
-            print(f"❌ FAIL: Expected success={expected}, got success={success}")
-            print(f"   Status: {response.status_code}")
-            print(f"   Response: {response.text}")
+            print(f"❌ FAIL: {result.name}")
+            print(f"   {result.message}")
     
-    return results
+    passed = sum(1 for result in results if result.passed)
+    print(f"\n{passed}/{len(results)} cases passed in {elapsed:.1f}s "
+          f"({len(results) / elapsed if elapsed > 0 else 0:.0f} cases/s)")
+    return procedure_ids, created, passed == len(results)
+
+def delete_procedures(procedure_ids, threads=16):
+    """Remove the procedures the cases created from the shared test user"""
+    if not procedure_ids:
+        return
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        statuses = list(executor.map(
+            lambda proc_id: api_client.delete(f"{API_URL}/procedures/{proc_id}").status_code, procedure_ids))
+    failed = sum(1 for status in statuses if status not in (200, 204))
+    print(f"\nDeleted {len(procedure_ids) - failed}/{len(procedure_ids)} created procedures")
 
 def test_procedure_retrieval(token, procedure_ids):
     """Test retrieving procedures and verify fields are preserved"""
     print("\n=== Testing Procedure Retrieval ===")
     
-    headers = {"Authorization": f"Bearer {token}"}
-    
+    ok = True
     for proc_id in procedure_ids[:3]:  # Test first 3 procedures
-        response = requests.get(f"{API_URL}/procedures/{proc_id}", headers=headers)
+        response = api_client.get(f"{API_URL}/procedures/{proc_id}")
         if response.status_code == 200:
             data = response.json()
             print(f"\nProcedure {proc_id}:")
@@ -198,14 +133,15 @@ def test_procedure_retrieval(token, procedure_ids):
                 print(f"  [New SMK] ModuleId: {data.get('ModuleId')}")
         else:
             print(f"❌ Failed to retrieve procedure {proc_id}: {response.status_code}")
+            ok = False
+    return ok
 
 def test_medical_shift_behaviors(token, internship_id):
     """Test medical shift creation and statistics"""
     print("\n=== Testing Medical Shift Behaviors ===")
     
-    headers = {"Authorization": f"Bearer {token}"}
-    
     # Create shifts for different years
+    ok = True
     shifts_created = []
     for year in [1, 2, 3]:
         shift_data = {
@@ -217,30 +153,34 @@ def test_medical_shift_behaviors(token, internship_id):
             "year": year
         }
         
-        response = requests.post(f"{API_URL}/medicalshifts", json=shift_data, headers=headers)
+        response = api_client.post(f"{API_URL}/medicalshifts", json=shift_data)
         if response.status_code == 201:
             shift_id = response.json()
             shifts_created.append((shift_id, year))
             print(f"✅ Created medical shift for year {year}, ID: {shift_id}")
         else:
             print(f"❌ Failed to create shift for year {year}: {response.text}")
+            ok = False
     
     # Test year-based statistics
     print("\nTesting year-based statistics:")
     for year in [1, 2, 3]:
-        response = requests.get(f"{API_URL}/medicalshifts/statistics?year={year}", headers=headers)
+        response = api_client.get(f"{API_URL}/medicalshifts/statistics?year={year}")
         if response.status_code == 200:
             stats = response.json()
             print(f"  Year {year}: {stats['TotalHours']}h {stats['TotalMinutes']}m")
+        else:
+            print(f"❌ Failed to get statistics for year {year}: {response.status_code}")
+            ok = False
+    return ok
 
 def test_statistics_endpoints(token):
     """Test statistics endpoints work correctly"""
     print("\n=== Testing Statistics Endpoints ===")
     
-    headers = {"Authorization": f"Bearer {token}"}
-    
+    ok = True
     # Test procedure statistics
-    response = requests.get(f"{API_URL}/procedures/statistics", headers=headers)
+    response = api_client.get(f"{API_URL}/procedures/statistics")
     if response.status_code == 200:
         stats = response.json()
         print(f"✅ Procedure statistics:")
@@ -248,9 +188,10 @@ def test_statistics_endpoints(token):
         print(f"   Remaining: A={stats['RemainingCountA']}, B={stats['RemainingCountB']}")
     else:
         print(f"❌ Failed to get procedure statistics: {response.status_code}")
+        ok = False
     
     # Test medical shift statistics
-    response = requests.get(f"{API_URL}/medicalshifts/statistics", headers=headers)
+    response = api_client.get(f"{API_URL}/medicalshifts/statistics")
     if response.status_code == 200:
         stats = response.json()
         print(f"✅ Medical shift statistics:")
@@ -258,8 +199,30 @@ def test_statistics_endpoints(token):
         print(f"   Approved: {stats['ApprovedHours']}h {stats['ApprovedMinutes']}m")
     else:
         print(f"❌ Failed to get medical shift statistics: {response.status_code}")
+        ok = False
+    return ok
+
+@harness.suite("procedure-validation", description="SMK version-specific procedure behaviors")
+def run_suite(fx):
+    global API_URL
+    API_URL = fx.base_url
+    procedure_ids, created, cases_ok = test_procedure_creation_variations(fx.token, fx.internship_id)
+    try:
+        retrieval_ok = test_procedure_retrieval(fx.token, procedure_ids)
+    finally:
+        delete_procedures(created)
+    shifts_ok = test_medical_shift_behaviors(fx.token, fx.internship_id)
+    statistics_ok = test_statistics_endpoints(fx.token)
+    return cases_ok and retrieval_ok and shifts_ok and statistics_ok
 
 def main():
+    parser = argparse.ArgumentParser(description="SledzSpecke SMK procedure validation tests")
+    parser.add_argument("--cases", default=PROCEDURE_CASES, help="Procedure case file (JSON or YAML)")
+    parser.add_argument("--threads", type=int, default=16, help="Concurrent requests per process")
+    parser.add_argument("--processes", type=int, default=0,
+                        help="Worker processes for large case sets (0 = auto, 1 = no sharding)")
+    args = parser.parse_args()
+    
     print("=" * 60)
     print("SledzSpecke Web API Integration Tests")
     print("Testing SMK Version-Specific Behaviors")
@@ -282,8 +245,12 @@ def main():
     print(f"✅ Created test internship ID: {internship_id}")
     
     # Run tests
-    procedure_ids = test_procedure_creation_variations(token, internship_id)
-    test_procedure_retrieval(token, procedure_ids)
+    procedure_ids, created, _ = test_procedure_creation_variations(token, internship_id, args.cases,
+                                                                   args.threads, args.processes)
+    try:
+        test_procedure_retrieval(token, procedure_ids)
+    finally:
+        delete_procedures(created, args.threads)
     test_medical_shift_behaviors(token, internship_id)
     test_statistics_endpoints(token)
     
@@ -1,25 +1,13 @@
 #!/usr/bin/env python3
-import requests
+import api_client
+import auth_pool
+import harness
 import json
 from datetime import datetime, timedelta
 
 API_BASE_URL = "http://localhost:5000/api"
 
-# Test sign-in
-signin_response = requests.post(
-    f"{API_BASE_URL}/auth/sign-in",
-    json={"username": "testuser", "password": "Test123!"}
-)
-
-print(f"Sign-in status: {signin_response.status_code}")
-print(f"Response: {signin_response.json()}")
-if signin_response.status_code == 200:
-    token = signin_response.json()["AccessToken"]
-    print(f"Token received: {token[:50]}...")
-    
-    headers = {"Authorization": f"Bearer {token}"}
-    
-    # Create internship
+def create_internship():
     internship_data = {
         "specializationId": 1,
         "moduleId": 101,
@@ -30,65 +18,87 @@ if signin_response.status_code == 200:
         "endDate": (datetime.utcnow() + timedelta(days=30)).strftime('%Y-%m-%dT%H:%M:%SZ')
     }
     
-    internship_response = requests.post(
-        f"{API_BASE_URL}/internships",
-        json=internship_data,
-        headers=headers
-    )
+    internship_response = api_client.post(f"{API_BASE_URL}/internships", json=internship_data)
     print(f"\nInternship creation status: {internship_response.status_code}")
     
     if internship_response.status_code in [200, 201]:
         internship_id = internship_response.json()
         print(f"Internship ID: {internship_id}")
+        return internship_id
+    return None
+
+def create_procedure_and_shift(internship_id):
+    """Create a procedure and a medical shift; True when both were accepted"""
+    # Create procedure
+    # Use a date within the internship period (5 days after start)
+    procedure_date = datetime.utcnow() + timedelta(days=5)
+    procedure_data = {
+        "internshipId": internship_id,
+        "date": procedure_date.strftime('%Y-%m-%dT%H:%M:%SZ'),
+        "year": 1,
+        "code": "P001",
+        "location": "Test Hospital",
+        "status": "Pending",
+        "operatorCode": "OP001",
+        "performingPerson": "Dr. Test",
+        "patientInitials": "JD",
+        "patientGender": "M"
+    }
+    
+    procedure_response = api_client.post(f"{API_BASE_URL}/procedures", json=procedure_data)
+    print(f"\nProcedure creation status: {procedure_response.status_code}")
+    if procedure_response.status_code not in [200, 201]:
+        print(f"Error: {procedure_response.text}")
+    else:
+        print(f"Procedure ID: {procedure_response.json()}")
         
-        # Create procedure
-        # Use a date within the internship period (5 days after start)
-        procedure_date = datetime.utcnow() + timedelta(days=5)
-        procedure_data = {
-            "internshipId": internship_id,
-            "date": procedure_date.strftime('%Y-%m-%dT%H:%M:%SZ'),
-            "year": 1,
-            "code": "P001",
-            "location": "Test Hospital",
-            "status": "Pending",
-            "operatorCode": "OP001",
-            "performingPerson": "Dr. Test",
-            "patientInitials": "JD",
-            "patientGender": "M"
-        }
-        
-        procedure_response = requests.post(
-            f"{API_BASE_URL}/procedures",
-            json=procedure_data,
-            headers=headers
-        )
-        print(f"\nProcedure creation status: {procedure_response.status_code}")
-        if procedure_response.status_code not in [200, 201]:
-            print(f"Error: {procedure_response.text}")
-        else:
-            print(f"Procedure ID: {procedure_response.json()}")
-            
-        # Create medical shift
-        # Use a date within the internship period (7 days after start)
-        shift_date = datetime.utcnow() + timedelta(days=7)
-        shift_data = {
-            "internshipId": internship_id,
-            "date": shift_date.strftime('%Y-%m-%dT%H:%M:%SZ'),
-            "hours": 8,
-            "minutes": 30,
-            "location": "Emergency Department",
-            "year": 1
-        }
+    # Create medical shift
+    # Use a date within the internship period (7 days after start)
+    shift_date = datetime.utcnow() + timedelta(days=7)
+    shift_data = {
+        "internshipId": internship_id,
+        "date": shift_date.strftime('%Y-%m-%dT%H:%M:%SZ'),
+        "hours": 8,
+        "minutes": 30,
+        "location": "Emergency Department",
+        "year": 1
+    }
+    
+    shift_response = api_client.post(f"{API_BASE_URL}/medicalshifts", json=shift_data)
+    print(f"\nMedical shift creation status: {shift_response.status_code}")
+    if shift_response.status_code not in [200, 201]:
+        print(f"Error: {shift_response.text}")
+    else:
+        print(f"Medical shift ID: {shift_response.json()}")
+    
+    return procedure_response.status_code in [200, 201] and shift_response.status_code in [200, 201]
+
+@harness.suite("simple", description="Create a procedure and a medical shift")
+def run_suite(fx):
+    global API_BASE_URL
+    API_BASE_URL = fx.base_url
+    fx.token
+    return create_procedure_and_shift(fx.internship_id)
+
+def main():
+    # Test sign-in
+    signin_response = api_client.post(
+        f"{API_BASE_URL}/auth/sign-in",
+        json={"username": "testuser", "password": "Test123!"}
+    )
+    
+    print(f"Sign-in status: {signin_response.status_code}")
+    print(f"Response: {signin_response.json()}")
+    if signin_response.status_code == 200:
+        token = auth_pool.read_access_token(signin_response.json())
+        print(f"Token received: {token[:50]}...")
+        api_client.set_auth_token(token)
         
-        shift_response = requests.post(
-            f"{API_BASE_URL}/medicalshifts",
-            json=shift_data,
-            headers=headers
-        )
-        print(f"\nMedical shift creation status: {shift_response.status_code}")
-        if shift_response.status_code not in [200, 201]:
-            print(f"Error: {shift_response.text}")
-        else:
-            print(f"Medical shift ID: {shift_response.json()}")
-else:
-    print(f"Sign-in failed: {signin_response.text}")
\ No newline at end of file
+        internship_id = create_internship()
+        if internship_id is not None:
+            create_procedure_and_shift(internship_id)
+    else:
+        print(f"Sign-in failed: {signin_response.text}")
+
+if __name__ == "__main__":
+    main()
@@ -2,12 +2,13 @@
 """Test script for specialized SMK entities (ProcedureOldSmk, ProcedureNewSmk)"""
 
 import json
-import requests
+import api_client
+import auth_pool
+import harness
 import sys
 from datetime import datetime, timedelta
 
 BASE_URL = "http://localhost:5000/api"
-AUTH_HEADERS = {}
 
 def login():
     """Login and get auth token"""
@@ -16,10 +17,10 @@ def login():
         "password": "Test123!"
     }
     
-    response = requests.post(f"{BASE_URL}/auth/sign-in", json=login_data)
+    response = api_client.post(f"{BASE_URL}/auth/sign-in", json=login_data)
     if response.status_code == 200:
-        token = response.json()["AccessToken"]
-        AUTH_HEADERS["Authorization"] = f"Bearer {token}"
+        token = auth_pool.read_access_token(response.json())
+        api_client.set_auth_token(token)
         print("✓ Login successful")
         return True
     else:
@@ -29,7 +30,7 @@ def login():
 
 def get_specialization_info():
     """Get current user's specialization info"""
-    response = requests.get(f"{BASE_URL}/specializations/current", headers=AUTH_HEADERS)
+    response = api_client.get(f"{BASE_URL}/specializations/current")
     if response.status_code == 200:
         return response.json()
     return None
@@ -67,13 +68,13 @@ def test_old_smk_procedures():
         "internshipName": "Cardiology Rotation"
     }
     
-    response = requests.post(f"{BASE_URL}/procedures", json=procedure_data, headers=AUTH_HEADERS)
+    response = api_client.post(f"{BASE_URL}/procedures", json=procedure_data)
     if response.status_code == 200:
         print("✓ Created Old SMK procedure with specific fields")
         procedure_id = response.json()["id"]
         
         # Verify the procedure has Old SMK fields
-        response = requests.get(f"{BASE_URL}/procedures/{procedure_id}", headers=AUTH_HEADERS)
+        response = api_client.get(f"{BASE_URL}/procedures/{procedure_id}")
         if response.status_code == 200:
             procedure = response.json()
             
@@ -101,7 +102,7 @@ def test_old_smk_procedures():
     invalid_procedure = procedure_data.copy()
     invalid_procedure["operatorCode"] = "C"  # Invalid for Old SMK
     
-    response = requests.post(f"{BASE_URL}/procedures", json=invalid_procedure, headers=AUTH_HEADERS)
+    response = api_client.post(f"{BASE_URL}/procedures", json=invalid_procedure)
     if response.status_code == 400:
         print("✓ Correctly rejected invalid operator code 'C' for Old SMK")
     else:
@@ -149,13 +150,13 @@ def test_new_smk_procedures():
         "comments": "Multiple procedures performed during shift"
     }
     
-    response = requests.post(f"{BASE_URL}/procedures", json=procedure_data, headers=AUTH_HEADERS)
+    response = api_client.post(f"{BASE_URL}/procedures", json=procedure_data)
     if response.status_code == 200:
         print("✓ Created New SMK procedure with aggregated counts")
         procedure_id = response.json()["id"]
         
         # Verify the procedure has New SMK fields
-        response = requests.get(f"{BASE_URL}/procedures/{procedure_id}", headers=AUTH_HEADERS)
+        response = api_client.get(f"{BASE_URL}/procedures/{procedure_id}")
         if response.status_code == 200:
             procedure = response.json()
             
@@ -189,7 +190,7 @@ def test_new_smk_procedures():
     invalid_procedure["countA"] = 0
     invalid_procedure["countB"] = 0
     
-    response = requests.post(f"{BASE_URL}/procedures", json=invalid_procedure, headers=AUTH_HEADERS)
+    response = api_client.post(f"{BASE_URL}/procedures", json=invalid_procedure)
     if response.status_code == 400:
         print("✓ Correctly rejected procedure with zero counts")
     else:
@@ -201,8 +202,8 @@ def test_new_smk_procedures():
             "countA": 8,
             "countB": 5
         }
-        response = requests.put(f"{BASE_URL}/procedures/{procedure_id}/counts", 
-                              json=update_data, headers=AUTH_HEADERS)
+        response = api_client.put(f"{BASE_URL}/procedures/{procedure_id}/counts", 
+                              json=update_data)
         if response.status_code == 200:
             print("✓ Successfully updated procedure counts")
         else:
@@ -234,7 +235,7 @@ def test_smk_version_validation():
             "moduleId": 1  # New SMK field
         }
         
-        response = requests.post(f"{BASE_URL}/procedures", json=procedure_data, headers=AUTH_HEADERS)
+        response = api_client.post(f"{BASE_URL}/procedures", json=procedure_data)
         if response.status_code == 400:
             print("✓ Correctly rejected New SMK fields for Old SMK user")
         else:
@@ -252,7 +253,7 @@ def test_smk_version_validation():
             "patientInitials": "JD"  # Old SMK tracks individual patients
         }
         
-        response = requests.post(f"{BASE_URL}/procedures", json=procedure_data, headers=AUTH_HEADERS)
+        response = api_client.post(f"{BASE_URL}/procedures", json=procedure_data)
         if response.status_code == 400:
             print("✓ Correctly rejected Old SMK fields for New SMK user")
         else:
@@ -260,6 +261,20 @@ def test_smk_version_validation():
     
     return True
 
+def run_tests():
+    all_passed = True
+    all_passed &= test_old_smk_procedures()
+    all_passed &= test_new_smk_procedures()
+    all_passed &= test_smk_version_validation()
+    return all_passed
+
+@harness.suite("smk-entities", description="Old/New SMK specific procedure fields")
+def run_suite(fx):
+    global BASE_URL
+    BASE_URL = fx.base_url
+    fx.token
+    return run_tests()
+
 def main():
     """Run all SMK entity tests"""
     print("Starting SMK entity tests...")
@@ -268,12 +283,8 @@ def main():
         print("\nFailed to authenticate. Exiting.")
         sys.exit(1)
     
-    all_passed = True
-    
     # Run tests
-    all_passed &= test_old_smk_procedures()
-    all_passed &= test_new_smk_procedures()
-    all_passed &= test_smk_version_validation()
+    all_passed = run_tests()
     
     if all_passed:
         print("\n✅ All SMK entity tests passed!")
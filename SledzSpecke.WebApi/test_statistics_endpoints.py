@@ -1,7 +1,13 @@
 #!/usr/bin/env python3
-import requests
+import api_client
+import argparse
+import auth_pool
+import harness
 import json
 import sys
+import time
+from harness import budgets
+from statistics_oracle import SKIPPED, StatisticsOracle
 from datetime import datetime, timezone
 
 # Configuration
@@ -9,9 +15,13 @@ BASE_URL = "http://localhost:5000/api"
 USERNAME = "testuser"
 PASSWORD = "Test123!"
 
+# Timings of the statistics endpoints are checked against harness/budgets.py;
+# the tracker listens to api_client only while this suite runs
+budget_tracker = budgets.BudgetTracker()
+
 def authenticate():
     """Authenticate and get JWT token"""
-    response = requests.post(f"{BASE_URL}/auth/sign-in", json={
+    response = api_client.post(f"{BASE_URL}/auth/sign-in", json={
         "username": USERNAME,
         "password": PASSWORD
     })
@@ -21,15 +31,16 @@ def authenticate():
         print(response.text)
         sys.exit(1)
     
-    token = response.json()["AccessToken"]
-    return {"Authorization": f"Bearer {token}"}
+    token = auth_pool.read_access_token(response.json())
+    api_client.set_auth_token(token)
+    return token
 
-def test_procedure_statistics(headers):
+def test_procedure_statistics():
     """Test procedure statistics endpoint"""
     print("\n📊 Testing Procedure Statistics Endpoint")
     
     # Test without filters
-    response = requests.get(f"{BASE_URL}/procedures/statistics", headers=headers)
+    response = api_client.get(f"{BASE_URL}/procedures/statistics")
     if response.status_code == 200:
         stats = response.json()
         print(f"✅ GET /procedures/statistics - Success")
@@ -45,7 +56,7 @@ def test_procedure_statistics(headers):
         print(response.text)
     
     # Test with module filter
-    response = requests.get(f"{BASE_URL}/procedures/statistics?moduleId=101", headers=headers)
+    response = api_client.get(f"{BASE_URL}/procedures/statistics?moduleId=101")
     if response.status_code == 200:
         stats = response.json()
         print(f"\n✅ GET /procedures/statistics?moduleId=101 - Success")
@@ -53,12 +64,12 @@ def test_procedure_statistics(headers):
     else:
         print(f"❌ GET /procedures/statistics?moduleId=101 failed: {response.status_code}")
 
-def test_medical_shift_statistics(headers):
+def test_medical_shift_statistics():
     """Test medical shift statistics endpoint"""
     print("\n📊 Testing Medical Shift Statistics Endpoint")
     
     # Test without filters
-    response = requests.get(f"{BASE_URL}/medicalshifts/statistics", headers=headers)
+    response = api_client.get(f"{BASE_URL}/medicalshifts/statistics")
     if response.status_code == 200:
         stats = response.json()
         print(f"✅ GET /medical-shifts/statistics - Success")
@@ -71,7 +82,7 @@ def test_medical_shift_statistics(headers):
         print(response.text)
     
     # Test with year filter (for Old SMK)
-    response = requests.get(f"{BASE_URL}/medicalshifts/statistics?year=1", headers=headers)
+    response = api_client.get(f"{BASE_URL}/medicalshifts/statistics?year=1")
     if response.status_code == 200:
         stats = response.json()
         print(f"\n✅ GET /medical-shifts/statistics?year=1 - Success")
@@ -79,12 +90,12 @@ def test_medical_shift_statistics(headers):
     else:
         print(f"❌ GET /medical-shifts/statistics?year=1 failed: {response.status_code}")
 
-def create_test_data(headers):
+def create_test_data():
     """Create some test procedures and medical shifts"""
     print("\n🔧 Creating test data...")
     
     # Get user's internships first
-    response = requests.get(f"{BASE_URL}/internships", headers=headers)
+    response = api_client.get(f"{BASE_URL}/internships")
     if response.status_code != 200:
         print("❌ Failed to get internships")
         return
@@ -117,7 +128,7 @@ def create_test_data(headers):
         "comments": "Test comment"
     }
     
-    response = requests.post(f"{BASE_URL}/procedures", json=procedure_data, headers=headers)
+    response = api_client.post(f"{BASE_URL}/procedures", json=procedure_data)
     if response.status_code == 201:
         print("✅ Created test procedure")
     else:
@@ -134,29 +145,97 @@ def create_test_data(headers):
         "year": 1
     }
     
-    response = requests.post(f"{BASE_URL}/medical-shifts", json=shift_data, headers=headers)
+    response = api_client.post(f"{BASE_URL}/medical-shifts", json=shift_data)
     if response.status_code == 201:
         print("✅ Created test medical shift")
     else:
         print(f"❌ Failed to create medical shift: {response.status_code}")
         print(response.text)
 
+def verify_statistics(max_filters=None):
+    """Recompute the medical shift statistics from the user's shifts and compare every filter"""
+    print("\n🔍 Verifying statistics against the user's records")
+    start = time.perf_counter()
+    try:
+        oracle = StatisticsOracle.fetch(BASE_URL)
+    except RuntimeError as e:
+        print(f"❌ Cannot load records: {e}")
+        return False
+    print(f"   {oracle.shift_count} shifts recomputed in {time.perf_counter() - start:.2f}s")
+    for endpoint, reason in SKIPPED.items():
+        print(f"ℹ️  {endpoint} not verified: {reason}")
+    
+    filters = oracle.filters(max_filters)
+    mismatches = oracle.verify(BASE_URL, limit=max_filters)
+    for mismatch in mismatches[:20]:
+        print(f"❌ {mismatch}")
+    if len(mismatches) > 20:
+        print(f"   ... and {len(mismatches) - 20} more")
+    if not mismatches:
+        print(f"✅ All {len(filters)} statistics filters match")
+    return not mismatches
+
+def check_latency_budgets(mode="enforce"):
+    """Repeat the statistics requests past warm-up, then check their budgets"""
+    if mode == "off":
+        return True
+    print("\n⏱️  Checking latency budgets")
+    budget_tracker.top_up(f"{BASE_URL}/medicalshifts/statistics")
+    
+    results = budget_tracker.check(mode)
+    for result in results:
+        icon = {"passed": "✅", "warned": "⚠️", "failed": "❌"}.get(result.status, "ℹ️")
+        print(f"{icon} {result}")
+    return budgets.budgets_passed(results)
+
+@harness.suite("statistics", description="Procedure and medical shift statistics endpoints")
+def run_suite(fx):
+    global BASE_URL
+    BASE_URL = fx.base_url
+    fx.internship_id  # create_test_data() posts to the user's first internship
+    api_client.add_listener(budget_tracker.observe)
+    try:
+        create_test_data()
+        test_procedure_statistics()
+        test_medical_shift_statistics()
+        statistics_ok = verify_statistics()
+        return check_latency_budgets() and statistics_ok
+    finally:
+        api_client.remove_listener(budget_tracker.observe)
+
 def main():
+    parser = argparse.ArgumentParser(description="Test the statistics endpoints")
+    parser.add_argument("--budgets", choices=budgets.MODES, default="enforce",
+                        help="Latency budgets: fail on exceeded budgets, only warn, or skip them")
+    parser.add_argument("--max-filters", type=int,
+                        help="Verify at most this many statistics filters (default: all)")
+    args = parser.parse_args()
+    
     print("🧪 Testing Statistics Endpoints")
     print("=" * 50)
     
+    api_client.add_listener(budget_tracker.observe)
+    
     # Authenticate
-    headers = authenticate()
+    authenticate()
     print("✅ Authentication successful")
     
     # Create test data
-    create_test_data(headers)
+    create_test_data()
     
     # Test statistics endpoints
-    test_procedure_statistics(headers)
-    test_medical_shift_statistics(headers)
+    test_procedure_statistics()
+    test_medical_shift_statistics()
+    
+    # Check the numbers against the raw records
+    statistics_ok = verify_statistics(args.max_filters)
+    
+    # Check response-time budgets
+    budgets_ok = check_latency_budgets(args.budgets)
     
     print("\n✨ Statistics endpoint testing completed!")
+    if not (budgets_ok and statistics_ok):
+        sys.exit(1)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
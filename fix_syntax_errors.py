@@ -1,74 +1,363 @@
 #!/usr/bin/env python3
+"""
+Fix common syntax errors left in C# files by bulk edits.
 
+    python3 fix_syntax_errors.py --dry-run path/to/Project ...   # review first
+    python3 fix_syntax_errors.py --jobs 8 path/to/Project ...
+
+The roots are required: the rules also match valid code (e.g. `Foo();`
+records), so only point the script at trees known to need them.
+
+With --jobs N, files are sent to N worker processes in chunks.
+
+Files are remembered in .fix_syntax_cache.json with their mtime, size and
+content hash; later runs skip them after a stat() as long as they are
+unchanged and the rules are the same (RULESET_VERSION).
+
+--dry-run streams a unified diff per file (headed by its rule hits) and
+writes nothing. Real runs replace files atomically.
+"""
+
+import argparse
+import difflib
+import hashlib
+import json
 import os
 import re
 import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from collections import Counter
+from typing import Dict, List, NamedTuple, Optional, Pattern, Tuple
+
+DEFAULT_CHUNK_SIZE = 64
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".fix_syntax_cache.json")
+
+# (mtime_ns, size, content hash) of a file as last seen
+FileState = Tuple[int, int, str]
+
+class FileResult(NamedTuple):
+    path: str
+    changed: bool
+    seconds: float
+    error: Optional[str]
+    hits: Dict[str, int]
+    state: Optional[FileState]  # after fixing; None when the file couldn't be read
+    diff: Optional[str] = None  # unified diff, only with --dry-run
+
+class Rule:
+    """A rewrite: `pattern` is replaced by the m.expand()-style `template`.
+
+    Patterns must start with a literal character - the combined scanner
+    then jumps straight to candidate characters instead of trying every
+    rule at every offset. Capture groups must be named; `multiline` scopes
+    re.MULTILINE to this rule only, so $ keeps its end-of-file meaning in
+    the other rules.
+    """
+
+    def __init__(self, name: str, pattern: str, template: str, multiline: bool = False):
+        self.name = name
+        self.pattern = pattern
+        self.template = template
+        self.multiline = multiline
+
+# Earlier rules win when several match at the same position.
+RULES = [
+    # "No newline at end of file" patterns pasted from diffs
+    Rule("no_newline_pair", r'}\s*No newline at end of file\s*}\s*No newline at end of file', '}'),
+    Rule("no_newline", r'No newline at end of file', ''),
+    # Extra closing braces at the end of files
+    Rule("trailing_braces", r'}\s*}\s*$', '}'),
+    # Semicolons after closing braces
+    Rule("brace_semicolon", r'\};\s*$', '}', multiline=True),
+    # Double closing parentheses ))
+    Rule("double_paren", r'\)\)', ')'),
+    # Lines ending with ), that should just be )
+    Rule("paren_comma_eol", r'\),\s*$', ')', multiline=True),
+    # Method calls ending with just (
+    Rule("method_open_paren_eol", r'\.(?P<method>\w+)\($\s*(?=\n)', r'.\g<method>();', multiline=True),
+    # Other lines ending with (
+    Rule("open_paren_eol", r'\($\s*(?=\n)', '();', multiline=True),
+    # Missing semicolons on variable declarations that end with )
+    Rule("new_generic_semicolon", r'= new (?P<type>\w+<[^>]+>)\(\)\s*$', r'= new \g<type>();', multiline=True),
+    # Incomplete lambda expressions
+    Rule("lambda_paren_eol", r'=>\)\s*$', '=>', multiline=True),
+    # Double commas in argument lists
+    Rule("double_comma", r',\s*,', ','),
+]
+
+def _prefixed(rule: Rule, text: str) -> str:
+    """Give the rule's group names a unique prefix inside the combined pattern"""
+    text = re.sub(r'\(\?P<(\w+)>', rf'(?P<{rule.name}__\1>', text)
+    return re.sub(r'\\g<(\w+)>', rf'\\g<{rule.name}__\1>', text)
+
+_LEADING_LITERAL = re.compile(r"\\[^\w]|[^\\.^$*+?{[\]|()]")
 
-def fix_file(filepath):
-    """Fix common syntax errors in a C# file"""
+def compile_rules(rules: List[Rule]) -> Tuple[Pattern[str], Dict[str, str]]:
+    """One alternation of all rules, so a file is rewritten in a single scan.
+
+    Each alternative is `<first char>(?P<rule name>rest)`: with a literal
+    leading every branch, the regex engine skips ahead to the next candidate
+    character in C, and match.lastgroup names the rule that matched.
+    """
+    alternatives = []
+    for rule in rules:
+        leading = _LEADING_LITERAL.match(rule.pattern)
+        if not leading:
+            raise ValueError(f"Rule {rule.name}: pattern must start with a literal character")
+        rest = _prefixed(rule, rule.pattern[leading.end():])
+        if rule.multiline:
+            rest = f"(?m:{rest})"
+        alternatives.append(f"{leading.group()}(?P<{rule.name}>{rest})")
+    templates = {rule.name: _prefixed(rule, rule.template) for rule in rules}
+    return re.compile("|".join(alternatives)), templates
+
+SCANNER, TEMPLATES = compile_rules(RULES)
+
+# Cached results are only valid for the rule set that produced them
+RULESET_VERSION = hashlib.sha256(json.dumps(
+    [SCANNER.pattern, [(rule.name, rule.template) for rule in RULES]]).encode()).hexdigest()[:16]
+
+def _replacer(templates, hits: Optional[Counter]):
+    def replace(match):
+        # The rule's group encloses its named captures, so it closes last
+        name = match.lastgroup
+        if hits is not None:
+            hits[name] += 1
+        return match.expand(templates[name])
+    return replace
+
+def rewrite(content: str, hits: Optional[Counter] = None) -> str:
+    """Apply all rules in one left-to-right pass, counting hits per rule.
+
+    Replaced text is never rescanned, so one rule can't undo or re-trigger
+    another the way sequential re.sub passes did.
+    """
+    return SCANNER.sub(_replacer(TEMPLATES, hits), content)
+
+def content_hash(data) -> str:
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+def atomic_write(filepath: str, data: bytes):
+    """Replace the file via temp file + rename, keeping its permissions.
+
+    An interrupted run leaves either the old or the new file, never half
+    of one.
+    """
+    directory = os.path.dirname(filepath)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".fix-", suffix=".tmp")
     try:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        original_content = content
-        
-        # Fix double closing parentheses ))
-        content = re.sub(r'\)\)', ')', content)
-        
-        # Fix lines ending with (, by adding );
-        content = re.sub(r'\($\s*(?=\n)', '();', content, flags=re.MULTILINE)
-        
-        # Fix semicolons after closing braces
-        content = re.sub(r'\};\s*$', '}', content, flags=re.MULTILINE)
-        
-        # Fix missing semicolons on variable declarations that end with )
-        content = re.sub(r'(= new \w+<[^>]+>\(\))\s*$', r'\1;', content, flags=re.MULTILINE)
-        
-        # Fix double commas at the end of method calls
-        content = re.sub(r',\s*,', ',', content)
-        
-        # Fix lines that have method calls ending with just (,
-        content = re.sub(r'(\.\w+)\($\s*(?=\n)', r'\1();', content, flags=re.MULTILINE)
-        
-        # Fix lines ending with incomplete lambda expressions
-        content = re.sub(r'=>\)\s*$', '=>', content, flags=re.MULTILINE)
-        
-        # Fix lines ending with ), that should just be )
-        content = re.sub(r'\),\s*$', ')', content, flags=re.MULTILINE)
-        
-        # Fix extra closing braces at the end of files
-        content = re.sub(r'}\s*}\s*$', '}', content)
-        
-        # Fix "No newline at end of file" patterns
-        content = re.sub(r'}\s*No newline at end of file\s*}\s*No newline at end of file', '}', content)
-        content = re.sub(r'No newline at end of file', '', content)
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.chmod(tmp_path, os.stat(filepath).st_mode & 0o7777)
+        os.replace(tmp_path, filepath)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+def unified_diff(filepath: str, before: bytes, after: bytes, hits: Counter) -> str:
+    name = os.path.relpath(filepath)
+    header = f"# {name}: " + ", ".join(f"{name}={count}" for name, count in sorted(hits.items()))
+    lines = difflib.unified_diff(before.decode('utf-8', 'replace').splitlines(True),
+                                 after.decode('utf-8', 'replace').splitlines(True),
+                                 fromfile=f"a/{name}", tofile=f"b/{name}")
+    return header + "\n" + "".join(line if line.endswith("\n") else line + "\n\\ No newline at end of file\n"
+                                   for line in lines)
+
+def _fix_data(data: bytes, hits: Counter) -> Optional[bytes]:
+    """New content, or None when nothing changed"""
+    original_content = data.decode('utf-8')
+    content = rewrite(original_content, hits)
+    return content.encode('utf-8') if content != original_content else None
+
+def fix_file(filepath, hits: Optional[Counter] = None, known_hash: Optional[str] = None,
+             dry_run: bool = False) -> Tuple[bool, Optional[FileState], Optional[str]]:
+    """Fix common syntax errors in a C# file.
+
+    Returns (changed, state after fixing, diff). A file whose content hash
+    equals `known_hash` was already fixed by this rule set and is left
+    alone. With `dry_run` nothing is written and the diff is returned.
+    """
+    hits = hits if hits is not None else Counter()
+    try:
+        with open(filepath, 'rb') as f:
+            data = f.read()
+        digest = content_hash(data)
+        if digest == known_hash:
+            content = None
+        else:
+            content = _fix_data(data, hits)
+        diff = unified_diff(filepath, data, content, hits) if dry_run and content is not None else None
         
         # Write back only if changed
-        if content != original_content:
-            with open(filepath, 'w', encoding='utf-8') as f:
-                f.write(content)
-            return True
-        return False
+        if content is not None and not dry_run:
+            atomic_write(filepath, content)
+            digest = content_hash(content)
+        
+        stat = os.stat(filepath)
+        return content is not None, (stat.st_mtime_ns, stat.st_size, digest), diff
     except Exception as e:
         print(f"Error processing {filepath}: {e}")
-        return False
+        return False, None, None
+
+class FixCache:
+    """path -> FileState of files already fixed with RULESET_VERSION"""
+
+    def __init__(self, path: Optional[str]):
+        self.path = path
+        self.entries: Dict[str, FileState] = {}
+        if path and os.path.exists(path):
+            try:
+                with open(path, encoding='utf-8') as f:
+                    data = json.load(f)
+                if data.get("version") == RULESET_VERSION:
+                    self.entries = {key: tuple(value) for key, value in data["files"].items()}
+            except (OSError, ValueError, KeyError):
+                pass  # a broken cache only costs a full run
+
+    def is_fresh(self, filepath: str) -> bool:
+        """Unchanged since it was last fixed - decided from stat() alone"""
+        state = self.entries.get(filepath)
+        if state is None:
+            return False
+        try:
+            stat = os.stat(filepath)
+        except OSError:
+            return False
+        return (stat.st_mtime_ns, stat.st_size) == state[:2]
+
+    def known_hash(self, filepath: str) -> Optional[str]:
+        state = self.entries.get(filepath)
+        return state[2] if state else None
+
+    def update(self, results: List[FileResult], roots: List[str], seen: List[str]):
+        for result in results:
+            if result.state is None or result.error:
+                self.entries.pop(result.path, None)
+            else:
+                self.entries[result.path] = result.state
+        # Forget files that disappeared from the scanned roots
+        prefixes = tuple(os.path.join(os.path.abspath(root), "") for root in roots)
+        seen_set = set(seen)
+        for filepath in list(self.entries):
+            if filepath.startswith(prefixes) and filepath not in seen_set:
+                del self.entries[filepath]
+
+    def save(self):
+        if not self.path:
+            return
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".fix_syntax_cache-")
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump({"version": RULESET_VERSION, "files": self.entries}, f)
+        os.replace(tmp_path, self.path)
+
+def iter_cs_files(roots: List[str]):
+    for root_dir in roots:
+        for root, dirs, files in os.walk(root_dir):
+            # Build output is regenerated anyway
+            dirs[:] = [d for d in dirs if d not in ("bin", "obj")]
+            for file in files:
+                if file.endswith('.cs'):
+                    yield os.path.abspath(os.path.join(root, file))
+
+def fix_files(chunk: List[Tuple[str, Optional[str]]], dry_run: bool = False) -> List[FileResult]:
+    """Fix a chunk of (path, known hash); runs inside a worker process with --jobs"""
+    results = []
+    for filepath, known_hash in chunk:
+        start = time.perf_counter()
+        error = None
+        hits: Counter = Counter()
+        try:
+            changed, state, diff = fix_file(filepath, hits, known_hash, dry_run)
+        except Exception as e:
+            changed, state, diff, error = False, None, None, str(e)
+        results.append(FileResult(filepath, changed, time.perf_counter() - start, error, dict(hits), state, diff))
+    return results
+
+def chunked(items: list, size: int) -> List[list]:
+    return [items[i:i + size] for i in range(0, len(items), size)]
 
 def main():
-    app_dir = "/home/ubuntu/projects/mock/SledzSpecke.WebApi/src/SledzSpecke.Application"
+    parser = argparse.ArgumentParser(description="Fix common syntax errors in C# files")
+    parser.add_argument("roots", nargs="+", help="Directories to scan")
+    parser.add_argument("--jobs", "-j", type=int, default=1,
+                        help="Worker processes (0 = one per CPU)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+                        help="Files sent to a worker at a time")
+    parser.add_argument("--slowest", type=int, default=5,
+                        help="Report the N slowest files")
+    parser.add_argument("--cache", default=DEFAULT_CACHE_PATH,
+                        help="Skip files unchanged since they were last fixed (cache file path)")
+    parser.add_argument("--no-cache", action="store_true", help="Process every file")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="Print unified diffs and rule hits per file instead of writing")
+    args = parser.parse_args()
     
-    fixed_count = 0
-    total_count = 0
+    missing = [root for root in args.roots if not os.path.isdir(root)]
+    if missing:
+        parser.error(f"not a directory: {', '.join(missing)}")
+    jobs = args.jobs or os.cpu_count() or 1
     
-    for root, dirs, files in os.walk(app_dir):
-        for file in files:
-            if file.endswith('.cs'):
-                filepath = os.path.join(root, file)
-                total_count += 1
-                if fix_file(filepath):
+    start = time.perf_counter()
+    cache = FixCache(None if args.no_cache else args.cache)
+    paths = list(iter_cs_files(args.roots))
+    pending = [(path, cache.known_hash(path)) for path in paths if not cache.is_fresh(path)]
+    chunks = chunked(pending, max(1, args.chunk_size))
+    
+    if jobs == 1:
+        chunk_results = (fix_files(chunk, args.dry_run) for chunk in chunks)
+    else:
+        executor = ProcessPoolExecutor(max_workers=jobs)
+        chunk_results = executor.map(fix_files, chunks, [args.dry_run] * len(chunks))
+    
+    # Report each chunk as it completes; diffs are printed and dropped
+    results: List[FileResult] = []
+    fixed_count = 0
+    try:
+        for chunk_result in chunk_results:
+            for result in chunk_result:
+                if result.error:
+                    print(f"Error processing {result.path}: {result.error}")
+                elif result.diff:
                     fixed_count += 1
-                    print(f"Fixed: {filepath}")
+                    sys.stdout.write(result.diff)
+                elif result.changed:
+                    fixed_count += 1
+                    print(f"Fixed: {result.path}")
+                results.append(result._replace(diff=None))
+            sys.stdout.flush()
+    finally:
+        if jobs != 1:
+            executor.shutdown(cancel_futures=True)
+    if not args.dry_run:
+        cache.update(results, args.roots, paths)
+        cache.save()
+    elapsed = time.perf_counter() - start
+    
+    if args.slowest and results:
+        print("\nSlowest files:")
+        for result in sorted(results, key=lambda r: r.seconds, reverse=True)[:args.slowest]:
+            print(f"  {result.seconds * 1000:8.1f} ms  {result.path}")
+    
+    total_hits: Counter = Counter()
+    for result in results:
+        total_hits.update(result.hits)
+    if total_hits:
+        print("\nRule hits:")
+        for rule in RULES:
+            if total_hits[rule.name]:
+                print(f"  {total_hits[rule.name]:8d}  {rule.name}")
     
-    print(f"\nFixed {fixed_count} out of {total_count} files")
+    cpu_time = sum(r.seconds for r in results)
+    verb = "Would fix" if args.dry_run else "Fixed"
+    print(f"\n{verb} {fixed_count} out of {len(paths)} files ({len(paths) - len(pending)} unchanged, skipped) "
+          f"in {elapsed:.2f}s "
+          f"({cpu_time:.2f}s in fix_file, {jobs} job{'s' if jobs != 1 else ''})")
+    return 1 if any(r.error for r in results) else 0
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())